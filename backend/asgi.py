@@ -0,0 +1,13 @@
+"""
+芝栖养生平台 - ASGI入口
+同一套Flask处理函数包装为ASGI应用，由uvicorn等异步服务器运行:
+    uvicorn asgi:application --host 0.0.0.0 --port 5000 --workers 4
+事件循环负责接收连接、读取请求体与发送响应 (慢客户端、keep-alive空闲连接不占用线程)，
+处理函数在每个进程 ASGI_THREADS 个线程中执行；需要安装 a2wsgi
+"""
+
+from a2wsgi import WSGIMiddleware
+
+from app import app
+
+application = WSGIMiddleware(app, workers=app.config['ASGI_THREADS'])
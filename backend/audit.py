@@ -0,0 +1,165 @@
+"""
+芝栖养生平台 - 管理操作审计日志
+请求线程只把日志放入有界队列，后台线程攒批后以多行INSERT写入，不为每个管理请求增加一次提交
+"""
+
+import logging
+import os
+import queue
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class _FlushMarker:
+    """flush() 放入队列的标记，后台线程写完它之前的记录后通知调用方"""
+
+    def __init__(self):
+        self.done = threading.Event()
+
+
+class AuditLogWriter:
+    """异步审计日志写入器
+
+    后台线程在攒满 batch_size 条或距本批第一条记录超过 flush_interval 秒时写入一批，
+    write_batch(records) 负责把一批记录 (dict列表) 写入数据库。
+    队列已满时请求线程最多等待 put_timeout 秒，仍无空位则丢弃该条并计数 (背压指标)。
+    后台线程在首次写入时启动，fork出的子进程会重新启动自己的线程。
+    """
+
+    def __init__(self, write_batch, batch_size=100, flush_interval=0.5, max_queue=10000, put_timeout=0.05):
+        self.write_batch = write_batch
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.put_timeout = put_timeout
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+        self._closed = False
+        self.enqueued = 0
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+        self.batches = 0
+        self.max_depth = 0
+        self.last_flush_ms = 0.0
+
+    def _ensure_thread(self):
+        if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None or self._pid != os.getpid() or not self._thread.is_alive():
+                self._pid = os.getpid()
+                self._thread = threading.Thread(target=self._run, name='audit-log-writer', daemon=True)
+                self._thread.start()
+
+    def add(self, record):
+        """放入队列，返回是否成功 (队列满且等待超时时丢弃)"""
+        if self._closed:
+            with self._lock:
+                self.dropped += 1
+            return False
+        self._ensure_thread()
+        try:
+            self._queue.put(record, timeout=self.put_timeout)
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+            logger.warning('审计日志队列已满，丢弃一条记录')
+            return False
+        depth = self._queue.qsize()
+        with self._lock:
+            self.enqueued += 1
+            self.max_depth = max(self.max_depth, depth)
+        return True
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            batch, markers = [], []
+            (markers if isinstance(item, _FlushMarker) else batch).append(item)
+            deadline = time.monotonic() + self.flush_interval
+            stop = False
+
+            # 攒批: 满batch_size条、超过flush_interval或遇到flush标记时写入
+            while len(batch) < self.batch_size and not markers:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                    break
+                (markers if isinstance(item, _FlushMarker) else batch).append(item)
+
+            if batch:
+                self._write(batch)
+            for marker in markers:
+                marker.done.set()
+            if stop:
+                return
+
+    def _write(self, batch):
+        started = time.perf_counter()
+        try:
+            self.write_batch(batch)
+            self.written += len(batch)
+        except Exception:
+            self.failed += len(batch)
+            logger.warning('审计日志写入失败，丢弃 %d 条', len(batch), exc_info=True)
+        self.batches += 1
+        self.last_flush_ms = (time.perf_counter() - started) * 1000
+
+    def flush(self, timeout=5):
+        """等待此前入队的记录全部写入，返回是否在超时前完成"""
+        if self._thread is None or self._pid != os.getpid() or not self._thread.is_alive():
+            # 后台线程未运行 (未写过日志或进程正在退出)，在当前线程写完剩余记录
+            self._drain()
+            return True
+        marker = _FlushMarker()
+        self._queue.put(marker)
+        return marker.done.wait(timeout)
+
+    def _drain(self):
+        batch = []
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if isinstance(item, _FlushMarker):
+                item.done.set()
+            elif item is not None:
+                batch.append(item)
+        for start in range(0, len(batch), self.batch_size):
+            self._write(batch[start:start + self.batch_size])
+
+    def close(self, timeout=5):
+        """停止接收新记录，写入剩余记录后停止后台线程 (worker退出时调用)"""
+        self._closed = True
+        self.flush(timeout)
+        thread = self._thread
+        if thread is not None and thread.is_alive() and self._pid == os.getpid():
+            self._queue.put(None)
+            thread.join(timeout)
+
+    def stats(self):
+        """背压与吞吐指标"""
+        return {
+            'queue_depth': self._queue.qsize(),
+            'queue_capacity': self._queue.maxsize,
+            'max_depth': self.max_depth,
+            'enqueued': self.enqueued,
+            'written': self.written,
+            'dropped': self.dropped,
+            'failed': self.failed,
+            'batches': self.batches,
+            'last_flush_ms': round(self.last_flush_ms, 3)
+        }
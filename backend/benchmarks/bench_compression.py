@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+芝栖养生平台 - 响应压缩基准测试
+对典型的 /products/ 与 /content/ 列表响应，测量各压缩算法/级别的CPU耗时与节省的字节数，用于选择 COMPRESS_ALGORITHMS
+
+用法:
+    python benchmarks/bench_compression.py --per-page 50 --repeat 200
+"""
+
+import argparse
+import hashlib
+import os
+import statistics
+import sys
+import time
+from decimal import Decimal
+
+os.environ.setdefault('DATABASE_URL', 'sqlite://')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+LEVELS = {'gzip': [1, 6, 9], 'br': [1, 4, 6], 'zstd': [1, 3, 9]}
+
+
+def seed(app_module, count):
+    db = app_module.db
+    author = app_module.User(username='bench', email='bench@example.com', password='x', real_name='基准测试')
+    db.session.add(author)
+    db.session.flush()
+    for i in range(count):
+        db.session.add(app_module.Product(
+            name=f'有机灵芝孢子粉 {i}号', category='spore', description='破壁灵芝孢子粉，高山林下仿野生种植，' * 4,
+            price=Decimal('199.00') + i, original_price=Decimal('259.00'), stock_quantity=100 + i,
+            images=[f'/uploads/{hashlib.sha256(str(i).encode()).hexdigest()}.jpg'], trace_code=f'TC{i:08d}',
+            weight=Decimal('0.50')
+        ))
+        db.session.add(app_module.Content(
+            title=f'灵芝养生小知识 第{i}期', content_type='article', summary='冬季养生从一碗灵芝汤开始，' * 5,
+            content='正文' * 500, author_id=author.id, category='knowledge', tags=['灵芝', '养生', '冬季'],
+            status='published'
+        ))
+    db.session.commit()
+
+
+def measure(func, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description='响应压缩基准测试')
+    parser.add_argument('--per-page', type=int, default=50, help='列表每页条数')
+    parser.add_argument('--repeat', type=int, default=200, help='重复次数 (取中位数)')
+    args = parser.parse_args()
+
+    import app as app_module
+    from compress import available_encodings, compress_bytes
+
+    with app_module.app.app_context():
+        app_module.db.create_all()
+        seed(app_module, args.per_page)
+        with app_module.app.test_client() as client:
+            payloads = {
+                path: client.get(f'{path}?per_page={args.per_page}').get_data()
+                for path in ('/products/', '/content/')
+            }
+
+    for path, body in payloads.items():
+        print(f'{path} ({args.per_page}条，原始 {len(body)} 字节)')
+        digest_ms = measure(lambda: hashlib.blake2b(body, digest_size=16).digest(), args.repeat)
+        for encoding in available_encodings():
+            for level in LEVELS[encoding]:
+                compressed = compress_bytes(encoding, body, level)
+                elapsed = measure(lambda: compress_bytes(encoding, body, level), args.repeat)
+                saved = len(body) - len(compressed)
+                print(f'  {encoding:<5} 级别{level:<2} {len(compressed):7d} 字节 ({len(compressed) / len(body):6.1%})  '
+                      f'{elapsed:6.3f}ms  每毫秒节省 {saved / max(elapsed, 1e-6) / 1024:7.1f}KB')
+        print(f'  缓存命中 (计算摘要) {digest_ms:6.3f}ms')
+
+
+if __name__ == '__main__':
+    main()
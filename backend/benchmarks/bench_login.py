@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+芝栖养生平台 - 登录吞吐基准测试
+模拟并发登录，测量不同哈希进程数下的登录QPS与延迟，用于确定 PASSWORD_HASH_WORKERS 与gunicorn线程数
+
+用法:
+    python benchmarks/bench_login.py --threads 8 --workers 0,2,4 --requests 200
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+os.environ.setdefault('DATABASE_URL', 'sqlite://')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def run(app_module, workers, method, threads, total, users):
+    import domains.auth
+    from passwords import PasswordHasher
+
+    hasher = PasswordHasher(method, max_workers=workers, max_pending=max(threads, 1) * 2, queue_timeout=60)
+    domains.auth.password_hasher = hasher
+    app = app_module.app
+
+    def login(i):
+        username = f'bench{i % users}'
+        with app.test_client() as client:
+            started = time.perf_counter()
+            response = client.post('/auth/login', json={'username': username, 'password': 'bench-password'})
+            elapsed = time.perf_counter() - started
+        assert response.status_code == 200, response.status_code
+        return elapsed
+
+    # 预热: 启动进程池
+    login(0)
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        latencies = sorted(pool.map(login, range(total)))
+    duration = time.perf_counter() - started
+    hasher.shutdown()
+
+    p95 = latencies[int(len(latencies) * 0.95) - 1]
+    print(f'workers={workers:<3} threads={threads:<3} {total / duration:8.1f} 次/秒  '
+          f'中位数 {statistics.median(latencies) * 1000:7.1f}ms  P95 {p95 * 1000:7.1f}ms')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='登录吞吐基准测试')
+    parser.add_argument('--method', default=os.environ.get('PASSWORD_HASH_METHOD', 'scrypt'), help='哈希算法')
+    parser.add_argument('--workers', default='0,2,4', help='哈希进程数 (逗号分隔，0表示在请求线程中计算)')
+    parser.add_argument('--threads', type=int, default=8, help='并发请求线程数')
+    parser.add_argument('--requests', type=int, default=200, help='每组登录次数')
+    parser.add_argument('--users', type=int, default=20, help='测试用户数')
+    args = parser.parse_args()
+
+    import app as app_module
+    from werkzeug.security import generate_password_hash
+
+    with app_module.app.app_context():
+        app_module.db.create_all()
+        pwhash = generate_password_hash('bench-password', args.method)
+        for i in range(args.users):
+            app_module.db.session.add(app_module.User(
+                username=f'bench{i}', email=f'bench{i}@example.com', password=pwhash
+            ))
+        app_module.db.session.commit()
+
+    print(f'哈希算法: {args.method}，CPU核数: {os.cpu_count()}')
+    for workers in (int(w) for w in args.workers.split(',')):
+        run(app_module, workers, args.method, args.threads, args.requests, args.users)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+芝栖养生平台 - JSON序列化基准测试
+比较列表接口序列化1000个产品/活动的耗时: 手写dict + Flask默认json编码 (改造前) 与序列化视图 + orjson (改造后)
+
+用法:
+    python benchmarks/bench_serialize.py --items 1000 --repeat 50
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+os.environ.setdefault('DATABASE_URL', 'sqlite://')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def legacy_product(product):
+    return {
+        'id': product.id,
+        'name': product.name,
+        'category': product.category,
+        'description': product.description,
+        'price': float(product.price),
+        'original_price': float(product.original_price) if product.original_price else None,
+        'stock_quantity': product.stock_quantity,
+        'images': product.images or [],
+        'is_featured': product.is_featured,
+        'trace_code': product.trace_code,
+        'weight': float(product.weight) if product.weight else None,
+        'created_at': product.created_at.isoformat()
+    }
+
+
+def legacy_activity(activity):
+    return {
+        'id': activity.id,
+        'title': activity.title,
+        'description': activity.description,
+        'activity_type': activity.activity_type,
+        'category': activity.category,
+        'max_participants': activity.max_participants,
+        'current_participants': activity.current_participants,
+        'price': float(activity.price),
+        'location': activity.location,
+        'start_time': activity.start_time.isoformat(),
+        'end_time': activity.end_time.isoformat(),
+        'duration': activity.duration,
+        'images': activity.images or [],
+        'status': activity.status,
+        'organizer': {
+            'id': activity.organizer.id,
+            'username': activity.organizer.username,
+            'real_name': activity.organizer.real_name,
+            'organizer_type': activity.organizer_type
+        } if activity.organizer else None
+    }
+
+
+def build_rows(app_module, count):
+    now = datetime(2024, 6, 1, 9, 0, 0)
+    host = app_module.User(id=1, username='host', email='host@example.com', password='x', real_name='主理人')
+    products = [
+        app_module.Product(
+            id=i, name=f'灵芝孢子粉 {i}', category='spore', description='破壁灵芝孢子粉，每日两次' * 3,
+            price=Decimal('199.00'), original_price=Decimal('259.00'), stock_quantity=100,
+            images=[f'/uploads/{i:064x}.jpg'], is_featured=i % 5 == 0, trace_code=f'TC{i:08d}',
+            weight=Decimal('0.50'), created_at=now
+        )
+        for i in range(count)
+    ]
+    activities = [
+        app_module.Activity(
+            id=i, title=f'周末茶会 {i}', description='在基地体验灵芝茶制作' * 3, activity_type='event',
+            category='tea', max_participants=30, current_participants=12, price=Decimal('50.00'),
+            location='杭州基地', start_time=now + timedelta(days=i), end_time=now + timedelta(days=i, hours=2),
+            duration=120, images=[f'/uploads/{i:064x}.jpg'], status='published', organizer=host,
+            organizer_type='host'
+        )
+        for i in range(count)
+    ]
+    return products, activities
+
+
+def measure(func, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description='JSON序列化基准测试')
+    parser.add_argument('--items', type=int, default=1000, help='每次序列化的对象数')
+    parser.add_argument('--repeat', type=int, default=50, help='重复次数 (取中位数)')
+    args = parser.parse_args()
+
+    import app as app_module
+    from flask.json.provider import DefaultJSONProvider
+    from serializers import BACKEND, dumps, dumps_stdlib
+
+    from models import serializer
+    products, activities = build_rows(app_module, args.items)
+    # Flask默认JSON提供者的编码参数 (改造前的jsonify)
+    legacy_json = dict(ensure_ascii=DefaultJSONProvider.ensure_ascii, sort_keys=DefaultJSONProvider.sort_keys,
+                       default=DefaultJSONProvider.default)
+
+    print(f'序列化 {args.items} 个对象 (中位数，JSON后端: {BACKEND})')
+    for label, rows, legacy, model in (('产品', products, legacy_product, app_module.Product),
+                                       ('活动', activities, legacy_activity, app_module.Activity)):
+        encode = serializer.encoder(model, 'card')
+        before = measure(lambda: json.dumps({'items': [legacy(row) for row in rows]}, **legacy_json), args.repeat)
+        stdlib = measure(lambda: dumps_stdlib({'items': [encode(row) for row in rows]}), args.repeat)
+        after = measure(lambda: dumps({'items': [encode(row) for row in rows]}), args.repeat)
+        print(f'{label}: 改造前 {before:7.2f}ms  序列化视图+标准库 {stdlib:7.2f}ms  '
+              f'序列化视图+{BACKEND} {after:7.2f}ms  ({before / after:.1f}x)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+芝栖养生平台 - 启动时间基准测试
+在子进程中以 python -X importtime 导入app，统计冷启动耗时与最慢的模块，
+并测量 create_app() 注册全部领域与按部署角色注册部分领域的耗时，用于观察worker启动与preload fork前的开销
+
+用法:
+    python benchmarks/bench_startup.py --repeat 5 --top 15
+    python benchmarks/bench_startup.py --role catalog
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+os.environ.setdefault('DATABASE_URL', 'sqlite://')
+sys.path.insert(0, BACKEND_DIR)
+
+
+def import_times(module='app'):
+    """子进程导入模块，返回 {模块名: (自身耗时us, 累计耗时us)}"""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=BACKEND_DIR, env=dict(os.environ), capture_output=True, text=True, check=True
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        if self_us.strip().isdigit():
+            times[name.strip()] = (int(self_us), int(cumulative_us))
+    return times
+
+
+def measure_create_app(role, repeat):
+    import app as app_module
+
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        application = app_module.create_app({'DEPLOYMENT_ROLE': role})
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings) * 1000, len(list(application.url_map.iter_rules()))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='启动时间基准测试')
+    parser.add_argument('--repeat', type=int, default=5, help='重复次数 (取中位数)')
+    parser.add_argument('--top', type=int, default=15, help='列出累计耗时最长的模块数')
+    parser.add_argument('--role', default='catalog', help='对比的部署角色 (见 domains.DEPLOYMENT_ROLES)')
+    args = parser.parse_args()
+
+    runs = [import_times() for _ in range(args.repeat)]
+    totals = [times['app'][1] / 1000 for times in runs]
+    print(f'import app: 中位数 {statistics.median(totals):7.1f}ms  最快 {min(totals):7.1f}ms  '
+          f'(app模块自身 {statistics.median(times["app"][0] / 1000 for times in runs):6.1f}ms)')
+
+    print(f'累计耗时最长的 {args.top} 个模块:')
+    slowest = sorted(runs[-1].items(), key=lambda item: item[1][1], reverse=True)
+    for name, (self_us, cumulative_us) in slowest[1:args.top + 1]:
+        print(f'  {name:<40} 累计 {cumulative_us / 1000:7.1f}ms  自身 {self_us / 1000:6.1f}ms')
+
+    for role in ('all', args.role):
+        elapsed, rules = measure_create_app(role, args.repeat)
+        print(f'create_app(DEPLOYMENT_ROLE={role}): {elapsed:7.1f}ms  {rules} 条路由')
+
+
+if __name__ == '__main__':
+    main()
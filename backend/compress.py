@@ -0,0 +1,206 @@
+"""
+芝栖养生平台 - 响应压缩
+不经过nginx直接对外提供服务时，由应用按 Accept-Encoding 协商压缩响应 (gzip，安装了brotli/zstandard时支持br/zstd)；
+小于阈值的响应不压缩，流式响应逐块压缩，GET响应的压缩结果按内容摘要缓存，相同的响应体不重复压缩
+"""
+
+import hashlib
+import zlib
+
+from cache import TTLCache
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - 可选依赖
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - 可选依赖
+    zstandard = None
+
+# 可压缩的响应类型 (图片、视频等已压缩格式不再压缩；SSE需要逐条送达，不压缩)
+COMPRESSIBLE_MIMETYPES = frozenset([
+    'application/json', 'application/javascript', 'application/xml', 'image/svg+xml',
+    'text/plain', 'text/html', 'text/css', 'text/javascript', 'text/xml', 'text/csv'
+])
+
+# 各算法默认级别: 取压缩率与CPU开销的平衡点 (见 benchmarks/bench_compression.py)
+DEFAULT_LEVELS = {'gzip': 6, 'br': 4, 'zstd': 3}
+
+
+class _GzipStream:
+    def __init__(self, level):
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data):
+        # 每块同步刷新，客户端无需等待整个响应即可解压已收到的部分
+        return self._compressor.compress(data) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self):
+        return self._compressor.flush(zlib.Z_FINISH)
+
+
+class _BrotliStream:
+    def __init__(self, level):
+        self._compressor = brotli.Compressor(quality=level)
+
+    def compress(self, data):
+        return self._compressor.process(data) + self._compressor.flush()
+
+    def finish(self):
+        return self._compressor.finish()
+
+
+class _ZstdStream:
+    def __init__(self, level):
+        self._compressor = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, data):
+        return self._compressor.compress(data) + self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self):
+        return self._compressor.flush()
+
+
+def available_encodings():
+    encodings = ['gzip']
+    if brotli is not None:
+        encodings.append('br')
+    if zstandard is not None:
+        encodings.append('zstd')
+    return encodings
+
+
+def compress_bytes(encoding, data, level):
+    if encoding == 'gzip':
+        return zlib.compress(data, level, wbits=16 + zlib.MAX_WBITS)
+    if encoding == 'br':
+        return brotli.compress(data, quality=level)
+    if encoding == 'zstd':
+        return zstandard.ZstdCompressor(level=level).compress(data)
+    raise ValueError(f'不支持的压缩算法: {encoding}')
+
+
+def compress_stream(encoding, level):
+    return {'gzip': _GzipStream, 'br': _BrotliStream, 'zstd': _ZstdStream}[encoding](level)
+
+
+def parse_accept_encoding(header):
+    """解析 Accept-Encoding，返回 {编码: q值}"""
+    accepted = {}
+    for part in (header or '').split(','):
+        name, _, params = part.strip().partition(';')
+        name = name.strip().lower()
+        if not name:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[name] = q
+    return accepted
+
+
+class ResponseCompressor:
+    """Flask响应压缩 (after_request钩子)
+
+    preferred 为服务端偏好顺序，按客户端q值最高者中偏好靠前的算法压缩；
+    未安装的算法自动跳过。缓存只保存GET响应，按 (算法, 响应体摘要) 命中，与请求者无关。
+    """
+
+    def __init__(self, preferred=('zstd', 'br', 'gzip'), min_size=1024, levels=None,
+                 cache_size=256, cache_max_bytes=1024 * 1024, cache_ttl=300):
+        supported = available_encodings()
+        self.encodings = [encoding for encoding in preferred if encoding in supported]
+        self.min_size = min_size
+        self.levels = dict(DEFAULT_LEVELS, **(levels or {}))
+        self.cache_max_bytes = cache_max_bytes
+        self.cache = TTLCache(maxsize=cache_size, ttl=cache_ttl) if cache_size else None
+
+    def negotiate(self, header):
+        accepted = parse_accept_encoding(header)
+        wildcard = accepted.get('*', 0.0)
+        best, best_q = None, 0.0
+        for encoding in self.encodings:
+            q = accepted.get(encoding, wildcard)
+            if q > best_q:
+                best, best_q = encoding, q
+        return best
+
+    def should_compress(self, request, response):
+        if response.status_code < 200 or response.status_code in (204, 206, 304):
+            return False
+        if request.method == 'HEAD' or 'Content-Encoding' in response.headers:
+            return False
+        if response.mimetype not in COMPRESSIBLE_MIMETYPES:
+            return False
+        if 'no-transform' in response.headers.get('Cache-Control', ''):
+            return False
+        if response.direct_passthrough:
+            # send_file 等文件响应: 交给nginx或客户端缓存处理
+            return False
+        return True
+
+    def after_request(self, response):
+        from flask import request
+
+        if not self.should_compress(request, response):
+            return response
+        response.vary.add('Accept-Encoding')
+        encoding = self.negotiate(request.headers.get('Accept-Encoding'))
+        if encoding is None:
+            return response
+
+        if response.is_streamed:
+            response.response = self._stream(encoding, response.response)
+            response.headers.pop('Content-Length', None)
+        else:
+            body = response.get_data()
+            if len(body) < self.min_size:
+                return response
+            response.set_data(self._compress(encoding, body, cacheable=request.method == 'GET'))
+
+        response.headers['Content-Encoding'] = encoding
+        # 压缩后的表示与原响应不同，强ETag改为弱ETag
+        etag = response.headers.get('ETag')
+        if etag and not etag.startswith('W/'):
+            response.headers['ETag'] = f'W/{etag}'
+        return response
+
+    def _compress(self, encoding, body, cacheable):
+        if self.cache is None or not cacheable or len(body) > self.cache_max_bytes:
+            return compress_bytes(encoding, body, self.levels[encoding])
+        key = (encoding, hashlib.blake2b(body, digest_size=16).digest())
+        compressed = self.cache.get(key)
+        if compressed is None:
+            compressed = compress_bytes(encoding, body, self.levels[encoding])
+            self.cache.set(key, compressed)
+        return compressed
+
+    def _stream(self, encoding, chunks):
+        stream = compress_stream(encoding, self.levels[encoding])
+        try:
+            for chunk in chunks:
+                if isinstance(chunk, str):
+                    chunk = chunk.encode('utf-8')
+                if chunk:
+                    yield stream.compress(chunk)
+            yield stream.finish()
+        finally:
+            close = getattr(chunks, 'close', None)
+            if close is not None:
+                close()
+
+    def stats(self):
+        if self.cache is None:
+            return {'encodings': self.encodings, 'cache_entries': 0, 'cache_hits': 0, 'cache_misses': 0}
+        return {
+            'encodings': self.encodings,
+            'cache_entries': len(self.cache),
+            'cache_hits': self.cache.hits,
+            'cache_misses': self.cache.misses
+        }
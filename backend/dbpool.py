@@ -0,0 +1,146 @@
+"""
+芝栖养生平台 - 数据库连接池
+由环境变量生成 SQLALCHEMY_ENGINE_OPTIONS (连接池大小、溢出、回收、pre-ping、语句超时、隔离级别)，
+并统计连接借出次数、等待时间与超时次数，用于判断连接池是否不足
+"""
+
+import threading
+import time
+
+from sqlalchemy import event, exc
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import QueuePool
+
+
+class PoolMetrics:
+    """连接池指标 (每个worker进程一份)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.connects = 0
+        self.invalidated = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.slow_waits = 0
+        self.pool = None
+
+    def record_wait(self, seconds, timed_out=False):
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            self.wait_total += seconds
+            self.wait_max = max(self.wait_max, seconds)
+            # 超过10毫秒说明请求在排队等待空闲连接
+            if seconds > 0.01:
+                self.slow_waits += 1
+
+    def stats(self):
+        pool = self.pool
+        waits = self.checkouts + self.timeouts
+        result = {
+            'checkouts': self.checkouts,
+            'connects': self.connects,
+            'invalidated': self.invalidated,
+            'timeouts': self.timeouts,
+            'slow_waits': self.slow_waits,
+            'wait_avg_ms': round(self.wait_total / waits * 1000, 3) if waits else 0.0,
+            'wait_max_ms': round(self.wait_max * 1000, 3)
+        }
+        if isinstance(pool, QueuePool):
+            result.update(pool_size=pool.size(), checked_out=pool.checkedout(),
+                          checked_in=pool.checkedin(), overflow=pool.overflow())
+        return result
+
+
+def instrumented_pool_class(metrics, base=QueuePool):
+    """借出连接时记录等待时间的连接池类 (engine.dispose() 重建连接池时沿用)"""
+
+    class InstrumentedQueuePool(base):
+        def _do_get(self):
+            started = time.perf_counter()
+            try:
+                connection = super()._do_get()
+            except exc.TimeoutError:
+                metrics.record_wait(time.perf_counter() - started, timed_out=True)
+                raise
+            metrics.record_wait(time.perf_counter() - started)
+            return connection
+
+    return InstrumentedQueuePool
+
+
+def is_memory_sqlite(uri):
+    url = make_url(uri)
+    return url.get_backend_name() == 'sqlite' and url.database in (None, '', ':memory:')
+
+
+def build_engine_options(uri, pool_size=5, max_overflow=5, pool_timeout=10, pool_recycle=280,
+                         pre_ping=True, isolation_level='', metrics=None):
+    """生成 create_engine 参数；内存SQLite (测试) 使用单连接池，不设置连接池参数"""
+    options = {}
+    if isolation_level:
+        options['isolation_level'] = isolation_level
+    if is_memory_sqlite(uri):
+        return options
+    options.update(
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        pool_timeout=pool_timeout,
+        pool_recycle=pool_recycle,
+        pool_pre_ping=pre_ping
+    )
+    if metrics is not None:
+        options['poolclass'] = instrumented_pool_class(metrics)
+    return options
+
+
+# 各数据库设置会话级语句超时 (毫秒) 的语句；MySQL的max_execution_time只对SELECT生效
+STATEMENT_TIMEOUT_SQL = {
+    'mysql': 'SET SESSION max_execution_time = {ms}',
+    'mariadb': 'SET SESSION max_statement_time = {seconds}',
+    'postgresql': 'SET statement_timeout = {ms}'
+}
+
+
+def statement_timeout_sql(dialect, statement_timeout_ms):
+    """当前数据库的语句超时设置SQL；mysql+pymysql:// 等URL连接MariaDB服务器时 dialect.name 仍为mysql，
+    按连接后识别的 is_mariadb 选择 (MariaDB不支持 max_execution_time)"""
+    name = 'mariadb' if getattr(dialect, 'is_mariadb', False) else dialect.name
+    template = STATEMENT_TIMEOUT_SQL.get(name)
+    if template is None:
+        return None
+    return template.format(ms=int(statement_timeout_ms), seconds=statement_timeout_ms / 1000)
+
+
+def configure_engine(engine, metrics, statement_timeout_ms=0):
+    """为引擎注册连接池事件: 指标统计与新连接的语句超时"""
+    metrics.pool = engine.pool
+
+    @event.listens_for(engine, 'connect')
+    def on_connect(dbapi_connection, connection_record):
+        metrics.connects += 1
+        # 方言在首个连接建立后才识别服务器类型 (早于本事件)，因此在这里选择语句
+        timeout_sql = statement_timeout_sql(engine.dialect, statement_timeout_ms) if statement_timeout_ms else None
+        if timeout_sql:
+            cursor = dbapi_connection.cursor()
+            try:
+                cursor.execute(timeout_sql)
+            finally:
+                cursor.close()
+            # psycopg2等驱动执行任何语句都会隐式开始事务，不提交的话连接归还时的回滚会撤销这次SET
+            dbapi_connection.commit()
+
+    @event.listens_for(engine, 'checkout')
+    def on_checkout(dbapi_connection, connection_record, connection_proxy):
+        metrics.checkouts += 1
+
+    @event.listens_for(engine, 'invalidate')
+    def on_invalidate(dbapi_connection, connection_record, exception):
+        # pre-ping发现连接已被数据库关闭 (如超过wait_timeout) 时也会触发
+        metrics.invalidated += 1
+
+    @event.listens_for(engine, 'engine_disposed')
+    def on_disposed(engine):
+        metrics.pool = engine.pool
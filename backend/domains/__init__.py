@@ -0,0 +1,36 @@
+"""
+芝栖养生平台 - 业务领域
+每个领域模块定义一个RESTX命名空间 ns，create_app 只导入并注册启用的领域；
+files (首页与上传文件)、health (健康检查) 与 metrics (监控指标) 所有部署角色都注册
+"""
+
+from importlib import import_module
+
+DOMAINS = ('auth', 'content', 'catalog', 'activities', 'bases', 'orders', 'payments', 'reviews', 'user', 'admin')
+
+# 部署角色: 只读目录实例与下单实例分开部署、分别扩容，由nginx按URL前缀分发
+DEPLOYMENT_ROLES = {
+    'all': DOMAINS,
+    'catalog': ('content', 'catalog', 'activities', 'bases', 'reviews'),
+    'checkout': ('auth', 'orders', 'payments', 'user'),
+    'admin': ('auth', 'admin')
+}
+
+
+def enabled_domains(role='all', names=''):
+    """解析部署角色或逗号分隔的领域列表 (优先)，返回启用的领域名"""
+    if names:
+        domains = [name.strip() for name in names.split(',') if name.strip()]
+    elif role in DEPLOYMENT_ROLES:
+        domains = list(DEPLOYMENT_ROLES[role])
+    else:
+        raise ValueError(f'未知的部署角色: {role}')
+    unknown = [name for name in domains if name not in DOMAINS]
+    if unknown:
+        raise ValueError(f'未知的业务领域: {", ".join(unknown)}')
+    return domains
+
+
+def load_domain(name):
+    """导入领域模块 (未启用的领域不会被导入)"""
+    return import_module(f'{__name__}.{name}')
@@ -0,0 +1,156 @@
+"""
+芝栖养生平台 - 活动管理 (/activities/): 活动发布与报名
+"""
+
+from datetime import datetime
+
+from flask import request, jsonify
+from flask_jwt_extended import jwt_required, current_user
+from flask_restx import Namespace, Resource, fields
+
+from extensions import db
+from models import Activity, UserActivity, serializer, list_projection
+from services import read_replica
+from domains.files import acquire_upload, with_images_srcset
+
+ns = Namespace('activities', description='活动管理相关接口')
+
+# 活动相关模型
+activity_model = ns.model('Activity', {
+    'title': fields.String(required=True, description='活动标题'),
+    'description': fields.String(description='活动描述'),
+    'activity_type': fields.String(required=True, enum=['workshop', 'experience', 'course', 'event'], description='活动类型'),
+    'category': fields.String(description='活动分类'),
+    'max_participants': fields.Integer(description='最大参与人数'),
+    'price': fields.Float(description='价格'),
+    'location': fields.String(description='活动地点'),
+    'start_time': fields.DateTime(required=True, description='开始时间'),
+    'end_time': fields.DateTime(required=True, description='结束时间'),
+    'duration': fields.Integer(description='持续时间(分钟)'),
+    'images': fields.List(fields.String, description='活动图片'),
+    'requirements': fields.String(description='参与要求')
+})
+
+# 活动管理命名空间
+@ns.route('/')
+class ActivityList(Resource):
+    @ns.response(200, '获取成功')
+    @read_replica
+    def get(self):
+        """获取活动列表"""
+        page = request.args.get('page', 1, type=int)
+        per_page = request.args.get('per_page', 10, type=int)
+        activity_type = request.args.get('type')
+        category = request.args.get('category')
+        status = request.args.get('status', 'published')
+        upcoming = request.args.get('upcoming', type=bool)
+
+        encode, options = list_projection(Activity)
+        query = Activity.query.options(*options)
+
+        if activity_type:
+            query = query.filter_by(activity_type=activity_type)
+        if category:
+            query = query.filter_by(category=category)
+        if status:
+            query = query.filter_by(status=status)
+        if upcoming:
+            query = query.filter(Activity.start_time > datetime.utcnow())
+
+        activities = query.order_by(Activity.start_time.asc()).paginate(page=page, per_page=per_page)
+        result = with_images_srcset([encode(activity) for activity in activities.items])
+
+        return jsonify({
+            'activities': result,
+            'total': activities.total,
+            'pages': activities.pages,
+            'current_page': page
+        }), 200
+
+    @jwt_required()
+    @ns.expect(activity_model)
+    @ns.response(201, '活动创建成功')
+    def post(self):
+        """创建活动"""
+        current_user_id = current_user.id
+        data = request.get_json()
+
+        new_activity = Activity(
+            title=data['title'],
+            description=data.get('description'),
+            activity_type=data['activity_type'],
+            category=data.get('category'),
+            organizer_id=current_user_id,
+            organizer_type=data.get('organizer_type', 'user'),
+            max_participants=data.get('max_participants'),
+            price=data.get('price', 0.00),
+            location=data.get('location'),
+            start_time=datetime.fromisoformat(data['start_time']),
+            end_time=datetime.fromisoformat(data['end_time']),
+            duration=data.get('duration'),
+            images=data.get('images', []),
+            requirements=data.get('requirements'),
+            status='pending_review' if data.get('organizer_type') == 'user' else 'draft'
+        )
+        for url in new_activity.images or ():
+            acquire_upload(url)
+
+        db.session.add(new_activity)
+        db.session.commit()
+
+        return jsonify({'msg': '活动创建成功', 'activity_id': new_activity.id}), 201
+
+@ns.route('/<int:activity_id>')
+class ActivityResource(Resource):
+    @ns.response(200, '获取成功')
+    @ns.response(404, '活动不存在')
+    def get(self, activity_id):
+        """获取活动详情"""
+        activity = Activity.query.get(activity_id)
+        if not activity:
+            return jsonify({'msg': '活动不存在'}), 404
+
+        return jsonify(serializer.dump(activity, 'detail')), 200
+
+@ns.route('/<int:activity_id>/register')
+class ActivityRegistration(Resource):
+    @jwt_required()
+    @ns.response(201, '报名成功')
+    @ns.response(400, '报名失败')
+    @ns.response(404, '活动不存在')
+    def post(self, activity_id):
+        """活动报名"""
+        current_user_id = current_user.id
+        activity = Activity.query.get(activity_id)
+
+        if not activity:
+            return jsonify({'msg': '活动不存在'}), 404
+
+        if activity.status != 'published':
+            return jsonify({'msg': '活动未发布，无法报名'}), 400
+
+        if activity.current_participants >= activity.max_participants:
+            return jsonify({'msg': '活动已满员'}), 400
+
+        # 检查是否已经报名
+        existing_registration = UserActivity.query.filter_by(
+            user_id=current_user_id,
+            activity_id=activity_id
+        ).first()
+
+        if existing_registration:
+            return jsonify({'msg': '您已经报名此活动'}), 400
+
+        # 创建报名记录
+        registration = UserActivity(
+            user_id=current_user_id,
+            activity_id=activity_id,
+            participation_status='registered'
+        )
+
+        activity.current_participants += 1
+
+        db.session.add(registration)
+        db.session.commit()
+
+        return jsonify({'msg': '报名成功', 'registration_id': registration.id}), 201
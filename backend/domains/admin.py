@@ -0,0 +1,181 @@
+"""
+芝栖养生平台 - 后台管理 (/admin/): 统计、审核与运行状态
+"""
+
+from datetime import datetime
+
+from flask import request, jsonify, send_from_directory
+from flask_restx import Namespace, Resource, fields
+
+from permissions import STATS_VIEW, ACTIVITY_REVIEW, CONTENT_REVIEW, CONTENT_PUBLISH, PROFILE_VIEW
+from replica import REPLICA_BIND
+from extensions import db, db_pool_metrics, db_replica_pool_metrics
+from models import User, Content, Product, Activity, Order, serializer
+from services import admin_log_writer, permission_required, read_replica, sampling_profiler
+
+ns = Namespace('admin', description='后台管理相关接口')
+
+# 后台管理命名空间
+@ns.route('/stats')
+class AdminStats(Resource):
+    @permission_required(STATS_VIEW)
+    @ns.response(200, '获取成功')
+    @read_replica
+    def get(self):
+        """获取后台统计数据"""
+        # 用户统计
+        total_users = User.query.count()
+        active_users = User.query.filter_by(is_active=True).count()
+        vip_users = User.query.filter_by(member_level='vip').count()
+        premium_users = User.query.filter_by(member_level='premium').count()
+
+        # 订单统计
+        total_orders = Order.query.count()
+        paid_orders = Order.query.filter_by(payment_status='paid').count()
+        total_revenue = db.session.query(db.func.sum(Order.total_amount)).filter(Order.payment_status=='paid').scalar() or 0
+
+        # 内容统计
+        total_content = Content.query.count()
+        published_content = Content.query.filter_by(status='published').count()
+
+        # 活动统计
+        total_activities = Activity.query.count()
+        published_activities = Activity.query.filter_by(status='published').count()
+
+        # 产品统计
+        total_products = Product.query.count()
+        available_products = Product.query.filter_by(is_available=True).count()
+
+        return jsonify({
+            'users': {
+                'total': total_users,
+                'active': active_users,
+                'vip': vip_users,
+                'premium': premium_users
+            },
+            'orders': {
+                'total': total_orders,
+                'paid': paid_orders,
+                'revenue': float(total_revenue)
+            },
+            'content': {
+                'total': total_content,
+                'published': published_content
+            },
+            'activities': {
+                'total': total_activities,
+                'published': published_activities
+            },
+            'products': {
+                'total': total_products,
+                'available': available_products
+            }
+        }), 200
+
+@ns.route('/audit-log/stats')
+class AdminAuditLogStats(Resource):
+    @permission_required(STATS_VIEW)
+    @ns.response(200, '获取成功')
+    def get(self):
+        """审计日志写入队列指标 (当前worker)"""
+        return jsonify(admin_log_writer.stats()), 200
+
+@ns.route('/db-pool/stats')
+class AdminDbPoolStats(Resource):
+    @permission_required(STATS_VIEW)
+    @ns.response(200, '获取成功')
+    def get(self):
+        """数据库连接池指标 (当前worker)"""
+        stats = db_pool_metrics.stats()
+        if REPLICA_BIND in db.engines:
+            stats['replica'] = db_replica_pool_metrics.stats()
+        return jsonify(stats), 200
+
+@ns.route('/profiles')
+class AdminProfiles(Resource):
+    @permission_required(PROFILE_VIEW)
+    @ns.response(200, '获取成功')
+    def get(self):
+        """最近的采样分析文件 (本机所有worker写入的)"""
+        limit = min(request.args.get('limit', 50, type=int), 200)
+        return jsonify({'profiles': sampling_profiler.store.list(limit)}), 200
+
+@ns.route('/profiles/<string:name>')
+class AdminProfileDownload(Resource):
+    @permission_required(PROFILE_VIEW)
+    @ns.response(200, '下载成功 (折叠栈格式，可用 flamegraph.pl 或 speedscope 生成火焰图)')
+    @ns.response(404, '文件不存在')
+    def get(self, name):
+        """下载采样分析文件"""
+        store = sampling_profiler.store
+        if not store.is_valid_name(name):
+            return jsonify({'msg': '文件不存在'}), 404
+        return send_from_directory(store.directory, name, mimetype='text/plain', as_attachment=True)
+
+@ns.route('/activities/review')
+class AdminActivityReview(Resource):
+    @permission_required(ACTIVITY_REVIEW)
+    @ns.response(200, '获取成功')
+    def get(self):
+        """获取待审核活动列表"""
+        activities = Activity.query.filter_by(review_status='pending').all()
+        return jsonify({'activities': serializer.dump_many(activities, 'review')}), 200
+
+@ns.route('/activities/<int:activity_id>/review')
+class AdminActivityReviewAction(Resource):
+    @permission_required(ACTIVITY_REVIEW, audit=('activity_review', 'activity'))
+    @ns.expect(ns.model('ReviewAction', {
+        'action': fields.String(required=True, enum=['approve', 'reject'], description='审核动作'),
+        'reason': fields.String(description='拒绝原因')
+    }))
+    @ns.response(200, '审核完成')
+    @ns.response(404, '活动不存在')
+    def put(self, activity_id):
+        """审核活动"""
+        activity = Activity.query.get(activity_id)
+        if not activity:
+            return jsonify({'msg': '活动不存在'}), 404
+        
+        data = request.get_json()
+        action = data.get('action')
+
+        if action == 'approve':
+            activity.review_status = 'approved'
+            activity.status = 'published'
+            activity.review_reason = None
+        elif action == 'reject':
+            activity.review_status = 'rejected'
+            activity.status = 'draft'
+            activity.review_reason = data.get('reason', '审核未通过')
+
+        activity.updated_at = datetime.utcnow()
+        db.session.commit()
+
+        return jsonify({'msg': f'活动已{"通过" if action == "approve" else "拒绝"}审核'}), 200
+
+@ns.route('/content/review')
+class AdminContentReview(Resource):
+    @permission_required(CONTENT_REVIEW)
+    @ns.response(200, '获取成功')
+    def get(self):
+        """获取待审核内容列表"""
+        contents = Content.query.filter_by(status='draft').all()
+        return jsonify({'contents': serializer.dump_many(contents, 'review')}), 200
+
+@ns.route('/content/<int:content_id>/publish')
+class AdminContentPublish(Resource):
+    @permission_required(CONTENT_PUBLISH, audit=('content_publish', 'content'))
+    @ns.response(200, '发布成功')
+    @ns.response(404, '内容不存在')
+    def put(self, content_id):
+        """发布内容"""
+        content = Content.query.get(content_id)
+        if not content:
+            return jsonify({'msg': '内容不存在'}), 404
+
+        content.status = 'published'
+        content.publish_time = datetime.utcnow()
+        content.updated_at = datetime.utcnow()
+        db.session.commit()
+
+        return jsonify({'msg': '内容发布成功'}), 200
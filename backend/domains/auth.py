@@ -0,0 +1,203 @@
+"""
+芝栖养生平台 - 用户认证 (/auth/): 注册、登录、token刷新与吊销、修改密码与个人资料
+"""
+
+import time
+from datetime import datetime
+
+from flask import current_app, request, jsonify
+from flask_jwt_extended import decode_token, get_jwt, jwt_required, current_user
+from flask_restx import Namespace, Resource, fields
+
+from passwords import PasswordHasher
+from config import settings
+from extensions import db
+from models import User
+from services import revocation_list, issue_tokens, revoke_token, rate_limit
+from domains.files import replace_upload
+
+ns = Namespace('auth', description='用户认证相关接口')
+
+# 用户相关模型
+user_register_model = ns.model('UserRegister', {
+    'username': fields.String(required=True, description='用户名', min_length=3),
+    'email': fields.String(required=True, description='邮箱地址'),
+    'password': fields.String(required=True, description='密码', min_length=6),
+    'phone': fields.String(description='手机号'),
+    'real_name': fields.String(description='真实姓名')
+})
+
+user_login_model = ns.model('UserLogin', {
+    'username': fields.String(required=True, description='用户名'),
+    'password': fields.String(required=True, description='密码')
+})
+
+password_change_model = ns.model('PasswordChange', {
+    'old_password': fields.String(required=True, description='原密码'),
+    'new_password': fields.String(required=True, description='新密码', min_length=6)
+})
+
+user_profile_model = ns.model('UserProfile', {
+    'phone': fields.String(description='手机号'),
+    'real_name': fields.String(description='真实姓名'),
+    'gender': fields.String(enum=['male', 'female', 'other'], description='性别'),
+    'birth_date': fields.Date(description='出生日期'),
+    'avatar': fields.String(description='头像URL')
+})
+
+# 密码哈希 (进程池)
+password_hasher = PasswordHasher(
+    settings['PASSWORD_HASH_METHOD'],
+    max_workers=settings['PASSWORD_HASH_WORKERS'],
+    max_pending=settings['PASSWORD_HASH_MAX_PENDING'],
+    queue_timeout=settings['PASSWORD_HASH_QUEUE_TIMEOUT']
+)
+
+# 用户认证命名空间
+@ns.route('/register')
+class UserRegister(Resource):
+    @ns.expect(user_register_model)
+    @ns.response(201, '用户创建成功')
+    @ns.response(400, '缺少必要字段')
+    @ns.response(409, '用户名或邮箱已存在')
+    @ns.response(429, '请求过于频繁')
+    @rate_limit('register', by='ip')
+    def post(self):
+        data = request.get_json()
+        username = data.get('username')
+        password = data.get('password')
+        email = data.get('email')
+        phone = data.get('phone')
+        real_name = data.get('real_name')
+
+        if not username or not password or not email:
+            return jsonify({'msg': '缺少用户名、密码或邮箱'}), 400
+
+        if User.query.filter_by(username=username).first() or User.query.filter_by(email=email).first():
+            return jsonify({'msg': '用户名或邮箱已存在'}), 409
+
+        hashed_password = password_hasher.hash(password)
+        new_user = User(
+            username=username,
+            password=hashed_password,
+            email=email,
+            phone=phone,
+            real_name=real_name
+        )
+        db.session.add(new_user)
+        db.session.commit()
+
+        return jsonify({'msg': '用户创建成功', 'user_id': new_user.id}), 201
+
+@ns.route('/login')
+class UserLogin(Resource):
+    @ns.expect(user_login_model)
+    @ns.response(200, '登录成功')
+    @ns.response(401, '用户名或密码错误')
+    @ns.response(429, '请求过于频繁')
+    @rate_limit('login', by='ip')
+    def post(self):
+        data = request.get_json()
+        username = data.get('username')
+        password = data.get('password')
+
+        user = User.query.filter_by(username=username).first()
+        if user:
+            valid, new_hash = password_hasher.verify_and_update(user.password, password)
+        else:
+            valid, new_hash = False, None
+        if valid and user.is_active:
+            if new_hash:
+                # 哈希参数已调整，借登录时的明文密码升级
+                user.password = new_hash
+                db.session.commit()
+            return jsonify(dict(issue_tokens(user.id, user.role), user=user.to_dict())), 200
+        else:
+            return jsonify({'msg': '用户名或密码错误'}), 401
+
+@ns.route('/refresh')
+class TokenRefresh(Resource):
+    @jwt_required(refresh=True)
+    @ns.response(200, '刷新成功')
+    @ns.response(401, 'Refresh token无效或已吊销')
+    def post(self):
+        """使用refresh token换取新的token对 (旧refresh token随即失效)"""
+        revoke_token(get_jwt())
+        return jsonify(issue_tokens(current_user.id, current_user.role)), 200
+
+@ns.route('/logout')
+class UserLogout(Resource):
+    @jwt_required(verify_type=False)
+    @ns.response(200, '已退出登录')
+    def post(self):
+        """退出登录，吊销当前token (请求体可附带refresh_token一并吊销)"""
+        revoke_token(get_jwt())
+        refresh_token = (request.get_json(silent=True) or {}).get('refresh_token')
+        if refresh_token:
+            try:
+                refresh_data = decode_token(refresh_token)
+            except Exception:
+                refresh_data = None
+            if refresh_data and refresh_data['sub'] == str(current_user.id):
+                revoke_token(refresh_data)
+        return jsonify({'msg': '已退出登录'}), 200
+
+@ns.route('/password')
+class UserPassword(Resource):
+    @jwt_required()
+    @ns.expect(password_change_model)
+    @ns.response(200, '修改成功')
+    @ns.response(400, '原密码错误')
+    def put(self):
+        """修改密码，此前签发的全部token失效"""
+        data = request.get_json() or {}
+        new_password = data.get('new_password') or ''
+        if len(new_password) < 6:
+            return jsonify({'msg': '新密码至少6位'}), 400
+
+        user = db.session.get(User, current_user.id)
+        if not password_hasher.verify(user.password, data.get('old_password') or ''):
+            return jsonify({'msg': '原密码错误'}), 400
+
+        user.password = password_hasher.hash(new_password)
+        db.session.commit()
+
+        # JWT的iat精确到秒，以当前整秒为界，随后签发的新token不受影响
+        now = time.time()
+        refresh_expires = current_app.config['JWT_REFRESH_TOKEN_EXPIRES'].total_seconds()
+        revocation_list.revoke_user(user.id, int(now), now + refresh_expires)
+        revoke_token(get_jwt())
+        return jsonify(dict(issue_tokens(user.id, user.role), msg='密码修改成功')), 200
+
+@ns.route('/profile')
+class UserProfile(Resource):
+    @jwt_required()
+    @ns.response(200, '获取成功')
+    def get(self):
+        current_user_id = current_user.id
+        user = User.query.get(current_user_id)
+        if not user:
+            return jsonify({'msg': '用户不存在'}), 404
+
+        return jsonify({'user': user.to_dict()}), 200
+
+    @jwt_required()
+    @ns.expect(user_profile_model)
+    @ns.response(200, '更新成功')
+    def put(self):
+        current_user_id = current_user.id
+        user = User.query.get(current_user_id)
+        if not user:
+            return jsonify({'msg': '用户不存在'}), 404
+
+        data = request.get_json()
+        if 'avatar' in data:
+            replace_upload(user.avatar, data['avatar'])
+        for field in ['phone', 'real_name', 'gender', 'birth_date', 'avatar']:
+            if field in data:
+                setattr(user, field, data[field])
+
+        user.updated_at = datetime.utcnow()
+        db.session.commit()
+
+        return jsonify({'msg': '用户信息更新成功', 'user': user.to_dict()}), 200
@@ -0,0 +1,42 @@
+"""
+芝栖养生平台 - 实体体验基地 (/bases/)
+"""
+
+
+from flask import jsonify
+from flask_restx import Namespace, Resource
+
+from models import ExperienceBase, BasePackage, serializer, list_projection
+from services import read_replica
+from domains.files import with_images_srcset
+
+ns = Namespace('bases', description='实体体验基地相关接口')
+
+# 实体体验基地命名空间
+@ns.route('/')
+class BaseList(Resource):
+    @ns.response(200, '获取成功')
+    @read_replica
+    def get(self):
+        """获取基地列表"""
+        encode, options = list_projection(ExperienceBase)
+        bases = ExperienceBase.query.options(*options).filter_by(is_active=True).all()
+        result = with_images_srcset([encode(base) for base in bases])
+
+        return jsonify({'bases': result}), 200
+
+@ns.route('/<int:base_id>')
+class BaseResource(Resource):
+    @ns.response(200, '获取成功')
+    @ns.response(404, '基地不存在')
+    def get(self, base_id):
+        """获取基地详情"""
+        base = ExperienceBase.query.get(base_id)
+        if not base:
+            return jsonify({'msg': '基地不存在'}), 404
+
+        packages = BasePackage.query.filter_by(base_id=base_id, is_available=True).all()
+
+        result = serializer.dump(base, 'detail')
+        result['packages'] = serializer.dump_many(packages, 'card')
+        return jsonify(result), 200
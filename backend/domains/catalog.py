@@ -0,0 +1,74 @@
+"""
+芝栖养生平台 - 产品目录 (/products/)
+"""
+
+
+from flask import request, jsonify
+from flask_restx import Namespace, Resource, fields
+
+from models import Product, serializer, list_projection
+from services import read_replica
+from domains.files import with_images_srcset
+
+ns = Namespace('products', description='产品管理相关接口')
+
+# 产品相关模型
+product_model = ns.model('Product', {
+    'name': fields.String(required=True, description='产品名称'),
+    'category': fields.String(required=True, enum=['lingzhi', 'tea', 'spore', 'gift', 'subscription'], description='产品分类'),
+    'description': fields.String(description='产品描述'),
+    'price': fields.Float(required=True, description='价格'),
+    'original_price': fields.Float(description='原价'),
+    'stock_quantity': fields.Integer(description='库存数量'),
+    'sku': fields.String(description='SKU'),
+    'images': fields.List(fields.String, description='产品图片'),
+    'specifications': fields.Raw(description='产品规格'),
+    'trace_code': fields.String(description='溯源码'),
+    'is_featured': fields.Boolean(description='是否精选'),
+    'weight': fields.Float(description='重量(kg)')
+})
+
+# 产品管理命名空间
+@ns.route('/')
+class ProductList(Resource):
+    @ns.response(200, '获取成功')
+    @read_replica
+    def get(self):
+        """获取产品列表"""
+        page = request.args.get('page', 1, type=int)
+        per_page = request.args.get('per_page', 12, type=int)
+        category = request.args.get('category')
+        is_featured = request.args.get('featured', type=bool)
+        search = request.args.get('search')
+
+        encode, options = list_projection(Product)
+        query = Product.query.options(*options).filter_by(is_available=True)
+
+        if category:
+            query = query.filter_by(category=category)
+        if is_featured:
+            query = query.filter_by(is_featured=True)
+        if search:
+            query = query.filter(Product.name.contains(search) | Product.description.contains(search))
+
+        products = query.order_by(Product.created_at.desc()).paginate(page=page, per_page=per_page)
+        result = with_images_srcset([encode(product) for product in products.items])
+
+        return jsonify({
+            'products': result,
+            'total': products.total,
+            'pages': products.pages,
+            'current_page': page
+        }), 200
+
+@ns.route('/<int:product_id>')
+class ProductResource(Resource):
+    @ns.response(200, '获取成功')
+    @ns.response(404, '产品不存在')
+    def get(self, product_id):
+        """获取产品详情"""
+        product = Product.query.get(product_id)
+        if not product:
+            return jsonify({'msg': '产品不存在'}), 404
+
+        return jsonify(serializer.dump(product, 'detail')), 200
@@ -0,0 +1,184 @@
+"""
+芝栖养生平台 - 内容管理 (/content/): 文章、视频与养生知识
+"""
+
+from datetime import datetime
+
+from flask import request, jsonify
+from flask_jwt_extended import jwt_required, current_user
+from flask_restx import Namespace, Resource, fields
+
+from extensions import db
+from models import Content, serializer, list_projection
+from services import rate_limit, read_replica
+from domains.files import acquire_upload, image_srcsets, release_upload, replace_upload
+
+ns = Namespace('content', description='内容管理相关接口')
+
+# 内容相关模型
+content_model = ns.model('Content', {
+    'title': fields.String(required=True, description='标题'),
+    'content_type': fields.String(required=True, enum=['article', 'video', 'knowledge', 'vlog'], description='内容类型'),
+    'summary': fields.String(description='摘要'),
+    'content': fields.String(description='内容'),
+    'category': fields.String(description='分类'),
+    'tags': fields.List(fields.String, description='标签'),
+    'cover_image': fields.String(description='封面图片'),
+    'video_url': fields.String(description='视频URL'),
+    'reading_time': fields.Integer(description='阅读时间(分钟)'),
+    'status': fields.String(enum=['draft', 'published', 'archived'], description='状态')
+})
+
+# 内容管理命名空间
+@ns.route('/')
+class ContentList(Resource):
+    @ns.response(200, '获取成功')
+    @read_replica
+    def get(self):
+        """获取内容列表"""
+        page = request.args.get('page', 1, type=int)
+        per_page = request.args.get('per_page', 10, type=int)
+        content_type = request.args.get('type')
+        category = request.args.get('category')
+        status = request.args.get('status', 'published')
+
+        encode, options = list_projection(Content)
+        query = Content.query.options(*options)
+
+        if content_type:
+            query = query.filter_by(content_type=content_type)
+        if category:
+            query = query.filter_by(category=category)
+        if status:
+            query = query.filter_by(status=status)
+
+        contents = query.order_by(Content.created_at.desc()).paginate(page=page, per_page=per_page)
+
+        result = [encode(content) for content in contents.items]
+        srcsets = image_srcsets(item.get('cover_image') for item in result)
+        for item in result:
+            if 'cover_image' in item:
+                item['cover_image_srcset'] = srcsets.get(item['cover_image'])
+
+        return jsonify({
+            'contents': result,
+            'total': contents.total,
+            'pages': contents.pages,
+            'current_page': page
+        }), 200
+
+    @jwt_required()
+    @ns.expect(content_model)
+    @ns.response(201, '内容创建成功')
+    def post(self):
+        """创建内容"""
+        current_user_id = current_user.id
+        data = request.get_json()
+
+        new_content = Content(
+            title=data['title'],
+            content_type=data['content_type'],
+            summary=data.get('summary'),
+            content=data.get('content'),
+            author_id=current_user_id,
+            category=data.get('category'),
+            tags=data.get('tags', []),
+            cover_image=data.get('cover_image'),
+            video_url=data.get('video_url'),
+            reading_time=data.get('reading_time'),
+            status=data.get('status', 'draft')
+        )
+        acquire_upload(new_content.cover_image)
+        acquire_upload(new_content.video_url)
+
+        db.session.add(new_content)
+        db.session.commit()
+
+        return jsonify({'msg': '内容创建成功', 'content_id': new_content.id}), 201
+
+@ns.route('/<int:content_id>')
+class ContentResource(Resource):
+    @ns.response(200, '获取成功')
+    @ns.response(404, '内容不存在')
+    def get(self, content_id):
+        """获取内容详情"""
+        content = Content.query.get(content_id)
+        if not content:
+            return jsonify({'msg': '内容不存在'}), 404
+
+        # 增加浏览量
+        content.views_count += 1
+        db.session.commit()
+
+        return jsonify(serializer.dump(content, 'detail')), 200
+
+    @jwt_required()
+    @ns.expect(content_model)
+    @ns.response(200, '更新成功')
+    @ns.response(403, '无权限')
+    @ns.response(404, '内容不存在')
+    def put(self, content_id):
+        """更新内容"""
+        current_user_id = current_user.id
+        content = Content.query.get(content_id)
+
+        if not content:
+            return jsonify({'msg': '内容不存在'}), 404
+
+        if content.author_id != current_user_id:
+            return jsonify({'msg': '无权限修改此内容'}), 403
+
+        data = request.get_json()
+        for field in ['cover_image', 'video_url']:
+            if field in data:
+                replace_upload(getattr(content, field), data[field])
+        for field in ['title', 'content_type', 'summary', 'content', 'category', 'tags',
+                     'cover_image', 'video_url', 'reading_time', 'status']:
+            if field in data:
+                setattr(content, field, data[field])
+
+        content.updated_at = datetime.utcnow()
+        db.session.commit()
+
+        return jsonify({'msg': '内容更新成功'}), 200
+
+    @jwt_required()
+    @ns.response(200, '删除成功')
+    @ns.response(403, '无权限')
+    @ns.response(404, '内容不存在')
+    def delete(self, content_id):
+        """删除内容"""
+        current_user_id = current_user.id
+        content = Content.query.get(content_id)
+
+        if not content:
+            return jsonify({'msg': '内容不存在'}), 404
+
+        if content.author_id != current_user_id:
+            return jsonify({'msg': '无权限删除此内容'}), 403
+
+        release_upload(content.cover_image)
+        release_upload(content.video_url)
+        db.session.delete(content)
+        db.session.commit()
+
+        return jsonify({'msg': '内容删除成功'}), 200
+
+@ns.route('/<int:content_id>/like')
+class ContentLike(Resource):
+    @jwt_required()
+    @ns.response(200, '操作成功')
+    @rate_limit('like')
+    def post(self, content_id):
+        """点赞/取消点赞内容"""
+        current_user_id = current_user.id
+        content = Content.query.get(content_id)
+
+        if not content:
+            return jsonify({'msg': '内容不存在'}), 404
+
+        # 这里可以添加点赞记录逻辑
+        content.likes_count += 1
+        db.session.commit()
+
+        return jsonify({'msg': '点赞成功', 'likes_count': content.likes_count}), 200
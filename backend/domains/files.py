@@ -0,0 +1,460 @@
+"""
+芝栖养生平台 - 文件上传与访问
+首页、上传/分片上传/预签名直传接口与 /uploads/ 文件访问，所有部署角色都注册
+"""
+
+import os
+import mimetypes
+from datetime import datetime, timedelta
+from urllib.parse import quote
+
+import click
+from flask import Blueprint, current_app, request, jsonify, send_from_directory, abort, redirect, Response
+from flask_jwt_extended import jwt_required, current_user
+from sqlalchemy.exc import IntegrityError
+
+from storage import create_storage, sha256_hex_to_base64
+from uploads import ChunkedUploadManager, ContentAddressedStore, UploadError, is_sha256_hex
+from images import DerivativeGenerator, build_srcset
+from config import settings, ALLOWED_EXTENSIONS
+from extensions import db, background_context
+from models import UploadBlob
+from services import rate_limit
+
+
+def allowed_file(filename):
+    """检查文件类型是否允许"""
+    return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
+
+
+def file_extension(filename):
+    return filename.rsplit('.', 1)[1].lower()
+
+
+# 内容寻址上传存储
+upload_store = ContentAddressedStore(
+    create_storage(settings),
+    os.path.join(settings['UPLOAD_FOLDER'], '.tmp')
+)
+
+
+def register_upload(sha256, extension, size):
+    """登记上传的内容，内容已存在时只刷新时间；上传本身不占引用
+    刚上传的文件在回收宽限期内保留，保存到头像、封面等字段时再由 acquire_upload 登记引用"""
+    values = {UploadBlob.updated_at: datetime.utcnow()}
+    if not UploadBlob.query.filter_by(sha256=sha256).update(values, synchronize_session=False):
+        db.session.add(UploadBlob(sha256=sha256, extension=extension, size=size, ref_count=0))
+        try:
+            db.session.commit()
+        except IntegrityError:
+            # 并发上传了相同内容
+            db.session.rollback()
+            UploadBlob.query.filter_by(sha256=sha256).update(values, synchronize_session=False)
+            db.session.commit()
+    else:
+        db.session.commit()
+    return db.session.get(UploadBlob, sha256)
+
+
+def store_upload(tmp_path, sha256, extension, size):
+    """登记后把已接收的文件放入存储，返回UploadBlob
+    先登记再放入: 刷新时间后回收任务不会再删除该内容，回收任务恰好刚删除了旧文件时这里会重新写入"""
+    try:
+        blob = register_upload(sha256, extension, size)
+    except Exception:
+        os.remove(tmp_path)
+        raise
+    # 相同内容已以其他扩展名保存时丢弃新文件
+    upload_store.put_file(tmp_path, sha256, blob.extension)
+    schedule_derivatives(blob)
+    return blob
+
+
+def acquire_existing_upload(sha256, extension, size):
+    """客户端预先提供哈希时，内容已存储则直接登记 (无需再次上传)，返回UploadBlob，需要上传时返回None
+    声明的大小与扩展名必须与已存内容一致；登记后再确认文件仍存在 (可能刚被回收任务删除)"""
+    blob = db.session.get(UploadBlob, sha256)
+    if blob is None or blob.size != size or blob.extension != extension:
+        return None
+    blob = register_upload(sha256, extension, size)
+    if not upload_store.exists(blob.name):
+        return None
+    return blob
+
+
+def record_derivatives(sha256, widths):
+    """记录已生成的衍生图宽度 (进程池回调线程中执行)"""
+    with background_context():
+        UploadBlob.query.filter_by(sha256=sha256).update({UploadBlob.variants: widths}, synchronize_session=False)
+        db.session.commit()
+
+
+derivative_generator = DerivativeGenerator(
+    upload_store,
+    settings['IMAGE_DERIVATIVE_WIDTHS'],
+    max_workers=settings['IMAGE_DERIVATIVE_WORKERS'],
+    on_complete=record_derivatives
+)
+
+
+def schedule_derivatives(blob):
+    """尚未生成衍生图的图片提交后台生成缩略图 (重复生成只会覆盖相同文件)"""
+    if blob.variants is None:
+        derivative_generator.submit(blob.name, blob.sha256)
+
+
+def parse_upload_url(url):
+    """从 /uploads/... URL 解析 (sha256, 扩展名)，非内容寻址的URL返回None"""
+    if not isinstance(url, str) or not url.startswith('/uploads/'):
+        return None
+    return ContentAddressedStore.parse_name(url[len('/uploads/'):])
+
+
+def image_srcsets(urls):
+    """批量查询衍生图，返回 {url: {'webp': srcset, 'jpeg': srcset}}，一页数据只查询一次"""
+    urls_by_sha = {}
+    for url in urls:
+        parsed = parse_upload_url(url)
+        if parsed is not None:
+            urls_by_sha.setdefault(parsed[0], set()).add(url)
+    if not urls_by_sha:
+        return {}
+
+    rows = db.session.query(UploadBlob.sha256, UploadBlob.variants)\
+        .filter(UploadBlob.sha256.in_(list(urls_by_sha))).all()
+    srcsets = {}
+    for sha256, variants in rows:
+        if variants:
+            for url in urls_by_sha[sha256]:
+                srcsets[url] = build_srcset(url, variants)
+    return srcsets
+
+
+def with_images_srcset(items):
+    """为已序列化的列表项附加 images_srcset (未选择images字段时跳过)"""
+    srcsets = image_srcsets(url for item in items for url in item.get('images', ()))
+    for item in items:
+        if 'images' in item:
+            item['images_srcset'] = [srcsets.get(url) for url in item['images']]
+    return items
+
+
+def acquire_upload(url):
+    """登记一次上传引用 (URL保存到头像、封面等字段时调用，由调用方与其他修改在同一事务中提交)，非内容寻址的URL忽略
+    内容未上传或已被回收时抛出UploadError"""
+    parsed = parse_upload_url(url)
+    if parsed is None:
+        return False
+    sha256, extension = parsed
+    updated = UploadBlob.query.filter_by(sha256=sha256, extension=extension).update(
+        {UploadBlob.ref_count: UploadBlob.ref_count + 1, UploadBlob.updated_at: datetime.utcnow()},
+        synchronize_session=False
+    )
+    if not updated:
+        raise UploadError('文件不存在或已过期，请重新上传')
+    return True
+
+
+def release_upload(url):
+    """释放一次上传引用 (头像、封面等被替换或删除时调用)，非内容寻址的URL忽略"""
+    parsed = parse_upload_url(url)
+    if parsed is None:
+        return False
+    updated = UploadBlob.query.filter(UploadBlob.sha256 == parsed[0], UploadBlob.ref_count > 0).update(
+        {UploadBlob.ref_count: UploadBlob.ref_count - 1, UploadBlob.updated_at: datetime.utcnow()},
+        synchronize_session=False
+    )
+    return bool(updated)
+
+
+def replace_upload(old_url, new_url):
+    """字段值由 old_url 改为 new_url: 先登记新引用再释放旧引用，值未变化时不处理"""
+    if old_url == new_url:
+        return
+    acquire_upload(new_url)
+    release_upload(old_url)
+
+
+def sweep_unreferenced_uploads(batch_size=100, grace_seconds=3600, max_batches=None):
+    """分批删除引用计数归零且超过宽限期的文件，返回删除数量"""
+    cutoff = datetime.utcnow() - timedelta(seconds=grace_seconds)
+    removed = 0
+    batches = 0
+    while max_batches is None or batches < max_batches:
+        candidates = UploadBlob.query.filter(UploadBlob.ref_count <= 0, UploadBlob.updated_at < cutoff)\
+            .order_by(UploadBlob.updated_at).limit(batch_size).all()
+        if not candidates:
+            break
+        batches += 1
+
+        shas = [blob.sha256 for blob in candidates]
+        db.session.expire_all()
+        for sha in shas:
+            # 逐条加行锁重新确认未被引用且未被刷新，文件与记录在同一事务中删除:
+            # 同时登记相同内容的 register_upload 会等待该事务提交后再插入新记录，之后由上传方重新写入文件；
+            # 同时引用该内容的 acquire_upload 找不到记录，请求失败
+            blob = UploadBlob.query.filter(UploadBlob.sha256 == sha, UploadBlob.ref_count <= 0,
+                                           UploadBlob.updated_at < cutoff).with_for_update().first()
+            if blob is None:
+                # 期间被重新引用
+                db.session.commit()
+                continue
+            upload_store.delete(blob.name)
+            derivative_generator.delete(blob.name, blob.variants)
+            db.session.delete(blob)
+            db.session.commit()
+            removed += 1
+        if len(candidates) < batch_size:
+            break
+    return removed
+
+
+# 首页与文件上传等非RESTX路由
+bp = Blueprint('files', __name__, cli_group=None)
+
+
+@bp.route('/')
+def hello_world():
+    return '芝栖养生平台 - Flask Backend!'
+
+
+# 工具函数路由
+@bp.route('/api/upload', methods=['POST'])
+@jwt_required()
+@rate_limit('upload')
+def upload_file():
+    """文件上传接口"""
+    if 'file' not in request.files:
+        return jsonify({'error': 'No file part'}), 400
+
+    file = request.files['file']
+    if file.filename == '':
+        return jsonify({'error': 'No selected file'}), 400
+
+    if file and allowed_file(file.filename):
+        # 边写入边计算哈希，相同内容只保存一份
+        tmp_path, sha256, size = upload_store.receive_stream(file.stream)
+        blob = store_upload(tmp_path, sha256, file_extension(file.filename), size)
+
+        # 返回文件URL
+        return jsonify({'url': blob.url, 'filename': blob.name, 'sha256': sha256}), 200
+
+    return jsonify({'error': 'File type not allowed'}), 400
+
+
+@bp.route('/uploads/<path:filename>')
+def uploaded_file(filename):
+    """获取上传的文件 (支持Range断点/拖动播放与条件请求)"""
+    # 不对外提供 .partial / .tmp 等内部目录
+    if any(part.startswith('.') for part in filename.split('/')):
+        abort(404)
+
+    # 内容寻址文件: 文件名即强ETag，且内容永不变化
+    immutable = ContentAddressedStore.content_hash(filename) is not None
+    accel_prefix = current_app.config['UPLOAD_ACCEL_REDIRECT_PREFIX']
+
+    remote_url = upload_store.storage.url(filename)
+    if remote_url:
+        # 对象存储: 重定向到CDN/预签名地址，文件内容不经过worker
+        response = redirect(remote_url)
+        if not upload_store.storage.public_url:
+            # 预签名地址会过期，重定向本身只短暂缓存
+            response.cache_control.private = True
+            response.cache_control.max_age = current_app.config['S3_PRESIGN_EXPIRES'] // 2
+            return response
+    elif accel_prefix:
+        response = Response(mimetype=mimetypes.guess_type(filename)[0] or 'application/octet-stream')
+        if immutable:
+            # 与直接发送时相同的强ETag，nginx透传该头；条件请求在这里直接返回304，不再交给nginx读文件
+            etag = filename.rsplit('/', 1)[-1]
+            response.set_etag(etag)
+        if immutable and etag in request.if_none_match:
+            response.status_code = 304
+        else:
+            response.headers['X-Accel-Redirect'] = accel_prefix.rstrip('/') + '/' + quote(filename)
+    else:
+        response = send_from_directory(
+            upload_store.storage.root,
+            filename,
+            etag=filename.rsplit('/', 1)[-1] if immutable else True,
+            max_age=current_app.config['UPLOAD_IMMUTABLE_MAX_AGE'] if immutable else None
+        )
+
+    if immutable:
+        response.cache_control.public = True
+        response.cache_control.max_age = current_app.config['UPLOAD_IMMUTABLE_MAX_AGE']
+        response.cache_control.immutable = True
+    return response
+
+
+# 分片上传 (断点续传)
+chunked_uploads = ChunkedUploadManager(
+    settings['UPLOAD_FOLDER'],
+    settings['UPLOAD_MAX_FILE_SIZE'],
+    session_ttl=settings['UPLOAD_SESSION_TTL']
+)
+
+
+def chunked_upload_status(meta):
+    return {
+        'upload_id': meta['upload_id'],
+        'filename': meta['filename'],
+        'offset': meta['offset'],
+        'total_size': meta['total_size'],
+        'chunk_size': current_app.config['UPLOAD_CHUNK_SIZE']
+    }
+
+
+@bp.app_errorhandler(UploadError)
+def handle_upload_error(error):
+    return jsonify(error.to_dict()), error.status_code
+
+
+@bp.route('/api/upload/chunked', methods=['POST'])
+@jwt_required()
+def chunked_upload_init():
+    """创建分片上传会话"""
+    current_user_id = current_user.id
+    data = request.get_json() or {}
+    filename = data.get('filename', '')
+
+    if not filename or not allowed_file(filename):
+        return jsonify({'error': 'File type not allowed'}), 400
+    total_size = chunked_uploads.check_size(data.get('total_size'))
+
+    # 客户端预先提供哈希时，已存在的内容无需再次上传
+    sha256 = data.get('sha256')
+    if sha256:
+        sha256 = sha256.lower() if isinstance(sha256, str) else sha256
+        if not is_sha256_hex(sha256):
+            raise UploadError('sha256无效')
+        blob = acquire_existing_upload(sha256, file_extension(filename), total_size)
+        if blob is not None:
+            return jsonify({'url': blob.url, 'filename': blob.name, 'sha256': sha256, 'deduplicated': True}), 200
+
+    meta = chunked_uploads.create(current_user_id, filename, total_size)
+    return jsonify(chunked_upload_status(meta)), 201
+
+
+@bp.route('/api/upload/chunked/<upload_id>', methods=['GET'])
+@jwt_required()
+def chunked_upload_get(upload_id):
+    """查询分片上传进度"""
+    meta = chunked_uploads.status(upload_id, current_user.id)
+    return jsonify(chunked_upload_status(meta)), 200
+
+
+@bp.route('/api/upload/chunked/<upload_id>', methods=['PUT'])
+@jwt_required()
+def chunked_upload_append(upload_id):
+    """追加分片 (请求体为原始字节，offset为分片起始位置)"""
+    offset = request.args.get('offset', type=int)
+    if offset is None:
+        return jsonify({'msg': '缺少offset参数'}), 400
+
+    meta = chunked_uploads.append(upload_id, current_user.id, offset, request.stream)
+    return jsonify(chunked_upload_status(meta)), 200
+
+
+@bp.route('/api/upload/chunked/<upload_id>/complete', methods=['POST'])
+@jwt_required()
+def chunked_upload_complete(upload_id):
+    """完成分片上传"""
+    current_user_id = current_user.id
+    part_path, meta, sha256 = chunked_uploads.complete(upload_id, current_user_id)
+
+    blob = store_upload(part_path, sha256, file_extension(meta['filename']), meta['total_size'])
+    chunked_uploads.discard(upload_id)
+
+    return jsonify({
+        'url': blob.url,
+        'filename': blob.name,
+        'size': meta['total_size'],
+        'sha256': sha256
+    }), 200
+
+
+@bp.route('/api/upload/chunked/<upload_id>', methods=['DELETE'])
+@jwt_required()
+def chunked_upload_abort(upload_id):
+    """取消分片上传"""
+    chunked_uploads.discard(upload_id, current_user.id)
+    return jsonify({'msg': '上传已取消'}), 200
+
+
+# 预签名直传 (仅对象存储): 客户端直接把文件PUT到存储，worker只签发地址并登记结果
+def presigned_upload_target(data):
+    """校验直传请求，返回 (sha256, 扩展名, 大小)"""
+    filename = data.get('filename', '')
+    if not filename or not allowed_file(filename):
+        raise UploadError('File type not allowed')
+    sha256 = data.get('sha256')
+    sha256 = sha256.lower() if isinstance(sha256, str) else sha256
+    if not is_sha256_hex(sha256):
+        raise UploadError('sha256无效')
+    size = data.get('size')
+    if not isinstance(size, int) or size <= 0:
+        raise UploadError('文件大小无效')
+    if size > current_app.config['UPLOAD_MAX_FILE_SIZE']:
+        raise UploadError('文件过大', 413, max_file_size=current_app.config['UPLOAD_MAX_FILE_SIZE'])
+    return sha256, file_extension(filename), size
+
+
+@bp.route('/api/upload/presign', methods=['POST'])
+@jwt_required()
+def presigned_upload_init():
+    """申请预签名上传地址"""
+    if not getattr(upload_store.storage, 'supports_presigned_upload', False):
+        return jsonify({'msg': '当前存储后端不支持直传，请使用分片上传'}), 501
+
+    sha256, extension, size = presigned_upload_target(request.get_json() or {})
+    blob = acquire_existing_upload(sha256, extension, size)
+    if blob is not None:
+        return jsonify({'url': blob.url, 'filename': blob.name, 'sha256': sha256, 'deduplicated': True}), 200
+
+    name = ContentAddressedStore.blob_name(sha256, extension)
+    target = upload_store.storage.presign_upload(name, sha256)
+    return jsonify(dict(target, filename=name, sha256=sha256)), 201
+
+
+@bp.route('/api/upload/presign/complete', methods=['POST'])
+@jwt_required()
+def presigned_upload_complete():
+    """直传完成后登记文件 (以存储端的对象信息为准)"""
+    sha256, extension, _ = presigned_upload_target(request.get_json() or {})
+    name = ContentAddressedStore.blob_name(sha256, extension)
+    head = upload_store.storage.head(name)
+    if head is None:
+        raise UploadError('文件尚未上传', 409)
+    # 预签名时要求了校验和，存储端返回的摘要应与文件名一致
+    checksum = head.get('checksum_sha256')
+    if checksum and checksum != sha256_hex_to_base64(sha256):
+        raise UploadError('文件校验失败', 409)
+    if head['size'] > current_app.config['UPLOAD_MAX_FILE_SIZE']:
+        upload_store.delete(name)
+        raise UploadError('文件过大', 413, max_file_size=current_app.config['UPLOAD_MAX_FILE_SIZE'])
+
+    blob = register_upload(sha256, extension, head['size'])
+    if blob.name != name:
+        upload_store.delete(name)
+    elif not upload_store.exists(name):
+        # 登记前回收任务删除了同名对象
+        raise UploadError('文件尚未上传', 409)
+    schedule_derivatives(blob)
+    return jsonify({'url': blob.url, 'filename': blob.name, 'size': head['size'], 'sha256': sha256}), 200
+
+
+@bp.cli.command('cleanup-uploads')
+def cleanup_uploads_command():
+    """清理过期的分片上传会话"""
+    removed = chunked_uploads.cleanup_expired()
+    print(f'已清理 {removed} 个过期上传会话')
+
+
+@bp.cli.command('gc-uploads')
+@click.option('--batch-size', default=100, help='每批删除数量')
+@click.option('--grace', default=3600, help='引用归零后的保留时间(秒)')
+def gc_uploads_command(batch_size, grace):
+    """删除不再被引用的上传文件"""
+    removed = sweep_unreferenced_uploads(batch_size=batch_size, grace_seconds=grace)
+    print(f'已删除 {removed} 个未引用文件')
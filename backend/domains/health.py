@@ -0,0 +1,49 @@
+"""
+芝栖养生平台 - 健康检查接口
+/api/health 存活检查 (不访问数据库)，/api/health/ready 就绪检查 (结果缓存)，所有部署角色都注册
+"""
+
+from flask import Blueprint, Response, current_app
+
+from config import settings
+from extensions import db
+from health import ReadinessProbe, database_check, pool_check, writable_dir_check
+from replica import REPLICA_BIND
+from serializers import dumps
+
+bp = Blueprint('health', __name__)
+
+LIVENESS_BODY = dumps({'status': 'ok'})
+
+
+def readiness_checks():
+    """按当前应用的配置与引擎生成检查项 (配置了只读副本时同时检查副本)"""
+    capacity = current_app.config['DB_POOL_SIZE'] + current_app.config['DB_MAX_OVERFLOW']
+    max_latency_ms = current_app.config['HEALTH_DB_MAX_LATENCY_MS']
+    checks = {
+        'db_pool': lambda: pool_check(db.engine, capacity),
+        'database': lambda: database_check(db.engine, max_latency_ms),
+        'upload_dir': lambda: writable_dir_check(current_app.config['UPLOAD_FOLDER'])
+    }
+    if REPLICA_BIND in db.engines:
+        checks['replica_pool'] = lambda: pool_check(db.engines[REPLICA_BIND], capacity)
+        checks['replica'] = lambda: database_check(db.engines[REPLICA_BIND], max_latency_ms)
+    return checks
+
+
+readiness_probe = ReadinessProbe(readiness_checks, ttl=settings['HEALTH_CHECK_TTL'])
+
+
+@bp.route('/api/health')
+def liveness():
+    """存活检查: 进程能处理请求即返回200"""
+    return Response(LIVENESS_BODY, mimetype='application/json')
+
+
+@bp.route('/api/health/ready')
+def readiness():
+    """就绪检查: 任一检查失败返回503"""
+    ready, checks = readiness_probe.run()
+    body = dumps({'status': 'ready' if ready else 'unavailable', 'checks': checks})
+    return Response(body, status=200 if ready else 503, mimetype='application/json',
+                    headers={'Cache-Control': 'no-store'})
@@ -0,0 +1,26 @@
+"""
+芝栖养生平台 - 指标接口
+/metrics 输出Prometheus文本格式指标，抓取方需携带 Authorization: Bearer <METRICS_TOKEN>；
+未配置token时拒绝抓取 (本地开发可设置 METRICS_ALLOW_ANONYMOUS=1)，nginx配置中也拒绝该路径
+"""
+
+import hmac
+
+from flask import Blueprint, Response, current_app, request
+
+from services import request_metrics
+
+bp = Blueprint('metrics', __name__)
+
+
+@bp.route('/metrics')
+def export_metrics():
+    token = current_app.config['METRICS_TOKEN']
+    if not token:
+        if not current_app.config['METRICS_ALLOW_ANONYMOUS']:
+            # 后端端口可能被直接访问，未配置token时不公开连接池、路由与延迟等内部信息
+            return Response('METRICS_TOKEN not configured\n', status=403, mimetype='text/plain')
+    elif not hmac.compare_digest(request.headers.get('Authorization', ''), f'Bearer {token}'):
+        return Response('unauthorized\n', status=401, mimetype='text/plain')
+    body, content_type = request_metrics.export()
+    return Response(body, content_type=content_type, headers={'Cache-Control': 'no-store'})
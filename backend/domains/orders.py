@@ -0,0 +1,165 @@
+"""
+芝栖养生平台 - 订单管理 (/orders/)
+"""
+
+import json
+
+from flask import request, jsonify
+from flask_jwt_extended import jwt_required, current_user
+from flask_restx import Namespace, Resource, fields
+
+from extensions import db
+from models import Product, Activity, Order, OrderItem, UserActivity, list_projection
+from services import rate_limit, generate_order_number
+
+ns = Namespace('orders', description='订单管理相关接口')
+
+# 订单相关模型
+order_create_model = ns.model('OrderCreate', {
+    'order_type': fields.String(required=True, enum=['product', 'activity', 'accommodation', 'subscription'], description='订单类型'),
+    'items': fields.List(fields.Raw, required=True, description='订单项'),
+    'shipping_address': fields.Raw(description='收货地址'),
+    'contact_info': fields.Raw(description='联系信息'),
+    'notes': fields.String(description='备注')
+})
+
+# 订单管理命名空间
+@ns.route('/')
+class OrderList(Resource):
+    @jwt_required()
+    @ns.response(200, '获取成功')
+    def get(self):
+        """获取用户订单列表"""
+        current_user_id = current_user.id
+        page = request.args.get('page', 1, type=int)
+        per_page = request.args.get('per_page', 10, type=int)
+        order_type = request.args.get('type')
+        status = request.args.get('status')
+
+        encode, options = list_projection(Order)
+        query = Order.query.options(*options).filter_by(user_id=current_user_id)
+
+        if order_type:
+            query = query.filter_by(order_type=order_type)
+        if status:
+            query = query.filter_by(order_status=status)
+
+        orders = query.order_by(Order.created_at.desc()).paginate(page=page, per_page=per_page)
+
+        return jsonify({
+            'orders': [encode(order) for order in orders.items],
+            'total': orders.total,
+            'pages': orders.pages,
+            'current_page': page
+        }), 200
+
+    @jwt_required()
+    @ns.expect(order_create_model)
+    @ns.response(201, '订单创建成功')
+    @rate_limit('order_create')
+    def post(self):
+        """创建订单"""
+        current_user_id = current_user.id
+        data = request.get_json()
+
+        order_type = data['order_type']
+        items_data = data['items']
+
+        # 计算订单总金额
+        total_amount = 0.0
+        platform_fee = 0.0
+        order_items = []
+
+        for item_data in items_data:
+            if order_type == 'product':
+                product = Product.query.get(item_data['product_id'])
+                if not product or not product.is_available:
+                    return jsonify({'msg': f'产品 {item_data["product_id"]} 不存在或已下架'}), 400
+
+                quantity = item_data.get('quantity', 1)
+                unit_price = float(product.price)
+                total_price = unit_price * quantity
+
+                order_items.append({
+                    'item_type': 'product',
+                    'item_id': product.id,
+                    'quantity': quantity,
+                    'unit_price': unit_price,
+                    'total_price': total_price,
+                    'item_snapshot': {
+                        'name': product.name,
+                        'image': product.images[0] if product.images else None
+                    }
+                })
+
+            elif order_type == 'activity':
+                activity = Activity.query.get(item_data['activity_id'])
+                if not activity or activity.status != 'published':
+                    return jsonify({'msg': f'活动 {item_data["activity_id"]} 不存在或未发布'}), 400
+
+                # 检查是否已经报名
+                existing = UserActivity.query.filter_by(
+                    user_id=current_user_id,
+                    activity_id=activity.id
+                ).first()
+                if existing:
+                    return jsonify({'msg': '您已经报名此活动'}), 400
+
+                unit_price = float(activity.price)
+                platform_fee_rate = float(activity.platform_fee_rate)
+                platform_fee_item = unit_price * platform_fee_rate
+
+                order_items.append({
+                    'item_type': 'activity',
+                    'item_id': activity.id,
+                    'quantity': 1,
+                    'unit_price': unit_price,
+                    'total_price': unit_price,
+                    'item_snapshot': {
+                        'title': activity.title,
+                        'start_time': activity.start_time.isoformat(),
+                        'location': activity.location
+                    }
+                })
+
+                platform_fee += platform_fee_item
+
+            total_amount += order_items[-1]['total_price']
+
+        # 创建订单
+        order = Order(
+            order_number=generate_order_number(),
+            user_id=current_user_id,
+            order_type=order_type,
+            total_amount=total_amount,
+            platform_fee=platform_fee,
+            shipping_address=data.get('shipping_address'),
+            contact_info=data.get('contact_info'),
+            notes=data.get('notes')
+        )
+
+        db.session.add(order)
+        db.session.flush()  # 获取订单ID
+
+        # 添加订单项
+        for item_data in order_items:
+            order_item = OrderItem(
+                order_id=order.id,
+                item_type=item_data['item_type'],
+                item_id=item_data['item_id'],
+                quantity=item_data['quantity'],
+                unit_price=item_data['unit_price'],
+                total_price=item_data['total_price'],
+                item_snapshot=json.dumps(item_data['item_snapshot'])
+            )
+            db.session.add(order_item)
+
+        db.session.commit()
+
+        return jsonify({
+            'msg': '订单创建成功',
+            'order_id': order.id,
+            'order_number': order.order_number,
+            'total_amount': float(total_amount),
+            'platform_fee': float(platform_fee)
+        }), 201
@@ -0,0 +1,75 @@
+"""
+芝栖养生平台 - 支付集成 (/payments/)
+"""
+
+from datetime import datetime
+
+from flask import request, jsonify
+from flask_jwt_extended import jwt_required, current_user
+from flask_restx import Namespace, Resource, fields
+
+from extensions import db
+from models import Order, Payment, UserActivity
+
+ns = Namespace('payments', description='支付相关接口')
+
+# 支付集成命名空间
+@ns.route('/create-payment')
+class CreatePayment(Resource):
+    @ns.expect(ns.model('PaymentRequest', {
+        'order_id': fields.Integer(required=True, description='订单ID'),
+        'payment_method': fields.String(required=True, enum=['wechat', 'alipay'], description='支付方式')
+    }))
+    @ns.response(200, '支付创建成功')
+    @ns.response(404, '订单不存在')
+    @jwt_required()
+    def post(self):
+        """创建支付"""
+        current_user_id = current_user.id
+        data = request.get_json()
+        order_id = data.get('order_id')
+        payment_method = data.get('payment_method', 'wechat')
+
+        order = Order.query.get(order_id)
+        if not order or order.user_id != current_user_id:
+            return jsonify({'msg': '订单不存在'}), 404
+
+        if order.payment_status == 'paid':
+            return jsonify({'msg': '订单已支付'}), 400
+
+        # 创建支付记录
+        payment = Payment(
+            order_id=order_id,
+            payment_method=payment_method,
+            amount=order.total_amount,
+            transaction_id=f'{payment_method}_{order_id}_{int(datetime.utcnow().timestamp())}'
+        )
+
+        db.session.add(payment)
+        db.session.commit()
+
+        # 模拟支付成功（实际项目中需要集成真实支付）
+        payment.payment_status = 'success'
+        order.payment_status = 'paid'
+        order.paid_at = datetime.utcnow()
+
+        if order.order_type == 'activity':
+            # 为活动订单创建参与记录
+            for item in order.items:
+                if item.item_type == 'activity':
+                    user_activity = UserActivity(
+                        user_id=current_user_id,
+                        activity_id=item.item_id,
+                        order_id=order.id,
+                        participation_status='registered'
+                    )
+                    db.session.add(user_activity)
+
+        db.session.commit()
+
+        return jsonify({
+            'msg': '支付成功',
+            'payment_id': payment.id,
+            'transaction_id': payment.transaction_id,
+            'amount': float(payment.amount)
+        }), 200
@@ -0,0 +1,109 @@
+"""
+芝栖养生平台 - 评论管理 (/reviews/)
+"""
+
+
+from flask import request, jsonify
+from flask_jwt_extended import jwt_required, current_user
+from flask_restx import Namespace, Resource, fields
+from sqlalchemy.orm import selectinload
+
+from extensions import db
+from models import User, Review, serializer
+from services import read_replica
+from domains.files import acquire_upload, image_srcsets
+
+ns = Namespace('reviews', description='评论管理相关接口')
+
+# 评论相关模型
+review_model = ns.model('Review', {
+    'target_type': fields.String(required=True, enum=['product', 'activity', 'content', 'base'], description='评论对象类型'),
+    'target_id': fields.Integer(required=True, description='评论对象ID'),
+    'rating': fields.Integer(required=True, min=1, max=5, description='评分(1-5)'),
+    'title': fields.String(description='评论标题'),
+    'comment': fields.String(description='评论内容'),
+    'images': fields.List(fields.String, description='评论图片'),
+    'is_anonymous': fields.Boolean(description='是否匿名')
+})
+
+# 评论管理命名空间
+@ns.route('/')
+class ReviewList(Resource):
+    @ns.response(200, '获取成功')
+    @read_replica
+    def get(self):
+        """获取评论列表"""
+        target_type = request.args.get('target_type')
+        target_id = request.args.get('target_id', type=int)
+        page = request.args.get('page', 1, type=int)
+        per_page = request.args.get('per_page', 10, type=int)
+
+        if not target_type or not target_id:
+            return jsonify({'msg': '需要指定评论对象类型和ID'}), 400
+
+        query = Review.query.options(
+            *serializer.load_options(Review, 'card'),
+            # 评论者批量加载且只读取review视图的列，避免逐条延迟加载 review.user
+            selectinload(Review.user).options(*serializer.load_options(User, 'review'))
+        ).filter_by(
+            target_type=target_type,
+            target_id=target_id,
+            status='approved'
+        )
+
+        reviews = query.order_by(Review.created_at.desc()).paginate(page=page, per_page=per_page)
+        srcsets = image_srcsets(review.user.avatar for review in reviews.items if not review.is_anonymous)
+
+        encode = serializer.encoder(Review, 'card')
+        encode_user = serializer.encoder(User, 'review')
+        result = []
+        for review in reviews.items:
+            item = encode(review)
+            item['user'] = None
+            if not review.is_anonymous:
+                item['user'] = encode_user(review.user)
+                item['user']['avatar_srcset'] = srcsets.get(review.user.avatar)
+            result.append(item)
+
+        return jsonify({
+            'reviews': result,
+            'total': reviews.total,
+            'pages': reviews.pages,
+            'current_page': page
+        }), 200
+
+    @jwt_required()
+    @ns.expect(review_model)
+    @ns.response(201, '评论提交成功')
+    def post(self):
+        """提交评论"""
+        current_user_id = current_user.id
+        data = request.get_json()
+
+        # 检查是否已经评论过
+        existing_review = Review.query.filter_by(
+            user_id=current_user_id,
+            target_type=data['target_type'],
+            target_id=data['target_id']
+        ).first()
+
+        if existing_review:
+            return jsonify({'msg': '您已经评论过此内容'}), 400
+
+        review = Review(
+            user_id=current_user_id,
+            target_type=data['target_type'],
+            target_id=data['target_id'],
+            rating=data['rating'],
+            title=data.get('title'),
+            comment=data.get('comment'),
+            images=data.get('images', []),
+            is_anonymous=data.get('is_anonymous', False)
+        )
+        for url in review.images or ():
+            acquire_upload(url)
+
+        db.session.add(review)
+        db.session.commit()
+
+        return jsonify({'msg': '评论提交成功', 'review_id': review.id}), 201
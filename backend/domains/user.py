@@ -0,0 +1,157 @@
+"""
+芝栖养生平台 - 用户中心 (/user/): 个人面板、收藏与实时事件
+"""
+
+
+from flask import current_app, request, jsonify, Response
+from flask_jwt_extended import jwt_required, current_user
+from flask_restx import Namespace, Resource
+
+from realtime import event_stream, user_channel
+from extensions import db
+from models import User, Content, Product, Activity, Order, Review, Favorite, UserActivity, serializer
+from services import event_broker
+
+ns = Namespace('user', description='用户中心相关接口')
+
+# 用户中心命名空间
+@ns.route('/dashboard')
+class UserDashboard(Resource):
+    @jwt_required()
+    @ns.response(200, '获取成功')
+    def get(self):
+        """获取用户仪表板数据"""
+        current_user_id = current_user.id
+        user = User.query.get(current_user_id)
+
+        # 获取各类统计数据
+        order_count = Order.query.filter_by(user_id=current_user_id).count()
+        activity_count = UserActivity.query.filter_by(user_id=current_user_id).count()
+        favorite_count = Favorite.query.filter_by(user_id=current_user_id).count()
+        review_count = Review.query.filter_by(user_id=current_user_id).count()
+
+        # 获取最近订单
+        recent_orders = Order.query.filter_by(user_id=current_user_id).order_by(Order.created_at.desc()).limit(5).all()
+
+        # 获取参与的活动
+        user_activities = UserActivity.query.filter_by(user_id=current_user_id).order_by(UserActivity.created_at.desc()).limit(5).all()
+
+        return jsonify({
+            'user': user.to_dict(),
+            'stats': {
+                'order_count': order_count,
+                'activity_count': activity_count,
+                'favorite_count': favorite_count,
+                'review_count': review_count
+            },
+            'recent_orders': serializer.dump_many(recent_orders, 'dashboard'),
+            'recent_activities': serializer.dump_many(user_activities, 'dashboard')
+        }), 200
+
+@ns.route('/favorites')
+class UserFavorites(Resource):
+    @jwt_required()
+    @ns.response(200, '获取成功')
+    def get(self):
+        """获取用户收藏"""
+        current_user_id = current_user.id
+        page = request.args.get('page', 1, type=int)
+        per_page = request.args.get('per_page', 12, type=int)
+        target_type = request.args.get('type')
+
+        query = Favorite.query.filter_by(user_id=current_user_id)
+        if target_type:
+            query = query.filter_by(target_type=target_type)
+
+        favorites = query.order_by(Favorite.created_at.desc()).paginate(page=page, per_page=per_page)
+
+        result = []
+        for favorite in favorites.items:
+            item_data = None
+            if favorite.target_type == 'product':
+                item_data = serializer.dump(Product.query.get(favorite.target_id), 'favorite')
+            elif favorite.target_type == 'activity':
+                item_data = serializer.dump(Activity.query.get(favorite.target_id), 'favorite')
+            elif favorite.target_type == 'content':
+                item_data = serializer.dump(Content.query.get(favorite.target_id), 'favorite')
+
+            if item_data:
+                result.append(dict(serializer.dump(favorite, 'card'), item=item_data))
+
+        return jsonify({
+            'favorites': result,
+            'total': favorites.total,
+            'pages': favorites.pages,
+            'current_page': page
+        }), 200
+
+    @jwt_required()
+    @ns.response(201, '收藏成功')
+    @ns.response(400, '已经收藏过')
+    def post(self):
+        """添加收藏"""
+        current_user_id = current_user.id
+        data = request.get_json()
+
+        target_type = data.get('target_type')
+        target_id = data.get('target_id')
+
+        if not target_type or not target_id:
+            return jsonify({'msg': '需要指定收藏对象类型和ID'}), 400
+
+        # 检查是否已经收藏
+        existing = Favorite.query.filter_by(
+            user_id=current_user_id,
+            target_type=target_type,
+            target_id=target_id
+        ).first()
+
+        if existing:
+            return jsonify({'msg': '已经收藏过此内容'}), 400
+
+        favorite = Favorite(
+            user_id=current_user_id,
+            target_type=target_type,
+            target_id=target_id
+        )
+
+        db.session.add(favorite)
+        db.session.commit()
+
+        return jsonify({'msg': '收藏成功', 'favorite_id': favorite.id}), 201
+
+@ns.route('/favorites/<int:favorite_id>')
+class UserFavoriteResource(Resource):
+    @jwt_required()
+    @ns.response(200, '取消收藏成功')
+    def delete(self, favorite_id):
+        """取消收藏"""
+        current_user_id = current_user.id
+        favorite = Favorite.query.get(favorite_id)
+
+        if not favorite or favorite.user_id != current_user_id:
+            return jsonify({'msg': '收藏记录不存在'}), 404
+
+        db.session.delete(favorite)
+        db.session.commit()
+
+        return jsonify({'msg': '取消收藏成功'}), 200
+
+@ns.route('/events')
+class UserEvents(Resource):
+    # EventSource 无法设置请求头，允许通过 ?jwt= 传递Token
+    @jwt_required(locations=['headers', 'query_string'])
+    @ns.response(200, '事件流 (text/event-stream)')
+    def get(self):
+        """订阅实时事件 (新通知、订单状态变化)"""
+        current_user_id = current_user.id
+        subscription = event_broker.subscribe(user_channel(current_user_id))
+        stream = event_stream(
+            subscription,
+            heartbeat=current_app.config['REALTIME_HEARTBEAT_SECONDS'],
+            max_duration=current_app.config['REALTIME_STREAM_MAX_SECONDS']
+        )
+        return Response(stream, mimetype='text/event-stream', headers={
+            'Cache-Control': 'no-cache',
+            'X-Accel-Buffering': 'no'
+        })
@@ -0,0 +1,65 @@
+"""
+芝栖养生平台 - 扩展实例
+db/jwt 在 create_app 中绑定应用，各领域模块从这里导入
+"""
+
+from flask_jwt_extended import JWTManager
+from flask_sqlalchemy import SQLAlchemy
+
+from compress import ResponseCompressor
+from config import settings
+from dbpool import PoolMetrics
+from replica import RoutingSession
+
+jwt = JWTManager()
+db = SQLAlchemy(session_options={'class_': RoutingSession})
+db_pool_metrics = PoolMetrics()
+db_replica_pool_metrics = PoolMetrics()
+
+response_compressor = ResponseCompressor(
+    preferred=[name.strip() for name in settings['COMPRESS_ALGORITHMS'].split(',') if name.strip()],
+    min_size=settings['COMPRESS_MIN_SIZE'],
+    cache_size=settings['COMPRESS_CACHE_SIZE']
+)
+
+# 吊销列表、限流、实时事件与写入记录的存储地址: memory:// (默认，进程内) 或 redis:// (多worker/多实例共享)
+REDIS_SCHEMES = ('redis://', 'rediss://', 'unix://')
+
+
+def redis_client(url):
+    """按URL创建Redis客户端 (redis包在使用时才导入)"""
+    import redis
+    return redis.Redis.from_url(url)
+
+
+def create_backend(url, local, shared, name):
+    """根据存储地址创建后端: memory:// 返回 local()，redis:// 返回 shared(Redis客户端)；name 用于错误信息"""
+    if not url or url.startswith('memory://'):
+        return local()
+    if url.startswith(REDIS_SCHEMES):
+        return shared(redis_client(url))
+    raise ValueError(f'不支持的{name}地址: {url}')
+
+# 后台线程 (审计日志写入、衍生图回调) 没有请求上下文，使用最先创建的应用
+_default_app = None
+
+
+def set_default_app(app):
+    global _default_app
+    if _default_app is None:
+        _default_app = app
+
+
+def background_context():
+    """后台线程使用的应用上下文"""
+    return _default_app.app_context()
+
+
+def dispose_engines(close=True):
+    """释放默认应用的主库与只读副本连接池
+    fork出的子进程传 close=False: 丢弃继承的连接而不关闭父进程仍在使用的socket"""
+    if _default_app is None:
+        return
+    with _default_app.app_context():
+        for engine in db.engines.values():
+            engine.dispose(close=close)
@@ -0,0 +1,107 @@
+"""
+芝栖养生平台 - gunicorn配置
+按CPU数与环境变量确定worker数量，preload应用后fork (copy-on-write共享已导入的模块)，
+fork后丢弃继承的数据库连接，worker退出前写完审计日志队列并关闭进程池
+
+用法:
+    gunicorn -c backend/gunicorn.conf.py app:app
+"""
+
+import os
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+from config import settings
+
+
+def available_cpus():
+    """容器可用的CPU数: 优先cgroup v2配额 (docker --cpus)，其次进程CPU亲和性"""
+    try:
+        with open('/sys/fs/cgroup/cpu.max') as f:
+            quota, period = f.read().split()
+        if quota != 'max':
+            return max(1, int(quota) // int(period))
+    except (OSError, ValueError):
+        pass
+    if hasattr(os, 'sched_getaffinity'):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:5000')
+
+# gthread: 每个worker GUNICORN_THREADS 个线程，SSE长连接只占用线程；sync: 每个worker同时只处理一个请求
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS', 'gthread')
+cpus = available_cpus()
+if worker_class == 'sync':
+    workers = int(os.environ.get('GUNICORN_WORKERS', 2 * cpus + 1))
+    threads = 1
+else:
+    workers = int(os.environ.get('GUNICORN_WORKERS', cpus + 1))
+    threads = int(os.environ.get('GUNICORN_THREADS', 8))
+
+# 在master中导入应用后再fork，worker共享只读内存页且启动更快；修改代码后需重启master
+preload_app = os.environ.get('GUNICORN_PRELOAD', '1') == '1'
+
+# sync worker处理单个请求超过timeout秒即被重启 (不适合SSE，sync模式需关闭实时推送或调小 REALTIME_STREAM_MAX_SECONDS)
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 30))
+graceful_timeout = int(os.environ.get('GUNICORN_GRACEFUL_TIMEOUT', 30))
+keepalive = int(os.environ.get('GUNICORN_KEEPALIVE', 5))  # nginx upstream keepalive 连接的空闲保持时间
+
+# 每个worker处理 max_requests (± jitter) 个请求后重启，限制内存增长且避免所有worker同时重启
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', 1000))
+max_requests_jitter = int(os.environ.get('GUNICORN_MAX_REQUESTS_JITTER', 100))
+
+# worker心跳文件放在内存文件系统，避免容器磁盘IO卡顿导致worker被误判超时
+if os.path.isdir('/dev/shm'):
+    worker_tmp_dir = '/dev/shm'
+
+accesslog = os.environ.get('GUNICORN_ACCESS_LOG') or None
+errorlog = '-'
+
+
+def on_starting(server):
+    # 多进程指标目录: 清除上次运行留下的mmap文件
+    metrics_dir = os.environ.get('PROMETHEUS_MULTIPROC_DIR')
+    if metrics_dir:
+        os.makedirs(metrics_dir, exist_ok=True)
+        for name in os.listdir(metrics_dir):
+            if name.endswith('.db'):
+                os.remove(os.path.join(metrics_dir, name))
+
+    pool_capacity = settings['DB_POOL_SIZE'] + settings['DB_MAX_OVERFLOW']
+    if threads > pool_capacity:
+        server.log.warning('GUNICORN_THREADS=%d 大于连接池容量 %d，并发请求将等待数据库连接', threads, pool_capacity)
+    server.log.info('workers=%d threads=%d worker_class=%s (可用CPU %d)，每个worker最多 %d 个数据库连接',
+                    workers, threads, worker_class, cpus, pool_capacity)
+
+
+def post_fork(server, worker):
+    """preload时master创建的连接池被复制到每个worker，丢弃后各自重新建立连接"""
+    if server.cfg.preload_app:
+        from extensions import dispose_engines
+        dispose_engines(close=False)
+
+
+def worker_exit(server, worker):
+    """worker退出 (max_requests重启、平滑重启、停止) 前写完缓冲的数据并释放资源"""
+    # 只处理已导入的模块，部署角色未启用的领域不会在退出时被导入
+    services = sys.modules.get('services')
+    if services is not None:
+        services.admin_log_writer.close()
+        services.sampling_profiler.sampler.flush()
+    for module_name, attr in (('domains.auth', 'password_hasher'), ('domains.files', 'derivative_generator')):
+        module = sys.modules.get(module_name)
+        if module is not None:
+            getattr(module, attr).shutdown()
+    if 'extensions' in sys.modules:
+        sys.modules['extensions'].dispose_engines()
+
+
+def child_exit(server, worker):
+    """master回收worker后删除其存活值指标文件"""
+    from metrics import mark_worker_dead
+    mark_worker_dead(worker.pid)
@@ -0,0 +1,87 @@
+"""
+芝栖养生平台 - 健康检查
+就绪检查 (连接池余量、数据库往返延迟、上传目录可写) 的结果缓存ttl秒，
+docker/负载均衡的频繁探针不会给数据库带来额外查询
+"""
+
+import logging
+import os
+import tempfile
+import threading
+import time
+
+from sqlalchemy import text
+from sqlalchemy.pool import QueuePool
+
+logger = logging.getLogger(__name__)
+
+
+class ReadinessProbe:
+    """按顺序执行各项检查并缓存结果
+    build_checks() 返回 {检查名: 检查函数}，在每次实际检查时调用 (可按当前应用的配置生成)；
+    检查函数返回附加信息dict (ok=False 表示未就绪)，抛出异常视为失败"""
+
+    def __init__(self, build_checks, ttl=5.0, clock=time.monotonic):
+        self.build_checks = build_checks
+        self.ttl = ttl
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._result = None
+        self._expires = 0.0
+
+    def run(self):
+        """返回 (是否就绪, {检查名: 结果})"""
+        result = self._result
+        if result is not None and self.clock() < self._expires:
+            return result
+        # 同一时间只有一个线程执行检查，其他探针直接返回上一次的结果 (首次检查时等待)
+        if not self._lock.acquire(blocking=result is None):
+            return result
+        try:
+            if self._result is not None and self.clock() < self._expires:
+                return self._result
+            checks = {name: self._run_check(name, check) for name, check in self.build_checks().items()}
+            self._result = (all(check['ok'] for check in checks.values()), checks)
+            self._expires = self.clock() + self.ttl
+            return self._result
+        finally:
+            self._lock.release()
+
+    @staticmethod
+    def _run_check(name, check):
+        started = time.perf_counter()
+        try:
+            detail = dict(check() or {})
+            detail.setdefault('ok', True)
+        except Exception as error:
+            # 只返回异常类型，连接串等细节只写日志
+            logger.warning('就绪检查 %s 失败', name, exc_info=True)
+            detail = {'ok': False, 'error': type(error).__name__}
+        detail['ms'] = round((time.perf_counter() - started) * 1000, 3)
+        return detail
+
+
+def pool_check(engine, capacity):
+    """连接池还有可借出的连接 (capacity = pool_size + max_overflow)"""
+    pool = engine.pool
+    if not isinstance(pool, QueuePool):
+        return {'pool': type(pool).__name__}
+    checked_out = pool.checkedout()
+    return {'ok': checked_out < capacity, 'checked_out': checked_out, 'capacity': capacity}
+
+
+def database_check(engine, max_latency_ms):
+    """执行 SELECT 1，往返超过 max_latency_ms 视为未就绪"""
+    started = time.perf_counter()
+    with engine.connect() as connection:
+        connection.execute(text('SELECT 1'))
+    latency_ms = (time.perf_counter() - started) * 1000
+    return {'ok': latency_ms <= max_latency_ms, 'latency_ms': round(latency_ms, 3)}
+
+
+def writable_dir_check(path):
+    """目录存在 (不存在时创建) 且可以写入文件"""
+    os.makedirs(path, exist_ok=True)
+    with tempfile.NamedTemporaryFile(dir=path, prefix='.health-'):
+        pass
+    return {}
@@ -0,0 +1,168 @@
+"""
+芝栖养生平台 - 响应式图片衍生图
+上传图片后在独立进程池中生成固定宽度的 WebP/JPEG 缩略图，列表接口据此返回 srcset
+"""
+
+import importlib.util
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+# Pillow 为可选依赖，未安装时只返回原图；只在生成衍生图的子进程中导入，web worker启动时不加载
+PILLOW_AVAILABLE = importlib.util.find_spec('PIL') is not None
+
+# 生成衍生图的源图片类型 (GIF 缩放会丢失动画，保留原图)
+DERIVATIVE_SOURCE_EXTENSIONS = {'png', 'jpg', 'jpeg'}
+DERIVATIVE_FORMATS = ('webp', 'jpeg')
+FORMAT_EXTENSIONS = {'webp': 'webp', 'jpeg': 'jpg'}
+
+
+def derivative_name(name, width, fmt):
+    """衍生图存储名: ab/cd/<sha>.png -> ab/cd/<sha>_w320.webp"""
+    stem = name.rsplit('.', 1)[0]
+    return f'{stem}_w{width}.{FORMAT_EXTENSIONS[fmt]}'
+
+
+def build_srcset(url, widths, formats=DERIVATIVE_FORMATS):
+    """按格式生成 srcset 字符串，没有衍生图时返回None"""
+    if not url or not widths:
+        return None
+    return {
+        fmt: ', '.join(f'{derivative_name(url, width, fmt)} {width}w' for width in sorted(widths))
+        for fmt in formats
+    }
+
+
+def _flatten(image):
+    """JPEG不支持透明通道，透明区域铺白底"""
+    from PIL import Image
+
+    if image.mode != 'RGBA':
+        return image.convert('RGB')
+    background = Image.new('RGB', image.size, (255, 255, 255))
+    background.paste(image, mask=image.getchannel('A'))
+    return background
+
+
+def render_derivatives(source_path, widths, formats=DERIVATIVE_FORMATS, quality=80):
+    """生成衍生图 (在子进程中执行)，返回实际生成的宽度列表
+
+    只生成小于原图宽度的尺寸，避免放大。
+    """
+    if not PILLOW_AVAILABLE:
+        return []
+    from PIL import Image
+
+    generated = []
+    with Image.open(source_path) as source:
+        source.load()
+        image = source.convert('RGBA' if source.mode in ('RGBA', 'LA', 'P') else 'RGB')
+        for width in sorted(widths):
+            if width >= image.width:
+                continue
+            height = max(1, round(image.height * width / image.width))
+            resized = image.resize((width, height), Image.LANCZOS)
+            for fmt in formats:
+                output = _flatten(resized) if fmt == 'jpeg' else resized
+                dest = derivative_name(source_path, width, fmt)
+                tmp = f'{dest}.tmp'
+                output.save(tmp, format=fmt.upper(), quality=quality, optimize=True)
+                os.replace(tmp, dest)
+            generated.append(width)
+    return generated
+
+
+class DerivativeGenerator:
+    """后台衍生图生成器
+
+    图片解码与缩放是CPU密集操作，放到进程池执行，不占用web worker的GIL。
+    进程池在首次提交时才创建 (gunicorn fork之后)，使用spawn方式启动子进程。
+    使用对象存储时，原图的下载与衍生图的上传在I/O线程中完成，子进程只处理本地文件。
+    """
+
+    def __init__(self, store, widths, formats=DERIVATIVE_FORMATS, max_workers=2, quality=80,
+                 on_complete=None, executor=None):
+        self.store = store
+        self.widths = tuple(widths)
+        self.formats = tuple(formats)
+        self.max_workers = max_workers
+        self.quality = quality
+        self.on_complete = on_complete
+        self._executor = executor
+        self._io_executor = None
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self):
+        return PILLOW_AVAILABLE and bool(self.widths)
+
+    def accepts(self, extension):
+        return self.enabled and extension.lower() in DERIVATIVE_SOURCE_EXTENSIONS
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context('spawn')
+                )
+            return self._executor
+
+    def _get_io_executor(self):
+        with self._lock:
+            if self._io_executor is None:
+                self._io_executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix='derivatives'
+                )
+            return self._io_executor
+
+    def submit(self, name, sha256):
+        """提交衍生图任务，返回Future；不支持的类型返回None"""
+        if not self.accepts(name.rsplit('.', 1)[-1]):
+            return None
+        return self._get_io_executor().submit(self._generate, name, sha256)
+
+    def _generate(self, name, sha256):
+        try:
+            source_path, temporary = self.store.local_copy(name)
+            try:
+                widths = self._get_executor().submit(
+                    render_derivatives, source_path, self.widths, self.formats, self.quality
+                ).result()
+                # 本地存储时衍生图已在原图旁生成，put_file 为空操作
+                for width in widths:
+                    for fmt in self.formats:
+                        self.store.storage.put_file(
+                            derivative_name(source_path, width, fmt), derivative_name(name, width, fmt)
+                        )
+            finally:
+                if temporary:
+                    os.remove(source_path)
+        except Exception:
+            logger.warning('衍生图生成失败: %s', sha256, exc_info=True)
+            return None
+
+        if self.on_complete is not None:
+            try:
+                self.on_complete(sha256, widths)
+            except Exception:
+                logger.warning('衍生图记录失败: %s', sha256, exc_info=True)
+        return widths
+
+    def delete(self, name, widths):
+        """删除某个原图的全部衍生图"""
+        for width in widths or ():
+            for fmt in self.formats:
+                self.store.delete(derivative_name(name, width, fmt))
+
+    def shutdown(self, wait=True):
+        with self._lock:
+            executors = (self._io_executor, self._executor)
+            self._io_executor = self._executor = None
+        for executor in executors:
+            if executor is not None:
+                executor.shutdown(wait=wait)
@@ -0,0 +1,184 @@
+"""
+芝栖养生平台 - Prometheus指标
+按 命名空间/端点/方法/状态码 统计请求延迟直方图 (直方图的 _count 即请求数)，每个请求的SQL次数与耗时，
+以及连接池占用与进程内缓存命中数，由 /metrics 输出
+需要安装 prometheus_client；gunicorn多worker部署时设置 PROMETHEUS_MULTIPROC_DIR，
+各worker把指标写入该目录下自己的mmap文件，/metrics 汇总目录中所有worker的指标
+"""
+
+import importlib.util
+import os
+import threading
+import time
+
+from flask import g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+PROMETHEUS_AVAILABLE = importlib.util.find_spec('prometheus_client') is not None
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+QUERY_TIME_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5)
+
+
+def multiprocess_dir():
+    return os.environ.get('PROMETHEUS_MULTIPROC_DIR') or os.environ.get('prometheus_multiproc_dir')
+
+
+def route_labels():
+    """(命名空间, 端点): 命名空间取路由规则的第一段 (忽略 /api 前缀)，未匹配路由的请求归为 unmatched，
+    避免按原始URL产生无限多的标签组合"""
+    rule = request.url_rule
+    if rule is None:
+        return 'unmatched', 'unmatched'
+    segments = [segment for segment in rule.rule.split('/') if segment]
+    if segments[:1] == ['api']:
+        segments = segments[1:]
+    namespace = segments[0] if segments and not segments[0].startswith('<') else 'root'
+    return namespace, request.endpoint
+
+
+class RequestMetrics:
+    """请求指标 (每个进程一份)
+
+    请求内的计时与SQL计数只写入请求自己的 g，不加锁；请求结束时一次性写入指标。
+    连接池与缓存这类进程级数值每 snapshot_interval 秒写入一次。
+    prometheus_client 在首个请求时导入并创建指标。
+    """
+
+    def __init__(self, pools=None, caches=None, registry=None, snapshot_interval=1.0, prefix='zhiqi'):
+        self.pools = pools or {}
+        self.caches = caches or {}
+        self.registry = registry
+        self.snapshot_interval = snapshot_interval
+        self.prefix = prefix
+        self._lock = threading.Lock()
+        self._created = False
+        self._next_snapshot = 0.0
+        # 计数器上次写入时的累计值: 池与缓存只提供累计数，按差值累加到Counter
+        self._last_totals = {}
+
+    def _ensure_metrics(self):
+        if self._created:
+            return
+        with self._lock:
+            if self._created:
+                return
+            from prometheus_client import REGISTRY, Counter, Gauge, Histogram
+
+            registry = self.registry if self.registry is not None else REGISTRY
+            route = ['namespace', 'endpoint']
+            self.latency = Histogram(
+                f'{self.prefix}_http_request_duration_seconds', '请求处理耗时 (秒)',
+                route + ['method', 'status'], buckets=LATENCY_BUCKETS, registry=registry
+            )
+            self.query_count = Histogram(
+                f'{self.prefix}_db_queries_per_request', '每个请求执行的SQL语句数',
+                route, buckets=QUERY_COUNT_BUCKETS, registry=registry
+            )
+            self.query_time = Histogram(
+                f'{self.prefix}_db_query_seconds_per_request', '每个请求的SQL累计耗时 (秒)',
+                route, buckets=QUERY_TIME_BUCKETS, registry=registry
+            )
+            # 连接数是当前值: 多进程模式下只汇总存活worker的值
+            self.pool_connections = Gauge(
+                f'{self.prefix}_db_pool_connections', '连接池连接数',
+                ['pool', 'state'], multiprocess_mode='livesum', registry=registry
+            )
+            # 超时与缓存查询只增不减，用Counter以便 rate() 计算 (worker重启时Counter重置，rate可正确处理)
+            self.pool_timeouts = Counter(
+                f'{self.prefix}_db_pool_timeouts', '等待连接超时次数',
+                ['pool'], registry=registry
+            )
+            self.cache_lookups = Counter(
+                f'{self.prefix}_cache_lookups', '进程内缓存查询次数',
+                ['cache', 'result'], registry=registry
+            )
+            event.listen(Engine, 'before_cursor_execute', self._before_cursor_execute)
+            event.listen(Engine, 'after_cursor_execute', self._after_cursor_execute)
+            self._created = True
+
+    @staticmethod
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if context is not None:
+            context._metrics_started = time.perf_counter()
+
+    @staticmethod
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        started = getattr(context, '_metrics_started', None)
+        if started is None or not has_request_context():
+            return
+        queries = g.get('_metrics_queries')
+        if queries is not None:
+            queries[0] += 1
+            queries[1] += time.perf_counter() - started
+
+    def before_request(self):
+        self._ensure_metrics()
+        g._metrics_started = time.perf_counter()
+        g._metrics_queries = [0, 0.0]
+
+    def after_request(self, response):
+        started = g.pop('_metrics_started', None)
+        if started is None:
+            return response
+        elapsed = time.perf_counter() - started
+        count, seconds = g.pop('_metrics_queries', (0, 0.0))
+        namespace, endpoint = route_labels()
+        self.latency.labels(namespace, endpoint, request.method, str(response.status_code)).observe(elapsed)
+        self.query_count.labels(namespace, endpoint).observe(count)
+        self.query_time.labels(namespace, endpoint).observe(seconds)
+        now = time.monotonic()
+        if now >= self._next_snapshot:
+            self._next_snapshot = now + self.snapshot_interval
+            self.snapshot()
+        return response
+
+    def snapshot(self):
+        """写入连接池与缓存的当前数值"""
+        for name, pool_metrics in self.pools.items():
+            if pool_metrics.pool is None:
+                # 未配置 (如没有只读副本)
+                continue
+            stats = pool_metrics.stats()
+            if 'checked_out' in stats:
+                self.pool_connections.labels(name, 'checked_out').set(stats['checked_out'])
+                self.pool_connections.labels(name, 'checked_in').set(stats['checked_in'])
+                self.pool_connections.labels(name, 'overflow').set(max(stats['overflow'], 0))
+            self._advance(self.pool_timeouts, (name,), stats['timeouts'])
+        for name, cache in self.caches.items():
+            if cache is not None:
+                self._advance(self.cache_lookups, (name, 'hit'), cache.hits)
+                self._advance(self.cache_lookups, (name, 'miss'), cache.misses)
+
+    def _advance(self, counter, labels, total):
+        """把累计值 total 与上次写入值的差累加到计数器；累计值变小 (来源被重置) 时整体计入"""
+        with self._lock:
+            key = (counter, labels)
+            last = self._last_totals.get(key, 0)
+            self._last_totals[key] = total
+        counter.labels(*labels).inc(total - last if total >= last else total)
+
+    def export(self):
+        """返回 (指标文本, Content-Type)；多进程模式汇总目录中所有worker的指标"""
+        from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, generate_latest
+
+        self._ensure_metrics()
+        self.snapshot()
+        if multiprocess_dir():
+            from prometheus_client import multiprocess
+
+            registry = CollectorRegistry()
+            multiprocess.MultiProcessCollector(registry)
+        else:
+            registry = self.registry if self.registry is not None else REGISTRY
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+def mark_worker_dead(pid):
+    """gunicorn child_exit 时删除退出worker的存活值文件 (累计的直方图数据保留)"""
+    if multiprocess_dir() and PROMETHEUS_AVAILABLE:
+        from prometheus_client import multiprocess
+
+        multiprocess.mark_process_dead(pid)
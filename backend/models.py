@@ -0,0 +1,415 @@
+"""
+芝栖养生平台 - 数据模型与序列化视图
+"""
+
+from datetime import datetime
+
+from flask import request
+
+from extensions import db
+from serializers import SerializerRegistry, decimal_field, dict_field, list_field, method, nested, optional_decimal_field
+from uploads import ContentAddressedStore
+
+# 用户表模型 (扩展版)
+class User(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    username = db.Column(db.String(255), unique=True, nullable=False)
+    password = db.Column(db.String(255), nullable=False)
+    email = db.Column(db.String(255), unique=True, nullable=False)
+    phone = db.Column(db.String(20))
+    avatar = db.Column(db.String(255))
+    real_name = db.Column(db.String(100))
+    gender = db.Column(db.Enum('male', 'female', 'other'))
+    birth_date = db.Column(db.Date)
+    member_level = db.Column(db.Enum('normal', 'vip', 'premium'), default='normal')
+    points = db.Column(db.Integer, default=0)
+    total_spent = db.Column(db.Numeric(10, 2), default=0.00)
+    is_active = db.Column(db.Boolean, default=True)
+    role = db.Column(db.String(20), nullable=False, default='user')
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    # 关联关系
+    contents = db.relationship('Content', backref='author', lazy=True)
+    activities = db.relationship('Activity', backref='organizer', lazy=True)
+    orders = db.relationship('Order', backref='user', lazy=True)
+    reviews = db.relationship('Review', backref='user', lazy=True)
+    favorites = db.relationship('Favorite', backref='user', lazy=True)
+    notifications = db.relationship('Notification', backref='user', lazy=True)
+    user_activities = db.relationship('UserActivity', backref='user', lazy=True)
+
+    def __repr__(self):
+        return f'<User {self.username}>'
+
+    def to_dict(self):
+        return serializer.dump(self, 'detail')
+
+# 内容表模型
+class Content(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    title = db.Column(db.String(255), nullable=False)
+    content_type = db.Column(db.Enum('article', 'video', 'knowledge', 'vlog'), nullable=False)
+    summary = db.Column(db.Text)
+    content = db.Column(db.Text)
+    author_id = db.Column(db.Integer, db.ForeignKey('user.id'))
+    category = db.Column(db.String(100))
+    tags = db.Column(db.JSON)
+    cover_image = db.Column(db.String(255))
+    video_url = db.Column(db.String(255))
+    reading_time = db.Column(db.Integer)
+    views_count = db.Column(db.Integer, default=0)
+    likes_count = db.Column(db.Integer, default=0)
+    status = db.Column(db.Enum('draft', 'published', 'archived'), default='draft')
+    publish_time = db.Column(db.DateTime)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    # 评论/收藏按 target_type + target_id 多态关联，无数据库外键，只读
+    reviews = db.relationship('Review', backref=db.backref('content', viewonly=True), lazy=True, viewonly=True,
+                              primaryjoin="and_(Content.id == foreign(Review.target_id), Review.target_type == 'content')")
+    favorites = db.relationship('Favorite', backref=db.backref('content', viewonly=True), lazy=True, viewonly=True,
+                                primaryjoin="and_(Content.id == foreign(Favorite.target_id), Favorite.target_type == 'content')")
+
+    def __repr__(self):
+        return f'<Content {self.title}>'
+
+# 产品表模型
+class Product(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(255), nullable=False)
+    category = db.Column(db.Enum('lingzhi', 'tea', 'spore', 'gift', 'subscription'), nullable=False)
+    description = db.Column(db.Text)
+    price = db.Column(db.Numeric(10, 2), nullable=False)
+    original_price = db.Column(db.Numeric(10, 2))
+    stock_quantity = db.Column(db.Integer, default=0)
+    sku = db.Column(db.String(100), unique=True)
+    images = db.Column(db.JSON)
+    specifications = db.Column(db.JSON)
+    trace_code = db.Column(db.String(255))
+    is_featured = db.Column(db.Boolean, default=False)
+    is_available = db.Column(db.Boolean, default=True)
+    weight = db.Column(db.Numeric(5, 2))
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    reviews = db.relationship('Review', backref=db.backref('product', viewonly=True), lazy=True, viewonly=True,
+                              primaryjoin="and_(Product.id == foreign(Review.target_id), Review.target_type == 'product')")
+
+    def __repr__(self):
+        return f'<Product {self.name}>'
+
+# 活动表模型
+class Activity(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    title = db.Column(db.String(255), nullable=False)
+    description = db.Column(db.Text)
+    activity_type = db.Column(db.Enum('workshop', 'experience', 'course', 'event'), nullable=False)
+    category = db.Column(db.String(100))
+    organizer_id = db.Column(db.Integer, db.ForeignKey('user.id'))
+    organizer_type = db.Column(db.Enum('official', 'host', 'user'), default='official')
+    max_participants = db.Column(db.Integer)
+    current_participants = db.Column(db.Integer, default=0)
+    price = db.Column(db.Numeric(10, 2), default=0.00)
+    location = db.Column(db.String(255))
+    start_time = db.Column(db.DateTime, nullable=False)
+    end_time = db.Column(db.DateTime, nullable=False)
+    duration = db.Column(db.Integer)
+    images = db.Column(db.JSON)
+    requirements = db.Column(db.Text)
+    platform_fee_rate = db.Column(db.Numeric(3, 2), default=0.10)
+    status = db.Column(db.Enum('draft', 'pending_review', 'published', 'ongoing', 'completed', 'cancelled'), default='draft')
+    review_status = db.Column(db.Enum('pending', 'approved', 'rejected'), default='pending')
+    review_reason = db.Column(db.Text)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    user_activities = db.relationship('UserActivity', backref='activity', lazy=True)
+    reviews = db.relationship('Review', backref=db.backref('activity', viewonly=True), lazy=True, viewonly=True,
+                              primaryjoin="and_(Activity.id == foreign(Review.target_id), Review.target_type == 'activity')")
+
+    def __repr__(self):
+        return f'<Activity {self.title}>'
+
+# 实体体验基地表模型
+class ExperienceBase(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(255), nullable=False)
+    description = db.Column(db.Text)
+    address = db.Column(db.String(255), nullable=False)
+    city = db.Column(db.String(100))
+    province = db.Column(db.String(100))
+    contact_phone = db.Column(db.String(20))
+    contact_email = db.Column(db.String(255))
+    images = db.Column(db.JSON)
+    facilities = db.Column(db.JSON)
+    features = db.Column(db.JSON)
+    is_active = db.Column(db.Boolean, default=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    packages = db.relationship('BasePackage', backref='base', lazy=True)
+
+    def __repr__(self):
+        return f'<ExperienceBase {self.name}>'
+
+# 基地套餐表模型
+class BasePackage(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    base_id = db.Column(db.Integer, db.ForeignKey('experience_base.id'), nullable=False)
+    name = db.Column(db.String(255), nullable=False)
+    type = db.Column(db.Enum('night_stay', 'weekend_workshop', 'custom'), nullable=False)
+    description = db.Column(db.Text)
+    price = db.Column(db.Numeric(10, 2), nullable=False)
+    duration_hours = db.Column(db.Integer)
+    includes = db.Column(db.JSON)
+    max_capacity = db.Column(db.Integer)
+    is_available = db.Column(db.Boolean, default=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<BasePackage {self.name}>'
+
+# 统一订单表模型
+class Order(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    order_number = db.Column(db.String(50), unique=True, nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    order_type = db.Column(db.Enum('product', 'activity', 'accommodation', 'subscription'), nullable=False)
+    total_amount = db.Column(db.Numeric(10, 2), nullable=False)
+    platform_fee = db.Column(db.Numeric(10, 2), default=0.00)
+    payment_method = db.Column(db.Enum('wechat', 'alipay', 'card'), default='wechat')
+    payment_status = db.Column(db.Enum('pending', 'paid', 'refunded', 'failed'), default='pending')
+    order_status = db.Column(db.Enum('pending', 'confirmed', 'processing', 'shipped', 'completed', 'cancelled'), default='pending')
+    shipping_address = db.Column(db.JSON)
+    contact_info = db.Column(db.JSON)
+    notes = db.Column(db.Text)
+    paid_at = db.Column(db.DateTime)
+    completed_at = db.Column(db.DateTime)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    items = db.relationship('OrderItem', backref='order', lazy=True)
+    payments = db.relationship('Payment', backref='order', lazy=True)
+    user_activities = db.relationship('UserActivity', backref='order', lazy=True, foreign_keys='UserActivity.order_id')
+
+    def __repr__(self):
+        return f'<Order {self.order_number}>'
+
+# 订单明细表模型
+class OrderItem(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    order_id = db.Column(db.Integer, db.ForeignKey('order.id'), nullable=False)
+    item_type = db.Column(db.Enum('product', 'activity', 'package'), nullable=False)
+    item_id = db.Column(db.Integer, nullable=False)
+    quantity = db.Column(db.Integer, default=1)
+    unit_price = db.Column(db.Numeric(10, 2), nullable=False)
+    total_price = db.Column(db.Numeric(10, 2), nullable=False)
+    item_snapshot = db.Column(db.JSON)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<OrderItem {self.id}>'
+
+# 支付记录表模型
+class Payment(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    order_id = db.Column(db.Integer, db.ForeignKey('order.id'), nullable=False)
+    payment_method = db.Column(db.Enum('wechat', 'alipay', 'card'), nullable=False)
+    transaction_id = db.Column(db.String(255), unique=True)
+    amount = db.Column(db.Numeric(10, 2), nullable=False)
+    payment_status = db.Column(db.Enum('pending', 'success', 'failed', 'refunded'), default='pending')
+    payment_data = db.Column(db.JSON)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<Payment {self.transaction_id}>'
+
+# 评论表模型 (通用评论系统)
+class Review(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    target_type = db.Column(db.Enum('product', 'activity', 'content', 'base'), nullable=False)
+    target_id = db.Column(db.Integer, nullable=False)
+    rating = db.Column(db.Integer, nullable=False)
+    title = db.Column(db.String(255))
+    comment = db.Column(db.Text)
+    images = db.Column(db.JSON)
+    is_anonymous = db.Column(db.Boolean, default=False)
+    status = db.Column(db.Enum('pending', 'approved', 'rejected'), default='approved')
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<Review {self.id}>'
+
+# 收藏表模型
+class Favorite(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    target_type = db.Column(db.Enum('product', 'activity', 'content'), nullable=False)
+    target_id = db.Column(db.Integer, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    __table_args__ = (db.UniqueConstraint('user_id', 'target_type', 'target_id', name='unique_favorite'),)
+
+    def __repr__(self):
+        return f'<Favorite {self.id}>'
+
+# 消息通知表模型
+class Notification(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    title = db.Column(db.String(255), nullable=False)
+    content = db.Column(db.Text)
+    notification_type = db.Column(db.Enum('system', 'order', 'activity', 'promotion'), default='system')
+    is_read = db.Column(db.Boolean, default=False)
+    read_at = db.Column(db.DateTime)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<Notification {self.title}>'
+
+# 用户活动参与记录表模型
+class UserActivity(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    activity_id = db.Column(db.Integer, db.ForeignKey('activity.id'), nullable=False)
+    order_id = db.Column(db.Integer, db.ForeignKey('order.id'))
+    participation_status = db.Column(db.Enum('registered', 'attended', 'cancelled', 'no_show'), default='registered')
+    check_in_time = db.Column(db.DateTime)
+    feedback_rating = db.Column(db.Integer)
+    feedback_comment = db.Column(db.Text)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<UserActivity {self.id}>'
+
+# 管理日志表模型
+class AdminLog(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    admin_id = db.Column(db.Integer, db.ForeignKey('user.id'))
+    action = db.Column(db.String(255), nullable=False)
+    target_type = db.Column(db.String(100))
+    target_id = db.Column(db.Integer)
+    details = db.Column(db.JSON)
+    ip_address = db.Column(db.String(45))
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<AdminLog {self.action}>'
+
+# 上传文件表模型 (内容寻址，按SHA-256去重并引用计数)
+class UploadBlob(db.Model):
+    sha256 = db.Column(db.String(64), primary_key=True)
+    extension = db.Column(db.String(10), nullable=False)
+    size = db.Column(db.BigInteger, nullable=False)
+    ref_count = db.Column(db.Integer, default=1, nullable=False)
+    variants = db.Column(db.JSON)  # 已生成的衍生图宽度
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (db.Index('idx_upload_blobs_gc', 'ref_count', 'updated_at'),)
+
+    @property
+    def name(self):
+        return ContentAddressedStore.blob_name(self.sha256, self.extension)
+
+    @property
+    def url(self):
+        return f'/uploads/{self.name}'
+
+    def __repr__(self):
+        return f'<UploadBlob {self.sha256}>'
+
+# 序列化视图: 列表接口使用card，详情接口使用detail，编码函数在首次使用时编译
+# 列表接口支持 fields=id,name,price 只返回部分字段，查询也只读取这些字段对应的列
+serializer = SerializerRegistry()
+
+def list_projection(model, view='card'):
+    """解析请求的 fields= 参数，返回 (编码函数, 查询选项)"""
+    only = serializer.parse_fields(model, view, request.args.get('fields'))
+    return serializer.encoder(model, view, only), serializer.load_options(model, view, only)
+
+def organizer_summary(activity):
+    if activity.organizer is None:
+        return None
+    return dict(serializer.dump(activity.organizer, 'brief'), organizer_type=activity.organizer_type)
+
+serializer.register(User, 'detail', [
+    'id', 'username', 'email', 'phone', 'avatar', 'real_name', 'gender', 'birth_date', 'member_level',
+    'points', decimal_field('total_spent'), 'is_active', 'role', 'created_at', 'updated_at'
+])
+serializer.register(User, 'brief', ['id', 'username', 'real_name'])
+serializer.register(User, 'review', ['username', 'real_name', 'avatar'])
+
+serializer.register(Content, 'card', [
+    'id', 'title', 'content_type', 'summary', 'category', 'tags', 'cover_image', 'views_count',
+    'likes_count', 'status', 'publish_time', 'created_at', nested('author', 'brief')
+])
+serializer.register(Content, 'detail', [
+    'id', 'title', 'content_type', 'summary', 'content', 'category', 'tags', 'cover_image', 'video_url',
+    'reading_time', 'views_count', 'likes_count', 'status', 'publish_time', 'created_at', 'updated_at',
+    nested('author', 'brief')
+])
+serializer.register(Content, 'review', ['id', 'title', 'content_type', nested('author', 'brief'), 'created_at'])
+serializer.register(Content, 'favorite', ['id', 'title', 'content_type', 'cover_image'])
+
+serializer.register(Product, 'card', [
+    'id', 'name', 'category', 'description', decimal_field('price'), optional_decimal_field('original_price'),
+    'stock_quantity', list_field('images'), 'is_featured', 'trace_code', optional_decimal_field('weight'), 'created_at'
+])
+serializer.register(Product, 'detail', [
+    'id', 'name', 'category', 'description', decimal_field('price'), optional_decimal_field('original_price'),
+    'stock_quantity', 'sku', list_field('images'), dict_field('specifications'), 'trace_code', 'is_featured',
+    'is_available', optional_decimal_field('weight'), 'created_at', 'updated_at'
+])
+serializer.register(Product, 'favorite', ['id', 'name', decimal_field('price'), list_field('images'), 'category'])
+
+serializer.register(Activity, 'card', [
+    'id', 'title', 'description', 'activity_type', 'category', 'max_participants', 'current_participants',
+    decimal_field('price'), 'location', 'start_time', 'end_time', 'duration', list_field('images'), 'status',
+    method('organizer', organizer_summary, depends=['organizer_type', nested('organizer', 'brief')])
+])
+serializer.register(Activity, 'detail', [
+    'id', 'title', 'description', 'activity_type', 'category', 'max_participants', 'current_participants',
+    decimal_field('price'), 'location', 'start_time', 'end_time', 'duration', list_field('images'),
+    'requirements', decimal_field('platform_fee_rate'), 'status', 'review_status', 'review_reason',
+    'created_at', 'updated_at', method('organizer', organizer_summary, depends=['organizer_type', nested('organizer', 'brief')])
+])
+serializer.register(Activity, 'review', [
+    'id', 'title', 'description', 'activity_type', nested('organizer', 'brief'), 'created_at'
+])
+serializer.register(Activity, 'favorite', ['id', 'title', decimal_field('price'), 'start_time', 'location'])
+serializer.register(Activity, 'dashboard', ['id', 'title', 'start_time', 'location'])
+
+serializer.register(ExperienceBase, 'card', [
+    'id', 'name', 'description', 'address', 'city', 'province', 'contact_phone', 'contact_email',
+    list_field('images'), dict_field('facilities'), dict_field('features')
+])
+serializer.register(ExperienceBase, 'detail', serializer.fields(ExperienceBase, 'card') + ['created_at', 'updated_at'])
+serializer.register(BasePackage, 'card', [
+    'id', 'name', 'type', 'description', decimal_field('price'), 'duration_hours', list_field('includes'),
+    'max_capacity'
+])
+
+serializer.register(OrderItem, 'detail', [
+    'id', 'item_type', 'item_id', 'quantity', decimal_field('unit_price'), decimal_field('total_price'),
+    'item_snapshot'
+])
+serializer.register(Order, 'card', [
+    'id', 'order_number', 'order_type', decimal_field('total_amount'), decimal_field('platform_fee'),
+    'payment_method', 'payment_status', 'order_status', nested('items', 'detail', many=True), 'created_at',
+    'paid_at', 'completed_at'
+])
+serializer.register(Order, 'dashboard', [
+    'id', 'order_number', 'order_type', decimal_field('total_amount'), 'order_status', 'created_at'
+])
+
+serializer.register(Review, 'card', [
+    'id', 'user_id', 'rating', 'title', 'comment', list_field('images'), 'is_anonymous', 'created_at'
+])
+serializer.register(Favorite, 'card', ['id', 'target_type', 'target_id', 'created_at'])
+serializer.register(UserActivity, 'dashboard', [
+    'id', nested('activity', 'dashboard'), 'participation_status', 'created_at'
+])
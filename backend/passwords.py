@@ -0,0 +1,95 @@
+"""
+芝栖养生平台 - 密码哈希
+在有界进程池中计算/校验密码哈希，算法与强度可配置，登录时自动升级旧参数的哈希
+"""
+
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from werkzeug.security import check_password_hash, generate_password_hash
+
+
+class PasswordHasherBusy(Exception):
+    """哈希任务排队已满 (登录洪峰时快速失败，避免拖垮其他接口)"""
+
+
+def hash_method(pwhash):
+    """哈希字符串中的算法与参数部分，如 scrypt:32768:8:1"""
+    return pwhash.split('$', 1)[0] if pwhash else ''
+
+
+def _verify_and_rehash(pwhash, password, method, normalized_method):
+    """校验密码，参数已过期时同时生成新哈希 (在子进程中执行)，返回 (是否正确, 新哈希或None)"""
+    if not check_password_hash(pwhash, password):
+        return False, None
+    if hash_method(pwhash) != normalized_method:
+        return True, generate_password_hash(password, method)
+    return True, None
+
+
+class PasswordHasher:
+    """密码哈希器
+
+    scrypt/pbkdf2 每次计算需要数十毫秒CPU，放到进程池执行后web线程等待时释放GIL，
+    其他请求不受影响。同时在途的任务数有上限，超出时最多等待queue_timeout秒 (默认0.1秒，0为不等待)
+    就抛出PasswordHasherBusy (接口返回503)，避免排队的请求长时间占住gthread/ASGI线程。
+    max_workers=0 时在当前线程计算 (测试与单进程开发环境)。
+    """
+
+    def __init__(self, method='scrypt', max_workers=2, max_pending=None, queue_timeout=0.1, executor=None):
+        self.method = method
+        self.max_workers = max_workers
+        self.queue_timeout = queue_timeout
+        self._executor = executor
+        self._slots = threading.BoundedSemaphore(max_pending or max(1, max_workers) * 8)
+        self._lock = threading.Lock()
+        self._normalized_method = None
+
+    @property
+    def normalized_method(self):
+        """完整的算法参数 (如 scrypt -> scrypt:32768:8:1)，用于判断是否需要升级"""
+        if self._normalized_method is None:
+            self._normalized_method = hash_method(generate_password_hash('', self.method))
+        return self._normalized_method
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None and self.max_workers:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context('spawn')
+                )
+            return self._executor
+
+    def _run(self, func, *args):
+        executor = self._get_executor()
+        if executor is None:
+            return func(*args)
+        if not self._slots.acquire(timeout=self.queue_timeout):
+            raise PasswordHasherBusy()
+        try:
+            return executor.submit(func, *args).result()
+        finally:
+            self._slots.release()
+
+    def hash(self, password):
+        """生成密码哈希"""
+        return self._run(generate_password_hash, password, self.method)
+
+    def verify(self, pwhash, password):
+        """校验密码"""
+        return self._run(check_password_hash, pwhash, password)
+
+    def needs_rehash(self, pwhash):
+        return hash_method(pwhash) != self.normalized_method
+
+    def verify_and_update(self, pwhash, password):
+        """校验密码，返回 (是否正确, 新哈希)；哈希参数与当前配置不一致时新哈希不为None"""
+        return self._run(_verify_and_rehash, pwhash, password, self.method, self.normalized_method)
+
+    def shutdown(self, wait=True):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait)
@@ -0,0 +1,46 @@
+"""
+芝栖养生平台 - 角色权限
+角色写入JWT声明，权限判断查进程内权限矩阵，不访问数据库
+"""
+
+import json
+
+# 权限标识
+STATS_VIEW = 'stats:view'
+ACTIVITY_REVIEW = 'activity:review'
+CONTENT_REVIEW = 'content:review'
+CONTENT_PUBLISH = 'content:publish'
+PROFILE_VIEW = 'profile:view'  # 请求采样分析与下载分析文件
+
+# 默认权限矩阵 (可通过 ROLE_PERMISSIONS 环境变量以JSON覆盖)
+DEFAULT_ROLE_PERMISSIONS = {
+    'user': [],
+    'editor': [CONTENT_REVIEW, CONTENT_PUBLISH],
+    'reviewer': [ACTIVITY_REVIEW, CONTENT_REVIEW],
+    'admin': ['*']
+}
+
+
+class PermissionMatrix:
+    """角色 -> 权限集合，'*' 表示全部权限"""
+
+    def __init__(self, role_permissions=None):
+        role_permissions = role_permissions if role_permissions is not None else DEFAULT_ROLE_PERMISSIONS
+        self._permissions = {role: frozenset(perms) for role, perms in role_permissions.items()}
+
+    @classmethod
+    def from_json(cls, text):
+        return cls(json.loads(text) if text else None)
+
+    @property
+    def roles(self):
+        return tuple(self._permissions)
+
+    def allows(self, role, permission):
+        permissions = self._permissions.get(role)
+        if not permissions:
+            return False
+        return permission in permissions or '*' in permissions
+
+    def permissions_for(self, role):
+        return sorted(self._permissions.get(role, ()))
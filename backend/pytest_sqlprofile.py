@@ -0,0 +1,37 @@
+"""
+芝栖养生平台 - pytest SQL查询数插件
+tests/conftest.py 已启用，其他测试目录可通过 pytest -p pytest_sqlprofile 启用；提供 max_queries fixture:
+
+    def test_product_list(app_db, max_queries):
+        with max_queries(2):
+            client.get('/products/')
+
+代码块内执行的SQL超过上限时测试失败，并列出执行的语句与疑似N+1的语句形状及触发位置
+"""
+
+from contextlib import contextmanager
+
+import pytest
+
+from sqlprofile import capture_queries
+
+
+def format_report(log, limit):
+    lines = [f'执行了 {log.count} 条SQL，上限 {limit} 条:']
+    lines += [f'  {index}. {statement}' for index, statement in enumerate(log.statements, 1)]
+    for suspect in log.repeated():
+        lines.append(f'疑似N+1 ({suspect["count"]} 次, 位置 {suspect["location"]}): {suspect["statement"]}')
+    return '\n'.join(lines)
+
+
+@pytest.fixture
+def max_queries():
+    """断言代码块内执行的SQL语句数不超过limit (重复threshold次的语句形状在失败信息中标为疑似N+1)"""
+    @contextmanager
+    def assert_max_queries(limit, threshold=3):
+        with capture_queries(threshold) as log:
+            yield log
+        if log.count > limit:
+            pytest.fail(format_report(log, limit), pytrace=False)
+
+    return assert_max_queries
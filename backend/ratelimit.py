@@ -0,0 +1,122 @@
+"""
+芝栖养生平台 - 接口限流
+令牌桶限流 (GCRA实现，每个key只保存一个时间戳)，进程内后端或Redis共享后端
+"""
+
+import json
+import math
+import time
+from collections import OrderedDict
+
+# 限流周期
+PERIODS = {'second': 1, 'minute': 60, 'hour': 3600, 'day': 86400}
+
+
+class RateLimit:
+    """限流规则: 每period秒补充rate个令牌，桶容量为burst"""
+
+    def __init__(self, rate, period=60, burst=None):
+        self.rate = rate
+        self.period = period
+        self.burst = burst or rate
+        # 每个令牌的补充间隔
+        self.interval = period / rate
+
+    @classmethod
+    def parse(cls, text):
+        """解析 "10/minute" 或 "10/minute;burst=20" """
+        spec, _, options = text.partition(';')
+        count, _, period = spec.strip().partition('/')
+        burst = None
+        if options.strip().startswith('burst='):
+            burst = int(options.strip()[len('burst='):])
+        return cls(int(count), PERIODS[period.strip() or 'minute'], burst)
+
+    def __repr__(self):
+        return f'<RateLimit {self.rate}/{self.period}s burst={self.burst}>'
+
+
+def parse_rate_limits(defaults, overrides=None):
+    """合并默认规则与JSON覆盖配置，返回 {命名空间: RateLimit}，规则为空字符串表示关闭"""
+    specs = dict(defaults)
+    if overrides:
+        specs.update(json.loads(overrides))
+    return {name: RateLimit.parse(spec) for name, spec in specs.items() if spec}
+
+
+class LocalRateLimiter:
+    """进程内限流后端
+
+    每个key只保存"理论到达时间"(TAT) 一个浮点数，判断是一次字典读写，不加锁；
+    并发线程同时读取同一个key时最多多放行线程数个请求。多worker部署时每个worker单独计数。
+    key按最近放行的顺序排列，超过 max_keys 时每次只淘汰最久未放行的一个 (O(1))，
+    大量不同IP轮换请求时不会在请求线程中扫描整个字典。
+    """
+
+    def __init__(self, max_keys=100000, clock=time.monotonic):
+        self.max_keys = max_keys
+        self.clock = clock
+        self._tat = OrderedDict()
+
+    def hit(self, key, limit, cost=1):
+        """消耗令牌，返回 (是否放行, 需等待的秒数)"""
+        now = self.clock()
+        tat = self._tat.get(key, now)
+        new_tat = max(tat, now) + limit.interval * cost
+        allow_at = new_tat - limit.burst * limit.interval
+        if now < allow_at:
+            return False, allow_at - now
+        self._tat[key] = new_tat
+        try:
+            self._tat.move_to_end(key)
+            if len(self._tat) > self.max_keys:
+                # 被淘汰的key相当于令牌已满 (最久未放行的key通常早已补满)
+                self._tat.popitem(last=False)
+        except KeyError:
+            # 其他线程同时淘汰了这个key
+            pass
+        return True, 0.0
+
+    def reset(self):
+        self._tat.clear()
+
+
+# GCRA的Redis实现: 使用Redis服务器时间，多实例共享同一份计数
+GCRA_SCRIPT = """
+local interval = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local time = redis.call('TIME')
+local now = tonumber(time[1]) + tonumber(time[2]) / 1000000
+local tat = tonumber(redis.call('GET', KEYS[1])) or now
+if tat < now then
+    tat = now
+end
+local new_tat = tat + interval * cost
+local allow_at = new_tat - burst * interval
+if now < allow_at then
+    return {0, tostring(allow_at - now)}
+end
+redis.call('SET', KEYS[1], tostring(new_tat), 'PX', math.ceil((new_tat - now) * 1000))
+return {1, '0'}
+"""
+
+
+class RedisRateLimiter:
+    """Redis限流后端 (多worker/多实例共享)，每次判断为一次EVALSHA往返"""
+
+    def __init__(self, client, prefix='zhiqi:ratelimit:'):
+        self.client = client
+        self.prefix = prefix
+        self._script = client.register_script(GCRA_SCRIPT)
+
+    def hit(self, key, limit, cost=1):
+        allowed, retry_after = self._script(keys=[self.prefix + key], args=[limit.interval, limit.burst, cost])
+        if isinstance(retry_after, bytes):
+            retry_after = retry_after.decode('ascii')
+        return bool(int(allowed)), float(retry_after)
+
+
+def retry_after_header(seconds):
+    """Retry-After 为整数秒，至少1秒"""
+    return str(max(1, math.ceil(seconds)))
@@ -0,0 +1,277 @@
+"""
+芝栖养生平台 - 实时事件推送
+进程内发布/订阅代理 (可选Redis后端)，为SSE通道推送通知与订单状态变化
+"""
+
+import json
+import logging
+import queue
+import threading
+import time
+from datetime import date, datetime
+from decimal import Decimal
+
+from sqlalchemy import event, inspect
+
+logger = logging.getLogger(__name__)
+
+# 订单上需要推送的状态字段
+ORDER_STATUS_FIELDS = ('payment_status', 'order_status')
+
+
+def user_channel(user_id):
+    """用户私有频道名"""
+    return f'user:{user_id}'
+
+
+def _json_default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    raise TypeError(f'Object of type {type(value).__name__} is not JSON serializable')
+
+
+def dumps_event(event_data):
+    """序列化事件 (支持datetime/Decimal)"""
+    return json.dumps(event_data, ensure_ascii=False, default=_json_default)
+
+
+class Subscription:
+    """进程内订阅，事件暂存在有界队列中"""
+
+    def __init__(self, broker, channel, maxsize):
+        self.broker = broker
+        self.channel = channel
+        self.queue = queue.Queue(maxsize=maxsize)
+        self.dropped = 0
+        self.closed = False
+
+    def put(self, event_data):
+        """投递事件，队列满时丢弃最旧的事件 (慢消费者不阻塞发布方)"""
+        while True:
+            try:
+                self.queue.put_nowait(event_data)
+                return
+            except queue.Full:
+                try:
+                    self.queue.get_nowait()
+                    self.dropped += 1
+                except queue.Empty:
+                    pass
+
+    def get(self, timeout=None):
+        """获取下一个事件，超时返回None"""
+        try:
+            return self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def close(self):
+        if not self.closed:
+            self.closed = True
+            self.broker.unsubscribe(self)
+
+
+class LocalBroker:
+    """进程内发布/订阅代理 (单进程部署与测试使用)"""
+
+    def __init__(self, max_queue_size=100):
+        self.max_queue_size = max_queue_size
+        self._subscribers = {}
+        self._lock = threading.Lock()
+
+    def publish(self, channel, event_data):
+        """发布事件，返回投递到的订阅者数量"""
+        with self._lock:
+            subscribers = tuple(self._subscribers.get(channel, ()))
+        for subscription in subscribers:
+            subscription.put(event_data)
+        return len(subscribers)
+
+    def subscribe(self, channel):
+        subscription = Subscription(self, channel, self.max_queue_size)
+        with self._lock:
+            self._subscribers.setdefault(channel, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.channel)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[subscription.channel]
+
+    def subscriber_count(self, channel=None):
+        with self._lock:
+            if channel is not None:
+                return len(self._subscribers.get(channel, ()))
+            return sum(len(subscribers) for subscribers in self._subscribers.values())
+
+
+class RedisSubscription:
+    """Redis pub/sub 订阅"""
+
+    def __init__(self, broker, channel, pubsub):
+        self.broker = broker
+        self.channel = channel
+        self.pubsub = pubsub
+        self.closed = False
+
+    def get(self, timeout=None):
+        message = self.pubsub.get_message(ignore_subscribe_messages=True, timeout=timeout or 0)
+        if not message or message.get('type') != 'message':
+            return None
+        data = message['data']
+        if isinstance(data, bytes):
+            data = data.decode('utf-8')
+        return json.loads(data)
+
+    def close(self):
+        if not self.closed:
+            self.closed = True
+            try:
+                self.pubsub.close()
+            except Exception:
+                logger.warning('关闭Redis订阅失败', exc_info=True)
+
+
+class RedisBroker:
+    """Redis pub/sub 代理 (多worker/多实例部署共享事件)"""
+
+    def __init__(self, client, prefix='zhiqi:events:'):
+        self.client = client
+        self.prefix = prefix
+
+    def publish(self, channel, event_data):
+        return self.client.publish(self.prefix + channel, dumps_event(event_data))
+
+    def subscribe(self, channel):
+        pubsub = self.client.pubsub()
+        pubsub.subscribe(self.prefix + channel)
+        return RedisSubscription(self, channel, pubsub)
+
+
+def format_sse(event_data, event_id=None):
+    """格式化为SSE帧"""
+    lines = []
+    if event_id is not None:
+        lines.append(f'id: {event_id}')
+    if event_data.get('type'):
+        lines.append(f'event: {event_data["type"]}')
+    lines.append(f'data: {dumps_event(event_data)}')
+    return '\n'.join(lines) + '\n\n'
+
+
+def event_stream(subscription, heartbeat=15, max_duration=None, retry_ms=3000, clock=time.monotonic):
+    """SSE事件流生成器
+
+    空闲时发送注释心跳保持连接；到达max_duration后结束，由客户端EventSource自动重连，
+    以便worker定期释放长连接。
+    """
+    started = clock()
+    event_id = 0
+    try:
+        yield f'retry: {retry_ms}\n\n'
+        while True:
+            wait = heartbeat
+            if max_duration is not None:
+                remaining = max_duration - (clock() - started)
+                if remaining <= 0:
+                    return
+                wait = min(wait, remaining)
+
+            event_data = subscription.get(timeout=wait)
+            if event_data is None:
+                yield ': keepalive\n\n'
+                continue
+
+            event_id += 1
+            yield format_sse(event_data, event_id)
+    finally:
+        subscription.close()
+
+
+def notification_event(notification):
+    return {
+        'type': 'notification',
+        'data': {
+            'id': notification.id,
+            'title': notification.title,
+            'content': notification.content,
+            'notification_type': notification.notification_type,
+            'is_read': notification.is_read,
+            'created_at': notification.created_at
+        }
+    }
+
+
+def order_status_event(order, previous):
+    return {
+        'type': 'order_status',
+        'data': {
+            'id': order.id,
+            'order_number': order.order_number,
+            'payment_status': order.payment_status,
+            'order_status': order.order_status,
+            'previous': previous,
+            'paid_at': order.paid_at,
+            'completed_at': order.completed_at
+        }
+    }
+
+
+def _order_status_changes(order):
+    """返回订单状态字段的原值，无变化时返回None"""
+    state = inspect(order)
+    previous = {}
+    changed = False
+    for field in ORDER_STATUS_FIELDS:
+        history = state.attrs[field].history
+        if history.has_changes() and history.deleted:
+            previous[field] = history.deleted[0]
+            changed = changed or history.deleted[0] != getattr(order, field)
+        else:
+            previous[field] = getattr(order, field)
+    return previous if changed else None
+
+
+def _noop_set(target, value, oldvalue, initiator):
+    return value
+
+
+def track_model_events(session, broker, notification_model, order_model):
+    """监听会话提交，推送新通知与订单状态变化
+
+    事件在flush时收集，commit成功后才发布，回滚的变更不会推送。
+    """
+
+    # 开启active_history: 提交后对象已过期，赋值时仍需加载原值才能判断状态是否真正变化
+    for field in ORDER_STATUS_FIELDS:
+        event.listen(getattr(order_model, field), 'set', _noop_set, active_history=True)
+
+    @event.listens_for(session, 'after_flush')
+    def _collect_events(flush_session, flush_context):
+        pending = flush_session.info.setdefault('realtime_events', [])
+        for obj in flush_session.new:
+            if isinstance(obj, notification_model):
+                pending.append((obj.user_id, notification_event(obj)))
+        for obj in flush_session.dirty:
+            if isinstance(obj, order_model):
+                previous = _order_status_changes(obj)
+                if previous is not None:
+                    pending.append((obj.user_id, order_status_event(obj, previous)))
+
+    @event.listens_for(session, 'after_commit')
+    def _publish_events(commit_session):
+        pending = commit_session.info.pop('realtime_events', None)
+        for user_id, event_data in pending or ():
+            try:
+                broker.publish(user_channel(user_id), event_data)
+            except Exception:
+                logger.warning('实时事件发布失败: %s', event_data.get('type'), exc_info=True)
+
+    @event.listens_for(session, 'after_rollback')
+    def _discard_events(rollback_session):
+        rollback_session.info.pop('realtime_events', None)
@@ -0,0 +1,54 @@
+"""
+芝栖养生平台 - 读写分离
+只读接口的查询发往只读副本 (SQLALCHEMY_BINDS['replica'])，写入与flush始终使用主库；
+用户写入后的几秒内其请求继续读主库 (read-your-writes)，避免副本复制延迟导致读不到刚写入的数据
+"""
+
+import time
+
+from flask_sqlalchemy.session import Session
+
+from cache import TTLCache
+
+REPLICA_BIND = 'replica'
+
+
+class RoutingSession(Session):
+    """session.info['read_replica'] 为真时，只读查询使用副本"""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if (bind is None and self.info.get('read_replica') and not self._flushing
+                and not getattr(clause, 'is_dml', False)):
+            engine = self._db.engines.get(REPLICA_BIND)
+            if engine is not None:
+                return engine
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+class LocalWriteTracker:
+    """进程内记录用户最近一次写入 (单worker部署与测试使用)"""
+
+    def __init__(self, sticky_seconds=5, maxsize=100000):
+        self.sticky_seconds = sticky_seconds
+        self._recent = TTLCache(maxsize=maxsize, ttl=sticky_seconds)
+
+    def mark(self, user_id):
+        self._recent.set(str(user_id), True)
+
+    def recently_wrote(self, user_id):
+        return self._recent.get(str(user_id)) is not None
+
+
+class RedisWriteTracker:
+    """Redis记录用户最近一次写入 (多worker部署时用户的下一个请求可能落在其他worker上)"""
+
+    def __init__(self, client, sticky_seconds=5, prefix='zhiqi:wrote:'):
+        self.client = client
+        self.sticky_seconds = sticky_seconds
+        self.prefix = prefix
+
+    def mark(self, user_id):
+        self.client.set(f'{self.prefix}{user_id}', int(time.time()), px=int(self.sticky_seconds * 1000))
+
+    def recently_wrote(self, user_id):
+        return bool(self.client.exists(f'{self.prefix}{user_id}'))
@@ -0,0 +1,113 @@
+"""
+芝栖养生平台 - Token吊销列表
+退出登录、修改密码后吊销JWT；每个请求的检查为O(1)内存操作 (可选Redis后端在多实例间共享)
+"""
+
+import hashlib
+import math
+import threading
+import time
+
+
+class BloomFilter:
+    """布隆过滤器: 绝大多数未吊销的token在这里就能排除，无需查精确集合"""
+
+    def __init__(self, capacity=100000, error_rate=0.001):
+        self.size = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, key):
+        digest = hashlib.blake2b(key.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hash_count))
+
+    def add(self, key):
+        for position in self._positions(key):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, key):
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+
+class LocalRevocationList:
+    """进程内吊销列表 (单进程部署与测试使用)
+
+    吊销记录保留到token原本的过期时间，过期记录在写入时顺带清理并重建布隆过滤器。
+    用户级吊销 (修改密码) 记录时间点，此前签发的token全部失效。
+    """
+
+    def __init__(self, capacity=100000, error_rate=0.001, clock=time.time):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.clock = clock
+        self._revoked = {}
+        self._user_cutoffs = {}
+        self._bloom = BloomFilter(capacity, error_rate)
+        self._lock = threading.Lock()
+        self._next_purge = clock() + 60
+
+    def revoke(self, jti, expires_at):
+        """吊销单个token，expires_at为token的过期时间戳"""
+        with self._lock:
+            self._revoked[jti] = expires_at
+            self._bloom.add(jti)
+            self._maybe_purge()
+
+    def revoke_user(self, user_id, before, expires_at):
+        """吊销某用户在before之前签发的全部token"""
+        with self._lock:
+            self._user_cutoffs[str(user_id)] = (before, expires_at)
+            self._maybe_purge()
+
+    def is_revoked(self, jti, user_id=None, issued_at=None):
+        if self._user_cutoffs and user_id is not None:
+            cutoff = self._user_cutoffs.get(str(user_id))
+            if cutoff is not None and issued_at is not None and issued_at < cutoff[0]:
+                return True
+        if jti not in self._bloom:
+            return False
+        return jti in self._revoked
+
+    def _maybe_purge(self):
+        now = self.clock()
+        if now < self._next_purge and len(self._revoked) < self.capacity:
+            return
+        self._next_purge = now + 60
+        self._revoked = {jti: exp for jti, exp in self._revoked.items() if exp > now}
+        self._user_cutoffs = {uid: cutoff for uid, cutoff in self._user_cutoffs.items() if cutoff[1] > now}
+        # 布隆过滤器不支持删除，按剩余记录重建 (记录数超过容量时扩容)
+        self._bloom = BloomFilter(max(self.capacity, len(self._revoked) * 2), self.error_rate)
+        for jti in self._revoked:
+            self._bloom.add(jti)
+
+
+class RedisRevocationList:
+    """Redis吊销列表 (多worker/多实例共享)
+
+    每条吊销记录为带过期时间的key，检查为一次EXISTS (O(1))；
+    用户级吊销与单token吊销在同一次往返中查询。
+    """
+
+    def __init__(self, client, prefix='zhiqi:revoked:', clock=time.time):
+        self.client = client
+        self.prefix = prefix
+        self.clock = clock
+
+    def _ttl(self, expires_at):
+        return max(1, int(math.ceil(expires_at - self.clock())))
+
+    def revoke(self, jti, expires_at):
+        self.client.set(f'{self.prefix}jti:{jti}', 1, ex=self._ttl(expires_at))
+
+    def revoke_user(self, user_id, before, expires_at):
+        self.client.set(f'{self.prefix}user:{user_id}', before, ex=self._ttl(expires_at))
+
+    def is_revoked(self, jti, user_id=None, issued_at=None):
+        if user_id is None:
+            return bool(self.client.exists(f'{self.prefix}jti:{jti}'))
+        revoked, cutoff = self.client.mget(f'{self.prefix}jti:{jti}', f'{self.prefix}user:{user_id}')
+        if revoked is not None:
+            return True
+        return cutoff is not None and issued_at is not None and issued_at < float(cutoff)
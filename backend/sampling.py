@@ -0,0 +1,245 @@
+"""
+芝栖养生平台 - 采样分析
+被选中的请求在处理期间由后台线程每隔 interval 秒采集一次其调用栈 (统计采样，不跟踪每次函数调用)，
+慢请求的采样结果按折叠栈格式 (flamegraph.pl / speedscope 可直接读取) 写入文件，
+用于区分序列化、ORM、密码哈希等各部分的耗时
+"""
+
+import logging
+import os
+import random
+import re
+import sys
+import threading
+import time
+from collections import Counter, deque
+from datetime import datetime
+from functools import lru_cache, partial
+
+from flask import g, request
+
+logger = logging.getLogger(__name__)
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+PROFILE_SUFFIX = '.folded'
+# 文件名: 时间-进程号-方法-端点-耗时ms.folded
+PROFILE_NAME = re.compile(r'^(\d{8}T\d{6}\.\d{6})-(\d+)-([A-Z]+)-([\w.]+)-(\d+)ms\.folded$')
+
+
+@lru_cache(maxsize=4096)
+def short_path(filename):
+    """项目文件显示相对路径，第三方库从包名开始显示"""
+    if filename.startswith(BACKEND_DIR):
+        return os.path.relpath(filename, BACKEND_DIR)
+    marker = filename.rfind('site-packages' + os.sep)
+    if marker != -1:
+        return filename[marker + len('site-packages') + 1:]
+    return os.path.basename(filename)
+
+
+def collapse_stack(frame):
+    """把调用栈折叠为 'root;...;leaf' (按函数聚合，不含行号)"""
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        names.append(f'{code.co_name} ({short_path(code.co_filename)})')
+        frame = frame.f_back
+    names.reverse()
+    return ';'.join(names)
+
+
+class StackSampler:
+    """后台采样线程 (每个进程一个)，只采集正在分析的线程，没有分析任务时阻塞等待
+    分析结果的写入也由该线程执行 (submit)，请求线程不做磁盘I/O，不影响被测量的耗时"""
+
+    def __init__(self, interval=0.005, max_pending=8):
+        self.interval = interval
+        self.max_pending = max_pending
+        self._sessions = {}
+        self._jobs = deque()
+        self._busy = False
+        self._lock = threading.Lock()
+        self._idle = threading.Condition(self._lock)
+        self._wakeup = threading.Event()
+        self._thread = None
+        self._pid = None
+
+    def _ensure_thread(self):
+        # fork出的worker不继承采样线程，需要重新启动
+        if self._thread is None or self._pid != os.getpid() or not self._thread.is_alive():
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name='stack-sampler', daemon=True)
+            self._thread.start()
+
+    def start(self, thread_id=None):
+        """开始采集线程 (默认当前线程) 的调用栈"""
+        thread_id = thread_id if thread_id is not None else threading.get_ident()
+        with self._lock:
+            self._ensure_thread()
+            self._sessions[thread_id] = Counter()
+            self._wakeup.set()
+        return thread_id
+
+    def stop(self, thread_id):
+        """停止采集，返回 {折叠栈: 采样次数}"""
+        with self._lock:
+            return self._sessions.pop(thread_id, Counter())
+
+    def submit(self, job):
+        """交给采样线程执行 (写入分析文件)；积压超过 max_pending 时丢弃，返回是否已提交"""
+        with self._lock:
+            if len(self._jobs) >= self.max_pending:
+                return False
+            self._ensure_thread()
+            self._jobs.append(job)
+            self._wakeup.set()
+        return True
+
+    def flush(self, timeout=5.0):
+        """等待已提交的任务执行完 (worker退出与测试时使用)，返回是否全部完成"""
+        with self._idle:
+            return self._idle.wait_for(lambda: not self._jobs and not self._busy, timeout)
+
+    def _run_jobs(self):
+        while True:
+            with self._lock:
+                if not self._jobs:
+                    self._busy = False
+                    self._idle.notify_all()
+                    return
+                job = self._jobs.popleft()
+                self._busy = True
+            try:
+                job()
+            except Exception:
+                logger.warning('采样分析任务失败', exc_info=True)
+
+    def _run(self):
+        while True:
+            self._wakeup.wait()
+            while True:
+                self._run_jobs()
+                with self._lock:
+                    if not self._sessions and not self._jobs:
+                        self._wakeup.clear()
+                        break
+                    if not self._sessions:
+                        continue
+                time.sleep(self.interval)
+                frames = sys._current_frames()
+                with self._lock:
+                    for thread_id, samples in self._sessions.items():
+                        frame = frames.get(thread_id)
+                        if frame is not None:
+                            samples[collapse_stack(frame)] += 1
+                del frames
+
+
+class ProfileStore:
+    """折叠栈文件目录，只保留最近 max_files 个"""
+
+    def __init__(self, directory, max_files=200):
+        self.directory = directory
+        self.max_files = max_files
+
+    def save(self, samples, method, endpoint, duration_ms):
+        os.makedirs(self.directory, exist_ok=True)
+        name = '{}-{}-{}-{}-{}ms{}'.format(
+            datetime.utcnow().strftime('%Y%m%dT%H%M%S.%f'), os.getpid(), method,
+            re.sub(r'[^\w.]', '_', endpoint or 'unmatched'), int(duration_ms), PROFILE_SUFFIX
+        )
+        path = os.path.join(self.directory, name)
+        with open(path + '.tmp', 'w', encoding='utf-8') as f:
+            for stack, count in samples.most_common():
+                f.write(f'{stack} {count}\n')
+        os.replace(path + '.tmp', path)
+        self.prune()
+        return name
+
+    def prune(self):
+        names = sorted(self.names())
+        for name in names[:max(len(names) - self.max_files, 0)]:
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except FileNotFoundError:
+                # 其他worker已删除
+                pass
+
+    def names(self):
+        try:
+            return [name for name in os.listdir(self.directory) if PROFILE_NAME.match(name)]
+        except FileNotFoundError:
+            return []
+
+    def list(self, limit=50):
+        """最近的分析文件，新的在前"""
+        profiles = []
+        for name in sorted(self.names(), reverse=True)[:limit]:
+            created, pid, method, endpoint, duration_ms = PROFILE_NAME.match(name).groups()
+            try:
+                size = os.path.getsize(os.path.join(self.directory, name))
+            except FileNotFoundError:
+                continue
+            profiles.append({
+                'name': name,
+                'created_at': datetime.strptime(created, '%Y%m%dT%H%M%S.%f').isoformat(),
+                'pid': int(pid),
+                'method': method,
+                'endpoint': endpoint,
+                'duration_ms': int(duration_ms),
+                'size': size
+            })
+        return profiles
+
+    def is_valid_name(self, name):
+        return bool(PROFILE_NAME.match(name))
+
+
+class SamplingProfiler:
+    """请求采样分析: 带 header 且 authorize() 通过的请求总是保存，
+    其余请求按 1/sample_rate 的概率采样，耗时超过 slow_ms 才保存"""
+
+    def __init__(self, store, sampler=None, sample_rate=0, slow_ms=500, header='X-Profile-Request',
+                 authorize=None):
+        self.store = store
+        self.sampler = sampler or StackSampler()
+        self.sample_rate = sample_rate
+        self.slow_ms = slow_ms
+        self.header = header
+        self.authorize = authorize
+
+    def init_app(self, app):
+        app.before_request(self.before_request)
+        # teardown在异常时也会执行，保证停止采集
+        app.teardown_request(self.teardown_request)
+
+    def _requested(self):
+        return (request.headers.get(self.header) == '1' and self.authorize is not None
+                and self.authorize())
+
+    def before_request(self):
+        if self._requested():
+            forced = True
+        elif self.sample_rate and random.randrange(self.sample_rate) == 0:
+            forced = False
+        else:
+            return
+        g._sampling = (self.sampler.start(), forced, time.perf_counter())
+
+    def teardown_request(self, error=None):
+        session = g.pop('_sampling', None)
+        if session is None:
+            return
+        thread_id, forced, started = session
+        samples = self.sampler.stop(thread_id)
+        duration_ms = (time.perf_counter() - started) * 1000
+        if samples and (forced or duration_ms >= self.slow_ms):
+            # 写文件交给采样线程，不占用请求线程
+            if not self.sampler.submit(partial(self._save, samples, request.method, request.endpoint, duration_ms)):
+                logger.warning('采样分析文件写入积压，丢弃 %s %s', request.method, request.endpoint)
+
+    def _save(self, samples, method, endpoint, duration_ms):
+        try:
+            self.store.save(samples, method, endpoint, duration_ms)
+        except OSError:
+            logger.warning('采样分析文件写入失败', exc_info=True)
@@ -17,6 +17,7 @@ CREATE TABLE IF NOT EXISTS users (
     points INT DEFAULT 0,
     total_spent DECIMAL(10, 2) DEFAULT 0.00,
     is_active BOOLEAN DEFAULT TRUE,
+    role VARCHAR(20) NOT NULL DEFAULT 'user', -- 已有数据库: ALTER TABLE users ADD COLUMN role VARCHAR(20) NOT NULL DEFAULT 'user' AFTER is_active;
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
 );
@@ -243,6 +244,17 @@ CREATE TABLE IF NOT EXISTS admin_logs (
     FOREIGN KEY (admin_id) REFERENCES users(id) ON DELETE SET NULL
 );
 
+-- 上传文件表 (内容寻址，按SHA-256去重并引用计数)
+CREATE TABLE IF NOT EXISTS upload_blobs (
+    sha256 CHAR(64) PRIMARY KEY,
+    extension VARCHAR(10) NOT NULL,
+    size BIGINT NOT NULL,
+    ref_count INT NOT NULL DEFAULT 1,
+    variants JSON,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+);
+
 -- 创建索引以提高查询性能
 CREATE INDEX idx_content_type ON content(content_type, status);
 CREATE INDEX idx_content_publish_time ON content(publish_time);
@@ -254,3 +266,4 @@ CREATE INDEX idx_orders_status ON orders(order_status, payment_status);
 CREATE INDEX idx_order_items_order ON order_items(order_id);
 CREATE INDEX idx_reviews_target ON reviews(target_type, target_id, status);
 CREATE INDEX idx_user_activities_user ON user_activities(user_id, participation_status);
+CREATE INDEX idx_upload_blobs_gc ON upload_blobs(ref_count, updated_at);
@@ -0,0 +1,238 @@
+"""
+芝栖养生平台 - JSON序列化
+每个模型按视图 (card/detail等) 声明字段列表，首次使用时编译成一个直接构造dict的编码函数；
+同一份字段列表生成查询的 load_only/selectinload 选项，列表接口只读取需要输出的列；
+响应体由 orjson 编码 (未安装时回退到标准库json)，日期时间在编码时转换为ISO格式
+"""
+
+import datetime
+import decimal
+import json
+
+from flask.json.provider import JSONProvider
+from sqlalchemy.orm import configure_mappers, load_only, selectinload
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson为可选依赖
+    orjson = None
+
+BACKEND = 'orjson' if orjson is not None else 'json'
+
+
+class FieldSelectionError(ValueError):
+    """fields= 参数包含视图中不存在的字段"""
+
+
+class Field:
+    """字段声明: kind 为 raw/decimal/list/dict/nested/method"""
+
+    def __init__(self, name, kind='raw', attr=None, view=None, many=False, func=None, depends=()):
+        self.name = name
+        self.kind = kind
+        self.attr = attr or name
+        self.view = view
+        self.many = many
+        self.func = func
+        self.depends = depends
+
+
+def decimal_field(name, attr=None):
+    """Numeric列 -> float (None保持为None)"""
+    return Field(name, 'decimal', attr)
+
+
+def optional_decimal_field(name, attr=None):
+    """可选Numeric列 -> float，0与None都输出为None (原价、重量等未填写时为0的字段，保持原接口行为)"""
+    return Field(name, 'optional_decimal', attr)
+
+
+def list_field(name, attr=None):
+    """JSON列，空值输出为 []"""
+    return Field(name, 'list', attr)
+
+
+def dict_field(name, attr=None):
+    """JSON列，空值输出为 {}"""
+    return Field(name, 'dict', attr)
+
+
+def nested(name, view, attr=None, many=False):
+    """关联对象按其模型的视图序列化 (单个对象为空时输出None)"""
+    return Field(name, 'nested', attr, view=view, many=many)
+
+
+def method(name, func, depends=()):
+    """由 func(obj) 计算的字段，depends 声明 func 读取的字段 (用于生成查询选项)"""
+    return Field(name, 'method', func=func, depends=[_field(f) for f in depends])
+
+
+def _field(spec):
+    return Field(spec) if isinstance(spec, str) else spec
+
+
+class SerializerRegistry:
+    """模型序列化视图注册表"""
+
+    def __init__(self):
+        self._fields = {}
+        self._encoders = {}
+
+    def register(self, model, view, fields):
+        self._fields[(model, view)] = [_field(f) for f in fields]
+        self._encoders = {key: encode for key, encode in self._encoders.items() if key[:2] != (model, view)}
+
+    def fields(self, model, view, only=None):
+        """视图的字段声明列表，only 为字段名集合时只返回其中的字段"""
+        fields = self._fields[(model, view)]
+        if only is None:
+            return fields
+        return [field for field in fields if field.name in only]
+
+    def parse_fields(self, model, view, text):
+        """解析 fields= 查询参数 (逗号分隔)，未指定时返回None表示视图的全部字段"""
+        if not text:
+            return None
+        names = {name.strip() for name in text.split(',') if name.strip()}
+        available = {field.name for field in self.fields(model, view)}
+        unknown = names - available
+        if unknown:
+            raise FieldSelectionError(f'不支持的字段: {", ".join(sorted(unknown))}')
+        if 'id' in available:
+            names.add('id')
+        return frozenset(names)
+
+    def encoder(self, model, view, only=None):
+        """返回视图 (或其部分字段) 的编码函数 obj -> dict"""
+        key = (model, view, only)
+        encode = self._encoders.get(key)
+        if encode is None:
+            encode = self._encoders[key] = self._compile(model, view, only)
+        return encode
+
+    def load_options(self, model, view, only=None):
+        """查询选项: 只加载视图输出的列，关联对象用selectinload批量加载"""
+        configure_mappers()
+        columns, options = self._plan(model, self.fields(model, view, only))
+        return [load_only(*columns), *options]
+
+    def _plan(self, model, fields):
+        columns, options = [], []
+        for field in fields:
+            if field.kind == 'method':
+                depends = self._plan(model, field.depends)
+                columns += depends[0]
+                options += depends[1]
+                continue
+            attr = getattr(model, field.attr)
+            prop = attr.property
+            if not hasattr(prop, 'mapper'):
+                columns.append(attr)
+                continue
+            # 关联: 加载本表的外键列，关联表按其视图只加载需要的列
+            target = prop.mapper.class_
+            columns += [getattr(model, prop.parent.get_property_by_column(column).key) for column in prop.local_columns]
+            if field.view is None:
+                options.append(selectinload(attr))
+            else:
+                nested_columns, nested_options = self._plan(target, self.fields(target, field.view))
+                options.append(selectinload(attr).options(load_only(*nested_columns), *nested_options))
+        return columns, options
+
+    def dump(self, obj, view='detail'):
+        if obj is None:
+            return None
+        return self.encoder(type(obj), view)(obj)
+
+    def dump_many(self, objs, view='card'):
+        objs = list(objs)
+        if not objs:
+            return []
+        encode = self.encoder(type(objs[0]), view)
+        return [encode(obj) for obj in objs]
+
+    def _compile(self, model, view, only=None):
+        # backref 定义的关联在映射配置完成后才出现在模型类上
+        configure_mappers()
+        namespace = {'_float': float}
+        items = []
+        for i, field in enumerate(self.fields(model, view, only)):
+            getter = f'obj.{field.attr}'
+            if field.kind == 'decimal':
+                expr = f'(None if (v := {getter}) is None else _float(v))'
+            elif field.kind == 'optional_decimal':
+                expr = f'(_float(v) if (v := {getter}) else None)'
+            elif field.kind == 'list':
+                expr = f'({getter} or [])'
+            elif field.kind == 'dict':
+                expr = f'({getter} or {{}})'
+            elif field.kind == 'nested':
+                namespace[f'_nested{i}'] = self._nested_encoder(model, field)
+                if field.many:
+                    expr = f'[_nested{i}(item) for item in {getter}]'
+                else:
+                    expr = f'(None if (v := {getter}) is None else _nested{i}(v))'
+            elif field.kind == 'method':
+                namespace[f'_method{i}'] = field.func
+                expr = f'_method{i}(obj)'
+            else:
+                # 日期时间原样保留，由 dumps 编码为ISO格式
+                expr = getter
+            items.append(f'{field.name!r}: {expr}')
+
+        source = f'def encode(obj):\n    return {{{", ".join(items)}}}\n'
+        exec(compile(source, f'<serializer {model.__name__}.{view}>', 'exec'), namespace)
+        return namespace['encode']
+
+    def _nested_encoder(self, model, field):
+        # 关联模型可能在当前模型之后注册，首次调用时再取编码函数
+        target = getattr(model, field.attr).property.mapper.class_
+        encoders = []
+
+        def encode(obj):
+            if not encoders:
+                encoders.append(self.encoder(target, field.view))
+            return encoders[0](obj)
+        return encode
+
+
+def _default(value):
+    """orjson/标准库json不能直接编码的类型"""
+    if isinstance(value, (datetime.datetime, datetime.date, datetime.time)):
+        return value.isoformat()
+    if isinstance(value, decimal.Decimal):
+        return float(value)
+    if isinstance(value, (set, frozenset, tuple)):
+        return list(value)
+    raise TypeError(f'Object of type {type(value).__name__} is not JSON serializable')
+
+
+def dumps_stdlib(data):
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':'), default=_default).encode('utf-8')
+
+
+if orjson is not None:
+    def dumps(data):
+        """编码为UTF-8字节串"""
+        return orjson.dumps(data, default=_default, option=orjson.OPT_NON_STR_KEYS)
+
+    loads = orjson.loads
+else:  # pragma: no cover
+    dumps = dumps_stdlib
+    loads = json.loads
+
+
+class FastJSONProvider(JSONProvider):
+    """Flask JSON提供者: jsonify、request.get_json 使用同一套编码"""
+
+    mimetype = 'application/json'
+
+    def dumps(self, obj, **kwargs):
+        return dumps(obj).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        return loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(dumps(obj), mimetype=self.mimetype)
@@ -0,0 +1,250 @@
+"""
+芝栖养生平台 - 进程级服务
+实时事件、JWT身份解析与吊销、权限与审计日志、限流、读写分离等各领域共用的服务与装饰器
+"""
+
+import random
+import string
+import atexit
+from collections import namedtuple
+from datetime import datetime
+from functools import partial, wraps
+
+from flask import current_app, request, jsonify, has_request_context
+from flask_jwt_extended import create_access_token, create_refresh_token, get_jwt, get_jwt_identity, jwt_required, verify_jwt_in_request, current_user
+from flask_jwt_extended.exceptions import JWTExtendedException
+from jwt.exceptions import PyJWTError
+from sqlalchemy import event
+
+from cache import TTLCache
+from revocation import LocalRevocationList, RedisRevocationList
+from permissions import PermissionMatrix, PROFILE_VIEW
+from audit import AuditLogWriter
+from ratelimit import LocalRateLimiter, RedisRateLimiter, parse_rate_limits, retry_after_header
+from realtime import LocalBroker, RedisBroker, track_model_events
+from metrics import RequestMetrics
+from sampling import ProfileStore, SamplingProfiler, StackSampler
+from replica import REPLICA_BIND, LocalWriteTracker, RedisWriteTracker
+from config import settings, DEFAULT_RATE_LIMITS
+from extensions import db, jwt, background_context, create_backend, db_pool_metrics, db_replica_pool_metrics, response_compressor
+from models import User, Order, Notification, AdminLog
+
+# 实时事件代理: 提交后推送新通知与订单状态变化
+event_broker = create_backend(settings['REALTIME_BROKER_URL'], LocalBroker, RedisBroker, '事件代理')
+track_model_events(db.session, event_broker, Notification, Order)
+
+# JWT身份解析: 精简用户记录缓存，认证请求无需每次查询用户表
+CurrentUser = namedtuple('CurrentUser', ['id', 'username', 'member_level', 'is_active', 'role'])
+user_cache = TTLCache(maxsize=settings['USER_CACHE_SIZE'], ttl=settings['USER_CACHE_TTL'])
+
+def load_user_record(user_id):
+    """读取精简用户记录 (经过缓存)，用户不存在时返回None"""
+    record = user_cache.get(user_id)
+    if record is None:
+        row = db.session.query(User.id, User.username, User.member_level, User.is_active, User.role)\
+            .filter(User.id == user_id).first()
+        # 不存在的用户也缓存，避免伪造的token反复查库
+        record = CurrentUser(*row) if row else False
+        user_cache.set(user_id, record)
+    return record or None
+
+@jwt.user_lookup_loader
+def load_current_user(jwt_header, jwt_data):
+    """解析JWT身份，停用或已删除的用户返回None (flask_jwt_extended 返回401)"""
+    try:
+        user_id = int(jwt_data['sub'])
+    except (TypeError, ValueError):
+        return None
+    record = load_user_record(user_id)
+    if record is None or not record.is_active:
+        return None
+    return record
+
+# Token吊销列表 (内存布隆过滤器+精确集合，或Redis)
+revocation_list = create_backend(settings['TOKEN_REVOCATION_URL'], LocalRevocationList, RedisRevocationList, '吊销列表')
+
+@jwt.token_in_blocklist_loader
+def check_token_revoked(jwt_header, jwt_data):
+    return revocation_list.is_revoked(jwt_data['jti'], jwt_data['sub'], jwt_data.get('iat'))
+
+@jwt.revoked_token_loader
+def revoked_token_response(jwt_header, jwt_data):
+    return jsonify({'msg': 'Token已失效，请重新登录'}), 401
+
+def issue_tokens(user_id, role):
+    """签发access/refresh token对，角色写入access token声明"""
+    return {
+        'access_token': create_access_token(identity=str(user_id), additional_claims={'role': role}),
+        'refresh_token': create_refresh_token(identity=str(user_id)),
+        'expires_in': int(current_app.config['JWT_ACCESS_TOKEN_EXPIRES'].total_seconds())
+    }
+
+def revoke_token(jwt_data):
+    revocation_list.revoke(jwt_data['jti'], jwt_data['exp'])
+
+# 权限判断 (进程内矩阵，角色来自JWT声明)
+permission_matrix = PermissionMatrix.from_json(settings['ROLE_PERMISSIONS'])
+
+def write_admin_logs(records):
+    """多行INSERT写入一批审计日志 (后台线程执行，使用独立连接)"""
+    with background_context():
+        with db.engine.begin() as connection:
+            connection.execute(AdminLog.__table__.insert(), records)
+
+admin_log_writer = AuditLogWriter(
+    write_admin_logs,
+    batch_size=settings['AUDIT_LOG_BATCH_SIZE'],
+    flush_interval=settings['AUDIT_LOG_FLUSH_MS'] / 1000,
+    max_queue=settings['AUDIT_LOG_QUEUE_SIZE']
+)
+# worker正常退出时写入队列中剩余的日志
+atexit.register(admin_log_writer.close)
+
+def client_ip():
+    """客户端IP (审计日志与按IP限流共用)
+    部署在nginx之后时需设置 PROXY_FIX_X_FOR=1 由ProxyFix从 X-Forwarded-For 还原，否则所有请求都是nginx的地址"""
+    return request.remote_addr
+
+def record_admin_action(action, target_type, target_id):
+    """记录一次管理操作 (进入队列，后台批量写入)"""
+    admin_log_writer.add({
+        'admin_id': current_user.id,
+        'action': action,
+        'target_type': target_type,
+        'target_id': target_id,
+        'details': {'method': request.method, 'path': request.path, 'body': request.get_json(silent=True)},
+        'ip_address': client_ip(),
+        'created_at': datetime.utcnow()
+    })
+
+def permission_required(permission, audit=None):
+    """校验JWT角色声明中的权限；audit=(操作名, 对象类型) 时成功的操作写入审计日志"""
+    def decorator(fn):
+        @wraps(fn)
+        @jwt_required()
+        def wrapper(*args, **kwargs):
+            if not permission_matrix.allows(get_jwt().get('role'), permission):
+                return jsonify({'msg': '权限不足'}), 403
+            result = fn(*args, **kwargs)
+            status = result[1] if isinstance(result, tuple) else 200
+            if audit is not None and status < 400:
+                target_id = next(iter(kwargs.values()), None)
+                record_admin_action(audit[0], audit[1], target_id)
+            return result
+        return wrapper
+    return decorator
+
+# 接口限流
+rate_limiter = create_backend(settings['RATE_LIMIT_STORAGE_URL'], LocalRateLimiter, RedisRateLimiter, '限流存储')
+rate_limits = parse_rate_limits(DEFAULT_RATE_LIMITS, settings['RATE_LIMITS'])
+
+def rate_limit(name, by='user'):
+    """按命名空间限流，by='user' 按登录用户 (需放在jwt_required之后)，by='ip' 按客户端IP"""
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            limit = rate_limits.get(name)
+            if limit is not None and current_app.config['RATE_LIMIT_ENABLED']:
+                identity = f'u{current_user.id}' if by == 'user' else client_ip()
+                allowed, retry_after = rate_limiter.hit(f'{name}:{identity}', limit)
+                if not allowed:
+                    return jsonify({'msg': '请求过于频繁，请稍后再试'}), 429, {'Retry-After': retry_after_header(retry_after)}
+            return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+# 读写分离
+write_tracker = create_backend(
+    settings['REPLICA_STICKY_URL'],
+    partial(LocalWriteTracker, settings['REPLICA_STICKY_SECONDS']),
+    partial(RedisWriteTracker, sticky_seconds=settings['REPLICA_STICKY_SECONDS']),
+    '写入记录'
+)
+
+def request_identity():
+    """当前请求的JWT身份，未登录或token无效时返回None"""
+    try:
+        verify_jwt_in_request(optional=True)
+        return get_jwt_identity()
+    except (JWTExtendedException, PyJWTError):
+        return None
+
+def read_replica(fn):
+    """只读接口: 查询发往只读副本，当前用户刚写入过时仍读主库"""
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        if REPLICA_BIND not in db.engines:
+            return fn(*args, **kwargs)
+        identity = request_identity()
+        db.session.info['read_replica'] = identity is None or not write_tracker.recently_wrote(identity)
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            db.session.info.pop('read_replica', None)
+    return wrapper
+
+# Prometheus指标 (METRICS_ENABLED 且安装了prometheus_client时由create_app注册)
+request_metrics = RequestMetrics(
+    pools={'primary': db_pool_metrics, 'replica': db_replica_pool_metrics},
+    caches={'user': user_cache, 'compress': response_compressor.cache}
+)
+
+def can_profile_request():
+    """请求头要求采样分析时，只有拥有 PROFILE_VIEW 权限的用户生效"""
+    try:
+        verify_jwt_in_request(optional=True)
+    except (JWTExtendedException, PyJWTError):
+        return False
+    return permission_matrix.allows(get_jwt().get('role'), PROFILE_VIEW)
+
+# 采样分析 (PROFILE_ENABLED 时由create_app注册)
+sampling_profiler = SamplingProfiler(
+    ProfileStore(settings['PROFILE_DIR'], max_files=settings['PROFILE_MAX_FILES']),
+    StackSampler(interval=settings['PROFILE_INTERVAL_MS'] / 1000),
+    sample_rate=settings['PROFILE_SAMPLE_RATE'],
+    slow_ms=settings['PROFILE_SLOW_MS'],
+    authorize=can_profile_request
+)
+
+@jwt.user_lookup_error_loader
+def user_lookup_error(jwt_header, jwt_data):
+    return jsonify({'msg': '用户不存在或已停用'}), 401
+
+@event.listens_for(db.session, 'after_flush')
+def _collect_changed_users(session, flush_context):
+    session.info['has_writes'] = True
+    changed = session.info.setdefault('changed_user_ids', set())
+    for obj in list(session.dirty) + list(session.deleted):
+        if isinstance(obj, User):
+            changed.add(obj.id)
+
+@event.listens_for(db.session, 'after_commit')
+def _invalidate_user_cache(session):
+    """用户资料提交后清除缓存 (其他worker依赖ttl过期)"""
+    for user_id in session.info.pop('changed_user_ids', ()):
+        user_cache.pop(user_id)
+
+@event.listens_for(db.session, 'after_commit')
+def _mark_recent_writer(session):
+    """记录提交了写入的用户，其后续请求在复制延迟窗口内读主库"""
+    if not session.info.pop('has_writes', False) or not has_request_context():
+        return
+    try:
+        identity = get_jwt_identity()
+    except RuntimeError:
+        # 未经过JWT校验的请求
+        return
+    if identity is not None:
+        write_tracker.mark(identity)
+
+@event.listens_for(db.session, 'after_rollback')
+def _discard_changed_users(session):
+    session.info.pop('changed_user_ids', None)
+    session.info.pop('has_writes', None)
+
+# 工具函数
+def generate_order_number():
+    """生成订单号"""
+    timestamp = datetime.now().strftime('%Y%m%d%H%M%S')
+    random_str = ''.join(random.choices(string.ascii_uppercase + string.digits, k=4))
+    return f'WZ{timestamp}{random_str}'
@@ -0,0 +1,165 @@
+"""
+芝栖养生平台 - SQL分析
+记录每个请求执行的SQL语句，同一语句形状 (参数、IN列表长度不同视为相同) 重复达到阈值时判定为N+1查询
+(通常是循环中访问 content.author、order.items 等延迟加载关系)，
+响应附带 Server-Timing 头，并输出一行JSON日志；用于开发与预发布环境
+"""
+
+import json
+import logging
+import os
+import re
+import threading
+import time
+import traceback
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from flask import g, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# 当前上下文中正在记录的QueryLog (嵌套记录时同一语句计入每一个)
+_active_logs = ContextVar('sql_query_logs', default=())
+_install_lock = threading.Lock()
+_installed = False
+
+_IN_LIST = re.compile(r'\(\s*(?:\?|%\(\w+\)s|%s|:\w+)(?:\s*,\s*(?:\?|%\(\w+\)s|%s|:\w+))*\s*\)')
+_NUMBER = re.compile(r'\b\d+\b')
+_WHITESPACE = re.compile(r'\s+')
+
+
+def statement_shape(statement):
+    """归一化SQL: 合并空白，IN (?, ?, ...) 记为 IN (...)，数字字面量记为 ?"""
+    shape = _WHITESPACE.sub(' ', statement).strip()
+    shape = _IN_LIST.sub('(...)', shape)
+    return _NUMBER.sub('?', shape)
+
+
+def caller_location():
+    """触发查询的项目内代码位置 (跳过SQLAlchemy与本模块)"""
+    for frame in reversed(traceback.extract_stack()):
+        if frame.filename.startswith(BACKEND_DIR) and frame.filename != __file__:
+            return f'{os.path.relpath(frame.filename, BACKEND_DIR)}:{frame.lineno} in {frame.name}'
+    return None
+
+
+class QueryLog:
+    """一段代码 (一个请求或测试中的一个代码块) 执行的SQL"""
+
+    def __init__(self, threshold=5):
+        self.threshold = threshold
+        self.statements = []
+        self.seconds = 0.0
+        self._shapes = {}
+
+    def record(self, statement, seconds):
+        self.statements.append(statement)
+        self.seconds += seconds
+        shape = statement_shape(statement)
+        entry = self._shapes.get(shape)
+        if entry is None:
+            entry = self._shapes[shape] = {'statement': shape, 'count': 0, 'seconds': 0.0, 'location': None}
+        entry['count'] += 1
+        entry['seconds'] += seconds
+        # 只在达到阈值时取一次调用栈，正常请求不付出这部分开销
+        if entry['count'] == self.threshold:
+            entry['location'] = caller_location()
+
+    @property
+    def count(self):
+        return len(self.statements)
+
+    def repeated(self):
+        """疑似N+1: 重复次数达到阈值的语句形状，按次数降序"""
+        suspects = [dict(entry, seconds=round(entry['seconds'] * 1000, 3))
+                    for entry in self._shapes.values() if entry['count'] >= self.threshold]
+        return sorted(suspects, key=lambda entry: entry['count'], reverse=True)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None and _active_logs.get():
+        context._profile_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = getattr(context, '_profile_started', None)
+    if started is None:
+        return
+    elapsed = time.perf_counter() - started
+    for log in _active_logs.get():
+        log.record(statement, elapsed)
+
+
+def install():
+    """在所有引擎上注册语句计时 (每个进程一次；没有正在记录的QueryLog时只做一次判断)"""
+    global _installed
+    with _install_lock:
+        if not _installed:
+            event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+            event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+            _installed = True
+
+
+@contextmanager
+def capture_queries(threshold=5):
+    """记录代码块内执行的SQL"""
+    install()
+    log = QueryLog(threshold)
+    token = _active_logs.set(_active_logs.get() + (log,))
+    try:
+        yield log
+    finally:
+        _active_logs.reset(token)
+
+
+class RequestProfiler:
+    """请求级SQL分析: 注册到应用的 before/after/teardown_request"""
+
+    def __init__(self, threshold=5, server_timing=True):
+        self.threshold = threshold
+        self.server_timing = server_timing
+
+    def init_app(self, app):
+        install()
+        app.before_request(self.before_request)
+        app.after_request(self.after_request)
+        app.teardown_request(self.teardown_request)
+
+    def before_request(self):
+        log = QueryLog(self.threshold)
+        g._sql_profile = (log, _active_logs.set(_active_logs.get() + (log,)), time.perf_counter())
+
+    def after_request(self, response):
+        profile = g.get('_sql_profile')
+        if profile is None:
+            return response
+        log, _, started = profile
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        db_ms = log.seconds * 1000
+        if self.server_timing:
+            response.headers.add('Server-Timing', f'db;dur={db_ms:.3f};desc="{log.count} queries"')
+            response.headers.add('Server-Timing', f'app;dur={elapsed_ms:.3f}')
+        suspects = log.repeated()
+        record = {
+            'method': request.method,
+            'path': request.path,
+            'endpoint': request.endpoint,
+            'status': response.status_code,
+            'duration_ms': round(elapsed_ms, 3),
+            'queries': log.count,
+            'db_ms': round(db_ms, 3),
+            'n_plus_one': suspects
+        }
+        logger.log(logging.WARNING if suspects else logging.INFO, 'sql_profile %s',
+                   json.dumps(record, ensure_ascii=False))
+        return response
+
+    def teardown_request(self, error=None):
+        profile = g.pop('_sql_profile', None)
+        if profile is not None:
+            _active_logs.reset(profile[1])
@@ -0,0 +1,193 @@
+"""
+芝栖养生平台 - 上传文件存储后端
+本地文件系统与S3兼容对象存储 (AWS S3 / MinIO / 阿里云OSS等)，支持预签名直传
+"""
+
+import base64
+import mimetypes
+import os
+import tempfile
+
+# 内容寻址文件永不变化，写入对象存储时附带永久缓存头
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+
+
+def guess_content_type(name):
+    return mimetypes.guess_type(name)[0] or 'application/octet-stream'
+
+
+def sha256_hex_to_base64(sha256):
+    """S3 x-amz-checksum-sha256 使用base64编码的摘要"""
+    return base64.b64encode(bytes.fromhex(sha256)).decode('ascii')
+
+
+def _is_not_found(error):
+    code = str(getattr(error, 'response', {}).get('Error', {}).get('Code', ''))
+    return code in ('404', 'NoSuchKey', 'NotFound')
+
+
+class LocalStorage:
+    """本地文件系统存储 (单机部署)"""
+
+    supports_presigned_upload = False
+
+    def __init__(self, root):
+        self.root = root
+
+    def local_path(self, name):
+        return os.path.join(self.root, *name.split('/'))
+
+    def exists(self, name):
+        return os.path.exists(self.local_path(name))
+
+    def head(self, name):
+        """返回对象信息 {'size': ...}，不存在时返回None"""
+        try:
+            return {'size': os.path.getsize(self.local_path(name))}
+        except FileNotFoundError:
+            return None
+
+    def put_file(self, src_path, name):
+        """移入存储 (原子重命名，源文件被消耗)"""
+        dest = self.local_path(name)
+        if os.path.abspath(src_path) == os.path.abspath(dest):
+            return
+        os.makedirs(os.path.dirname(dest), exist_ok=True)
+        os.replace(src_path, dest)
+
+    def local_copy(self, name, tmp_dir=None):
+        """返回 (本地路径, 是否为临时文件)"""
+        return self.local_path(name), False
+
+    def delete(self, name):
+        try:
+            os.remove(self.local_path(name))
+            return True
+        except FileNotFoundError:
+            return False
+
+    def url(self, name):
+        """本地存储由 /uploads 路由直接发送文件"""
+        return None
+
+
+class S3Storage:
+    """S3兼容对象存储
+
+    client 为 boto3 S3 客户端 (或接口兼容的替身)，未提供时按配置创建；
+    文件以 <prefix><存储名> 为key保存，可通过预签名URL让客户端直接上传/下载，文件内容不经过gunicorn worker。
+    """
+
+    supports_presigned_upload = True
+
+    def __init__(self, bucket, client=None, prefix='', endpoint_url=None, region=None,
+                 access_key=None, secret_key=None, public_url=None, presign_expires=900):
+        if client is None:
+            import boto3
+            client = boto3.client(
+                's3',
+                endpoint_url=endpoint_url or None,
+                region_name=region or None,
+                aws_access_key_id=access_key or None,
+                aws_secret_access_key=secret_key or None
+            )
+        self.client = client
+        self.bucket = bucket
+        self.prefix = prefix
+        self.public_url = public_url.rstrip('/') if public_url else None
+        self.presign_expires = presign_expires
+
+    def key(self, name):
+        return self.prefix + name
+
+    def local_path(self, name):
+        return None
+
+    def head(self, name):
+        try:
+            response = self.client.head_object(Bucket=self.bucket, Key=self.key(name), ChecksumMode='ENABLED')
+        except Exception as error:
+            if _is_not_found(error):
+                return None
+            raise
+        return {'size': response['ContentLength'], 'checksum_sha256': response.get('ChecksumSHA256')}
+
+    def exists(self, name):
+        return self.head(name) is not None
+
+    def put_file(self, src_path, name):
+        """上传到对象存储后删除本地源文件"""
+        self.client.upload_file(src_path, self.bucket, self.key(name), ExtraArgs={
+            'ContentType': guess_content_type(name),
+            'CacheControl': IMMUTABLE_CACHE_CONTROL
+        })
+        os.remove(src_path)
+
+    def local_copy(self, name, tmp_dir=None):
+        fd, path = tempfile.mkstemp(dir=tmp_dir, suffix='.' + name.rsplit('.', 1)[-1])
+        os.close(fd)
+        try:
+            self.client.download_file(self.bucket, self.key(name), path)
+        except Exception:
+            os.remove(path)
+            raise
+        return path, True
+
+    def delete(self, name):
+        self.client.delete_object(Bucket=self.bucket, Key=self.key(name))
+        return True
+
+    def url(self, name):
+        """公开访问地址 (配置了CDN/公开域名) 或预签名下载地址"""
+        if self.public_url:
+            return f'{self.public_url}/{self.key(name)}'
+        return self.client.generate_presigned_url(
+            'get_object',
+            Params={'Bucket': self.bucket, 'Key': self.key(name)},
+            ExpiresIn=self.presign_expires
+        )
+
+    def presign_upload(self, name, sha256):
+        """生成预签名PUT上传地址，存储端会校验内容的SHA-256"""
+        content_type = guess_content_type(name)
+        checksum = sha256_hex_to_base64(sha256)
+        url = self.client.generate_presigned_url(
+            'put_object',
+            Params={
+                'Bucket': self.bucket,
+                'Key': self.key(name),
+                'ContentType': content_type,
+                'CacheControl': IMMUTABLE_CACHE_CONTROL,
+                'ChecksumSHA256': checksum
+            },
+            ExpiresIn=self.presign_expires
+        )
+        return {
+            'method': 'PUT',
+            'upload_url': url,
+            'headers': {
+                'Content-Type': content_type,
+                'Cache-Control': IMMUTABLE_CACHE_CONTROL,
+                'x-amz-checksum-sha256': checksum
+            },
+            'expires_in': self.presign_expires
+        }
+
+
+def create_storage(config):
+    """根据配置创建存储后端: UPLOAD_STORAGE=local (默认) 或 s3"""
+    backend = config.get('UPLOAD_STORAGE', 'local')
+    if backend == 'local':
+        return LocalStorage(config['UPLOAD_FOLDER'])
+    if backend == 's3':
+        return S3Storage(
+            config['S3_BUCKET'],
+            prefix=config.get('S3_PREFIX', ''),
+            endpoint_url=config.get('S3_ENDPOINT_URL'),
+            region=config.get('S3_REGION'),
+            access_key=config.get('S3_ACCESS_KEY_ID'),
+            secret_key=config.get('S3_SECRET_ACCESS_KEY'),
+            public_url=config.get('S3_PUBLIC_URL'),
+            presign_expires=config.get('S3_PRESIGN_EXPIRES', 900)
+        )
+    raise ValueError(f'不支持的存储后端: {backend}')
@@ -0,0 +1,66 @@
+"""
+芝栖养生平台 - pytest 公共配置
+"""
+
+import os
+import sys
+
+import pytest
+
+# 测试默认使用内存SQLite，避免依赖本地MySQL
+os.environ.setdefault('DATABASE_URL', 'sqlite://')
+
+# 添加backend目录到Python路径
+backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if backend_dir not in sys.path:
+    sys.path.insert(0, backend_dir)
+
+# max_queries fixture (SQL查询数断言)
+pytest_plugins = ['pytest_sqlprofile']
+
+
+class FakeRedis:
+    """内存中的Redis客户端替身: 键值读写，register_script 返回的脚本记录调用并返回 script_result"""
+
+    def __init__(self):
+        self.data = {}
+        self.script_calls = []
+        self.script_result = None
+
+    def set(self, key, value, ex=None, px=None):
+        self.data[key] = str(value).encode()
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def exists(self, key):
+        return int(key in self.data)
+
+    def mget(self, *keys):
+        return [self.data.get(key) for key in keys]
+
+    def register_script(self, script):
+        def run(keys, args):
+            self.script_calls.append((script, keys, args))
+            return self.script_result
+        return run
+
+
+@pytest.fixture
+def fake_redis():
+    """Redis后端测试用的客户端"""
+    return FakeRedis()
+
+
+@pytest.fixture
+def app_db():
+    """内存数据库应用上下文"""
+    from app import app, db
+    from services import rate_limiter, user_cache
+    with app.app_context():
+        db.create_all()
+        yield app, db
+        db.session.remove()
+        db.drop_all()
+    user_cache.clear()
+    rate_limiter.reset()
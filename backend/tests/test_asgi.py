@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+芝栖养生平台 - ASGI部署模式测试
+"""
+
+import asyncio
+import json
+
+import pytest
+
+pytest.importorskip('a2wsgi')
+
+
+def asgi_get(application, path, query=b''):
+    """以ASGI协议发送GET请求，返回 (状态码, 响应头, 响应体)"""
+    scope = {
+        'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'GET',
+        'scheme': 'http', 'path': path, 'raw_path': path.encode(), 'query_string': query, 'root_path': '',
+        'headers': [(b'host', b'testserver')], 'client': ('127.0.0.1', 50000), 'server': ('testserver', 80)
+    }
+    messages = []
+
+    async def receive():
+        return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+    async def send(message):
+        messages.append(message)
+
+    asyncio.run(application(scope, receive, send))
+    start = next(message for message in messages if message['type'] == 'http.response.start')
+    body = b''.join(message.get('body', b'') for message in messages if message['type'] == 'http.response.body')
+    return start['status'], dict(start['headers']), body
+
+# ========== ASGI入口测试 ==========
+
+def test_asgi_application_serves_same_handlers(app_db):
+    """测试ASGI入口与WSGI应用返回相同的列表与详情响应"""
+    from asgi import application
+    from models import Content
+
+    app, db = app_db
+    content = Content(title='灵芝养生小知识', content_type='article', status='published')
+    db.session.add(content)
+    db.session.commit()
+
+    status, _, body = asgi_get(application, '/products/', b'per_page=5')
+    assert status == 200
+    assert json.loads(body) == app.test_client().get('/products/?per_page=5').get_json()
+
+    status, headers, body = asgi_get(application, f'/content/{content.id}')
+    assert status == 200 and headers[b'content-type'] == b'application/json'
+    assert json.loads(body)['title'] == '灵芝养生小知识'
+    assert asgi_get(application, '/content/999999')[0] == 404
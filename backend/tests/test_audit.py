@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+芝栖养生平台 - 审计日志异步写入测试
+"""
+
+import threading
+import time
+
+from audit import AuditLogWriter
+
+# ========== 攒批与刷新测试 ==========
+
+def test_batches_by_size_and_interval():
+    """测试满批立即写入、不足一批时按时间写入"""
+    batches = []
+    writer = AuditLogWriter(batches.append, batch_size=3, flush_interval=0.05)
+    for i in range(4):
+        writer.add({'n': i})
+
+    deadline = time.monotonic() + 2
+    while len(batches) < 2 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert [len(batch) for batch in batches] == [3, 1]
+
+    writer.add({'n': 4})
+    writer.close()
+    assert batches[-1] == [{'n': 4}]
+    assert writer.stats()['written'] == 5
+    assert not writer.add({'n': 5})
+
+def test_full_queue_drops_and_reports():
+    """测试写入阻塞导致队列满时丢弃记录并计数，关闭时写完剩余记录"""
+    release = threading.Event()
+    written = []
+
+    def slow_write(batch):
+        release.wait(2)
+        written.extend(batch)
+
+    writer = AuditLogWriter(slow_write, batch_size=1, flush_interval=0.01, max_queue=2, put_timeout=0.01)
+    results = [writer.add({'n': i}) for i in range(6)]
+    stats = writer.stats()
+    assert stats['dropped'] == results.count(False) > 0
+    assert stats['max_depth'] <= 2
+
+    release.set()
+    writer.close()
+    assert len(written) == results.count(True)
+    assert writer.stats()['queue_depth'] == 0
@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+芝栖养生平台 - 认证与身份缓存测试
+"""
+
+from sqlalchemy import event
+
+from cache import TTLCache
+
+
+def make_user(db, username='alice', **kwargs):
+    from app import User
+    kwargs.setdefault('password', 'x')
+    user = User(username=username, email=f'{username}@example.com', **kwargs)
+    db.session.add(user)
+    db.session.commit()
+    return user
+
+
+def auth_headers(user):
+    from flask_jwt_extended import create_access_token
+    return {'Authorization': f'Bearer {create_access_token(identity=str(user.id))}'}
+
+# ========== 缓存测试 ==========
+
+def test_ttl_cache_expiry_and_lru():
+    """测试过期与容量淘汰"""
+    now = [0]
+    cache = TTLCache(maxsize=2, ttl=10, clock=lambda: now[0])
+    cache.set('a', 1)
+    cache.set('b', 2)
+    assert cache.get('a') == 1
+    cache.set('c', 3)
+    assert cache.get('b') is None
+    now[0] = 11
+    assert cache.get('a') is None and len(cache) == 1
+
+# ========== 身份解析测试 ==========
+
+def test_identity_cached_and_deactivation_cuts_off(app_db):
+    """测试认证请求命中缓存不查用户表，停用后立即失效"""
+    from app import User
+    app, db = app_db
+    user = make_user(db)
+    headers = auth_headers(user)
+
+    user_queries = []
+    def count_user_queries(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith('SELECT') and 'FROM user' in statement:
+            user_queries.append(statement)
+
+    with app.test_client() as client:
+        assert client.get('/user/favorites', headers=headers).status_code == 200
+        event.listen(db.engine, 'before_cursor_execute', count_user_queries)
+        try:
+            assert client.get('/user/favorites', headers=headers).status_code == 200
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', count_user_queries)
+        assert user_queries == []
+
+        db.session.get(User, user.id).is_active = False
+        db.session.commit()
+        response = client.get('/user/favorites', headers=headers)
+        assert response.status_code == 401
+
+def test_unknown_identity_rejected(app_db):
+    """测试已删除用户的token被拒绝"""
+    from app import User
+    app, db = app_db
+    ghost = User(id=999, username='ghost', email='ghost@example.com', password='x')
+    with app.test_client() as client:
+        assert client.get('/user/favorites', headers=auth_headers(ghost)).status_code == 401
+
+# ========== Token吊销测试 ==========
+
+def test_revocation_lists(fake_redis):
+    """测试单token吊销、用户级吊销与过期清理"""
+    from revocation import BloomFilter, LocalRevocationList, RedisRevocationList
+
+    bloom = BloomFilter(capacity=100, error_rate=0.01)
+    bloom.add('a')
+    assert 'a' in bloom
+    assert sum(f'k{i}' in bloom for i in range(1000)) < 50
+
+    now = [1000.0]
+    for revocations in (LocalRevocationList(capacity=10, clock=lambda: now[0]),
+                        RedisRevocationList(fake_redis, clock=lambda: now[0])):
+        revocations.revoke('jti-1', expires_at=1100)
+        assert revocations.is_revoked('jti-1', '1', 990)
+        assert not revocations.is_revoked('jti-2', '1', 990)
+
+        revocations.revoke_user(7, before=1000, expires_at=2000)
+        assert revocations.is_revoked('jti-3', '7', 999)
+        assert not revocations.is_revoked('jti-4', '7', 1000)
+
+    local = LocalRevocationList(capacity=10, clock=lambda: now[0])
+    local.revoke('old', expires_at=1010)
+    now[0] = 1100
+    local.revoke('new', expires_at=1200)
+    assert not local.is_revoked('old') and local.is_revoked('new')
+
+
+def login(client, username='alice', password='secret123'):
+    response = client.post('/auth/login', json={'username': username, 'password': password})
+    assert response.status_code == 200
+    return response.get_json()
+
+
+def bearer(token):
+    return {'Authorization': f'Bearer {token}'}
+
+
+def fast_hasher(monkeypatch):
+    import domains.auth
+    from passwords import PasswordHasher
+    hasher = PasswordHasher('pbkdf2:sha256:1000', max_workers=0)
+    monkeypatch.setattr(domains.auth, 'password_hasher', hasher)
+    return hasher
+
+
+def test_refresh_rotation_and_logout(app_db, monkeypatch):
+    """测试refresh token轮换与退出登录吊销"""
+    app, db = app_db
+    make_user(db, password=fast_hasher(monkeypatch).hash('secret123'))
+
+    with app.test_client() as client:
+        tokens = login(client)
+        assert tokens['expires_in'] == 15 * 60
+        assert client.post('/auth/refresh', headers=bearer(tokens['access_token'])).status_code == 422
+
+        response = client.post('/auth/refresh', headers=bearer(tokens['refresh_token']))
+        assert response.status_code == 200
+        rotated = response.get_json()
+        assert client.post('/auth/refresh', headers=bearer(tokens['refresh_token'])).status_code == 401
+
+        response = client.post('/auth/logout', headers=bearer(rotated['access_token']),
+                               json={'refresh_token': rotated['refresh_token']})
+        assert response.status_code == 200
+        assert client.get('/user/favorites', headers=bearer(rotated['access_token'])).status_code == 401
+        assert client.post('/auth/refresh', headers=bearer(rotated['refresh_token'])).status_code == 401
+
+
+def test_password_change_revokes_tokens(app_db, monkeypatch):
+    """测试修改密码后旧token失效、新token可用"""
+    app, db = app_db
+    make_user(db, password=fast_hasher(monkeypatch).hash('secret123'))
+
+    with app.test_client() as client:
+        tokens = login(client)
+        response = client.put('/auth/password', headers=bearer(tokens['access_token']),
+                              json={'old_password': 'wrong', 'new_password': 'changed123'})
+        assert response.status_code == 400
+
+        response = client.put('/auth/password', headers=bearer(tokens['access_token']),
+                              json={'old_password': 'secret123', 'new_password': 'changed123'})
+        assert response.status_code == 200
+        assert client.get('/user/favorites', headers=bearer(tokens['access_token'])).status_code == 401
+        assert client.get('/user/favorites', headers=bearer(response.get_json()['access_token'])).status_code == 200
+        login(client, password='changed123')
+
+# ========== 管理权限测试 ==========
+
+def test_permission_matrix():
+    """测试角色权限矩阵与通配权限"""
+    from permissions import CONTENT_PUBLISH, STATS_VIEW, PermissionMatrix
+
+    matrix = PermissionMatrix()
+    assert matrix.allows('admin', STATS_VIEW)
+    assert matrix.allows('editor', CONTENT_PUBLISH)
+    assert not matrix.allows('editor', STATS_VIEW)
+    assert not matrix.allows('user', CONTENT_PUBLISH)
+    assert not matrix.allows(None, CONTENT_PUBLISH)
+    assert PermissionMatrix.from_json('{"ops": ["stats:view"]}').allows('ops', STATS_VIEW)
+
+
+def test_admin_routes_check_role_and_audit(app_db):
+    """测试管理接口按角色授权，成功的操作批量写入审计日志"""
+    from models import AdminLog, Content
+    from services import admin_log_writer
+    app, db = app_db
+    alice = make_user(db, 'alice')
+    editor = make_user(db, 'eve', role='editor')
+    content = Content(title='草稿', status='draft', content_type='article')
+    db.session.add(content)
+    db.session.commit()
+
+    from flask_jwt_extended import create_access_token
+    def role_headers(user, role):
+        return bearer(create_access_token(identity=str(user.id), additional_claims={'role': role}))
+
+    with app.test_client() as client:
+        assert client.get('/admin/stats', headers=role_headers(alice, 'user')).status_code == 403
+        assert client.get('/admin/stats', headers=role_headers(editor, 'editor')).status_code == 403
+        assert client.put(f'/admin/content/{content.id}/publish',
+                          headers=role_headers(editor, 'editor')).status_code == 200
+        assert client.put('/admin/content/999/publish', headers=role_headers(editor, 'editor')).status_code == 404
+
+    assert admin_log_writer.flush()
+    log = AdminLog.query.one()
+    assert (log.admin_id, log.action, log.target_type, log.target_id) == (editor.id, 'content_publish', 'content', content.id)
+    assert log.details['path'] == f'/admin/content/{content.id}/publish'
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+芝栖养生平台 - 响应压缩测试
+"""
+
+import gzip
+import json
+from decimal import Decimal
+
+from flask import Flask, Response, jsonify
+
+from compress import ResponseCompressor
+
+# ========== 协商与压缩测试 ==========
+
+def test_negotiate_accept_encoding():
+    """测试按q值与服务端偏好选择算法"""
+    compressor = ResponseCompressor(preferred=['gzip'])
+    assert compressor.negotiate('gzip, deflate, br') == 'gzip'
+    assert compressor.negotiate('gzip;q=0, br') is None
+    assert compressor.negotiate('*') == 'gzip'
+    assert compressor.negotiate(None) is None
+
+def test_threshold_streaming_and_cache():
+    """测试大小阈值、流式响应逐块压缩与GET压缩结果缓存"""
+    app = Flask(__name__)
+    compressor = ResponseCompressor(preferred=['gzip'], min_size=100)
+    app.after_request(compressor.after_request)
+
+    @app.route('/small')
+    def small():
+        return jsonify({'ok': True})
+
+    @app.route('/large')
+    def large():
+        return jsonify({'items': [{'name': '灵芝', 'id': i} for i in range(200)]})
+
+    @app.route('/stream')
+    def stream():
+        return Response((f'line {i}\n' for i in range(50)), mimetype='text/plain')
+
+    with app.test_client() as client:
+        headers = {'Accept-Encoding': 'gzip'}
+        response = client.get('/small', headers=headers)
+        assert 'Content-Encoding' not in response.headers
+
+        response = client.get('/large', headers=headers)
+        assert response.headers['Content-Encoding'] == 'gzip'
+        assert 'Accept-Encoding' in response.headers['Vary']
+        assert int(response.headers['Content-Length']) == len(response.data)
+        assert json.loads(gzip.decompress(response.data))['items'][199] == {'name': '灵芝', 'id': 199}
+        assert client.get('/large').headers.get('Content-Encoding') is None
+
+        client.get('/large', headers=headers)
+        assert compressor.stats()['cache_hits'] == 1
+
+        response = client.get('/stream', headers=headers)
+        assert gzip.decompress(response.data).decode().splitlines()[-1] == 'line 49'
+
+def test_product_list_compressed(app_db):
+    """测试产品列表接口按请求压缩"""
+    from models import Product
+    app, db = app_db
+    db.session.add_all([Product(name=f'灵芝茶 {i}', category='tea', price=Decimal('68.00'),
+                                           description='高山灵芝切片' * 5) for i in range(30)])
+    db.session.commit()
+
+    with app.test_client() as client:
+        response = client.get('/products/?per_page=30', headers={'Accept-Encoding': 'gzip'})
+        assert response.headers['Content-Encoding'] == 'gzip'
+        assert len(json.loads(gzip.decompress(response.data))['products']) == 30
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+芝栖养生平台 - 数据库连接池测试
+"""
+
+import pytest
+from sqlalchemy import create_engine, exc, text
+
+import dbpool
+from dbpool import PoolMetrics, build_engine_options, configure_engine, statement_timeout_sql
+
+# ========== 连接池配置测试 ==========
+
+def test_engine_options_from_config():
+    """测试连接池参数只用于支持连接池的数据库"""
+    options = build_engine_options('mysql+mysqlconnector://u:p@db/app', pool_size=8, max_overflow=2,
+                                   pool_recycle=200, isolation_level='READ COMMITTED')
+    assert options['pool_size'] == 8 and options['max_overflow'] == 2
+    assert options['pool_recycle'] == 200 and options['pool_pre_ping'] is True
+    assert options['isolation_level'] == 'READ COMMITTED'
+    assert build_engine_options('sqlite://') == {}
+
+def test_pool_metrics_wait_and_timeout(tmp_path):
+    """测试连接借出统计与连接池耗尽时的超时"""
+    metrics = PoolMetrics()
+    url = f'sqlite:///{tmp_path / "pool.db"}'
+    engine = create_engine(url, **build_engine_options(url, pool_size=1, max_overflow=0, pool_timeout=0.05,
+                                                       metrics=metrics))
+    configure_engine(engine, metrics, statement_timeout_ms=1000)
+
+    with engine.connect() as held:
+        held.execute(text('SELECT 1'))
+        with pytest.raises(exc.TimeoutError):
+            engine.connect()
+        assert metrics.stats()['checked_out'] == 1
+
+    with engine.connect() as connection:
+        connection.execute(text('SELECT 1'))
+    stats = metrics.stats()
+    assert stats['checkouts'] == 2 and stats['timeouts'] == 1 and stats['connects'] == 1
+    assert stats['wait_max_ms'] >= 50
+    engine.dispose()
+
+# ========== 语句超时测试 ==========
+
+def test_statement_timeout_by_server_type():
+    """测试按服务器类型选择超时语句，MariaDB服务器即使用mysql方言也不使用 max_execution_time"""
+    from sqlalchemy.dialects.mysql.pymysql import MySQLDialect_pymysql
+    from sqlalchemy.dialects.postgresql.psycopg2 import PGDialect_psycopg2
+
+    mysql = MySQLDialect_pymysql()
+    assert statement_timeout_sql(mysql, 1500) == 'SET SESSION max_execution_time = 1500'
+    mysql.is_mariadb = True
+    assert mysql.name == 'mysql'
+    assert statement_timeout_sql(mysql, 1500) == 'SET SESSION max_statement_time = 1.5'
+    assert statement_timeout_sql(PGDialect_psycopg2(), 1500) == 'SET statement_timeout = 1500'
+
+def test_statement_timeout_survives_checkin(tmp_path, monkeypatch):
+    """测试在隐式开始事务的驱动上，超时设置在连接归还 (回滚) 后仍然有效"""
+    # pysqlite与psycopg2一样在写语句前隐式BEGIN，用一行记录代替SET观察归还时的回滚
+    monkeypatch.setitem(dbpool.STATEMENT_TIMEOUT_SQL, 'sqlite', 'INSERT INTO session_settings VALUES ({ms})')
+    url = f'sqlite:///{tmp_path / "timeout.db"}'
+    setup = create_engine(url)
+    with setup.begin() as connection:
+        connection.execute(text('CREATE TABLE session_settings (statement_timeout INTEGER)'))
+    setup.dispose()
+
+    metrics = PoolMetrics()
+    engine = create_engine(url, **build_engine_options(url, pool_size=1, max_overflow=0, metrics=metrics))
+    configure_engine(engine, metrics, statement_timeout_ms=1000)
+    for _ in range(2):
+        with engine.connect() as connection:
+            rows = connection.execute(text('SELECT statement_timeout FROM session_settings')).scalars().all()
+            assert rows == [1000]
+    assert metrics.stats()['connects'] == 1
+    engine.dispose()
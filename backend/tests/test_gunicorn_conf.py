@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""
+芝栖养生平台 - gunicorn配置测试
+"""
+
+import os
+import runpy
+
+CONFIG_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'gunicorn.conf.py')
+
+
+def load_config(monkeypatch, **environ):
+    for name, value in environ.items():
+        monkeypatch.setenv(name, value)
+    return runpy.run_path(CONFIG_PATH)
+
+# ========== worker数量测试 ==========
+
+def test_worker_sizing_from_cpus_and_env(monkeypatch):
+    """测试按CPU数计算worker数，环境变量优先"""
+    sync = load_config(monkeypatch, GUNICORN_WORKER_CLASS='sync')
+    assert sync['workers'] == 2 * sync['cpus'] + 1 and sync['threads'] == 1
+
+    sized = load_config(monkeypatch, GUNICORN_WORKER_CLASS='gthread', GUNICORN_WORKERS='3', GUNICORN_THREADS='4')
+    assert (sized['workers'], sized['threads']) == (3, 4)
+    assert sized['preload_app'] and sized['max_requests_jitter'] > 0
+
+# ========== 生命周期钩子测试 ==========
+
+def test_worker_exit_flushes_audit_log(monkeypatch):
+    """测试worker退出时写完审计日志队列并释放连接池"""
+    import extensions
+    import services
+    from audit import AuditLogWriter
+
+    batches, disposed = [], []
+    writer = AuditLogWriter(batches.append, batch_size=10, flush_interval=60)
+    monkeypatch.setattr(services, 'admin_log_writer', writer)
+    monkeypatch.setattr(extensions, 'dispose_engines', lambda close=True: disposed.append(close))
+    writer.add({'action': 'delete_product'})
+
+    load_config(monkeypatch)['worker_exit'](None, None)
+    assert batches == [[{'action': 'delete_product'}]]
+    assert disposed == [True]
+    assert not writer.add({'action': 'late'})
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+芝栖养生平台 - 健康检查测试
+"""
+
+from sqlalchemy import event
+
+from health import ReadinessProbe
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+# ========== 就绪检查缓存测试 ==========
+
+def test_probe_caches_results_and_reports_failures():
+    """测试检查结果在ttl内复用，异常只返回类型名"""
+    clock, calls = FakeClock(), []
+
+    def failing():
+        calls.append('db')
+        raise RuntimeError('mysql://user:secret@db/wellness')
+
+    probe = ReadinessProbe(lambda: {'disk': lambda: {'free': 1}, 'db': failing}, ttl=5, clock=clock)
+    ready, checks = probe.run()
+    assert not ready
+    assert checks['disk']['ok'] and checks['disk']['free'] == 1
+    assert checks['db']['ok'] is False and checks['db']['error'] == 'RuntimeError'
+
+    clock.now = 4.9
+    assert probe.run()[1] is checks and calls == ['db']
+    clock.now = 5.1
+    probe.run()
+    assert calls == ['db', 'db']
+
+# ========== 健康检查接口测试 ==========
+
+def test_liveness_and_readiness_endpoints(app_db, monkeypatch, tmp_path):
+    """测试存活检查不访问数据库，就绪检查结果被缓存，上传目录不可写时返回503"""
+    import domains.health
+    from extensions import db
+
+    app, _ = app_db
+    monkeypatch.setattr(domains.health, 'readiness_probe', ReadinessProbe(domains.health.readiness_checks, ttl=60))
+    monkeypatch.setitem(app.config, 'UPLOAD_FOLDER', str(tmp_path / 'uploads'))
+    statements = []
+    listener = lambda *args: statements.append(args[2])
+    event.listen(db.engine, 'before_cursor_execute', listener)
+    client = app.test_client()
+    try:
+        response = client.get('/api/health')
+        assert response.status_code == 200 and response.get_json() == {'status': 'ok'}
+        assert statements == []
+
+        response = client.get('/api/health/ready')
+        body = response.get_json()
+        assert response.status_code == 200 and body['status'] == 'ready'
+        assert {'db_pool', 'database', 'upload_dir'} <= set(body['checks'])
+        assert statements == ['SELECT 1']
+        client.get('/api/health/ready')
+        assert statements == ['SELECT 1']
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', listener)
+
+    (tmp_path / 'blocked').write_text('')
+    monkeypatch.setitem(app.config, 'UPLOAD_FOLDER', str(tmp_path / 'blocked' / 'uploads'))
+    monkeypatch.setattr(domains.health, 'readiness_probe', ReadinessProbe(domains.health.readiness_checks, ttl=60))
+    response = client.get('/api/health/ready')
+    assert response.status_code == 503
+    assert response.get_json()['checks']['upload_dir']['ok'] is False
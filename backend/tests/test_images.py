@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+芝栖养生平台 - 响应式图片衍生图测试
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from images import DerivativeGenerator, build_srcset, derivative_name, render_derivatives
+from storage import LocalStorage
+from uploads import ContentAddressedStore
+
+Image = pytest.importorskip('PIL.Image')
+
+
+def make_image(path, size, mode='RGB'):
+    Image.new(mode, size).save(path)
+
+# ========== 衍生图测试 ==========
+
+def test_srcset_urls():
+    """测试衍生图命名与srcset格式"""
+    url = '/uploads/ab/cd/abcd.png'
+    assert derivative_name(url, 320, 'webp') == '/uploads/ab/cd/abcd_w320.webp'
+    assert derivative_name(url, 320, 'jpeg') == '/uploads/ab/cd/abcd_w320.jpg'
+    assert build_srcset(url, [640, 320]) == {
+        'webp': '/uploads/ab/cd/abcd_w320.webp 320w, /uploads/ab/cd/abcd_w640.webp 640w',
+        'jpeg': '/uploads/ab/cd/abcd_w320.jpg 320w, /uploads/ab/cd/abcd_w640.jpg 640w'
+    }
+    assert build_srcset(url, []) is None
+
+def test_render_skips_upscaling(tmp_path):
+    """测试只生成小于原图宽度的缩略图"""
+    source = str(tmp_path / 'photo.png')
+    make_image(source, (800, 400), mode='RGBA')
+
+    assert render_derivatives(source, [320, 640, 1280]) == [320, 640]
+    with Image.open(str(tmp_path / 'photo_w320.webp')) as thumb:
+        assert thumb.size == (320, 160)
+    with Image.open(str(tmp_path / 'photo_w640.jpg')) as thumb:
+        assert thumb.mode == 'RGB'
+    assert not os.path.exists(str(tmp_path / 'photo_w1280.webp'))
+
+def test_generator_reports_and_deletes(tmp_path):
+    """测试生成完成回调与衍生图删除"""
+    store = ContentAddressedStore(LocalStorage(str(tmp_path)), str(tmp_path / '.tmp'))
+    name = 'ab/cd/abcd.jpg'
+    os.makedirs(os.path.dirname(store.path(name)))
+    make_image(store.path(name), (500, 500))
+
+    completed = {}
+    generator = DerivativeGenerator(store, [100, 200], executor=ThreadPoolExecutor(max_workers=1),
+                                    on_complete=completed.__setitem__)
+    assert generator.submit('ab/cd/clip.mp4', 'clip') is None
+    generator.submit(name, 'abcd').result()
+    generator.shutdown()
+
+    assert completed == {'abcd': [100, 200]}
+    assert store.exists('ab/cd/abcd_w100.webp')
+    generator.delete(name, [100, 200])
+    assert not store.exists('ab/cd/abcd_w100.webp')
+    assert store.exists(name)
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+芝栖养生平台 - Prometheus指标测试
+"""
+
+import os
+import subprocess
+import sys
+
+import pytest
+
+pytest.importorskip('prometheus_client')
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 一个worker进程: 请求 /products/ 两次并写入多进程指标文件
+WORKER_SCRIPT = '''
+import app
+with app.app.app_context():
+    app.db.create_all()
+client = app.app.test_client()
+for _ in range(2):
+    assert client.get('/products/').status_code == 200
+'''
+
+
+def sample(text, name, **labels):
+    """从指标文本中取出指定名称与标签的样本值"""
+    for line in text.splitlines():
+        if line.startswith(name + '{') and all(f'{key}="{value}"' in line for key, value in labels.items()):
+            return float(line.rsplit(' ', 1)[1])
+    return None
+
+# ========== 请求指标测试 ==========
+
+def test_request_latency_and_query_metrics(app_db, monkeypatch):
+    """测试按命名空间/端点/方法/状态码记录延迟，并记录每个请求的SQL次数"""
+    app, _ = app_db
+    client = app.test_client()
+    monkeypatch.setitem(app.config, 'METRICS_TOKEN', '')
+    monkeypatch.setitem(app.config, 'METRICS_ALLOW_ANONYMOUS', False)
+    assert client.get('/metrics').status_code == 403
+
+    monkeypatch.setitem(app.config, 'METRICS_ALLOW_ANONYMOUS', True)
+    before = sample(client.get('/metrics').get_data(as_text=True),
+                    'zhiqi_http_request_duration_seconds_count', namespace='products', status='200') or 0
+    assert client.get('/products/').status_code == 200
+    client.get('/no-such-page')
+
+    text = client.get('/metrics').get_data(as_text=True)
+    assert sample(text, 'zhiqi_http_request_duration_seconds_count',
+                  namespace='products', endpoint='products_product_list', method='GET', status='200') == before + 1
+    assert sample(text, 'zhiqi_http_request_duration_seconds_count', namespace='unmatched', status='404') >= 1
+    assert sample(text, 'zhiqi_db_queries_per_request_sum', namespace='products') >= 1
+    assert sample(text, 'zhiqi_cache_lookups_total', cache='user', result='hit') is not None
+
+    monkeypatch.setitem(app.config, 'METRICS_TOKEN', 'scrape-secret')
+    assert client.get('/metrics').status_code == 401
+    assert client.get('/metrics', headers={'Authorization': 'Bearer scrape-secret'}).status_code == 200
+
+# ========== 多进程汇总测试 ==========
+
+def test_multiprocess_metrics_aggregate_workers(tmp_path):
+    """测试设置 PROMETHEUS_MULTIPROC_DIR 后 /metrics 汇总所有worker进程的指标"""
+    env = dict(os.environ, DATABASE_URL='sqlite://', UPLOAD_FOLDER=str(tmp_path / 'uploads'),
+               PROMETHEUS_MULTIPROC_DIR=str(tmp_path / 'prometheus'), METRICS_TOKEN='scrape-secret')
+    os.makedirs(env['PROMETHEUS_MULTIPROC_DIR'])
+    for _ in range(2):
+        subprocess.run([sys.executable, '-c', WORKER_SCRIPT], cwd=BACKEND_DIR, env=env, check=True)
+
+    exporter = ('import app; print(app.app.test_client().get("/metrics", '
+                'headers={"Authorization": "Bearer scrape-secret"}).get_data(as_text=True))')
+    text = subprocess.run([sys.executable, '-c', exporter], cwd=BACKEND_DIR, env=env, check=True,
+                          capture_output=True, text=True).stdout
+    assert sample(text, 'zhiqi_http_request_duration_seconds_count',
+                  namespace='products', method='GET', status='200') == 4
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+芝栖养生平台 - 密码哈希测试
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from werkzeug.security import generate_password_hash
+
+from passwords import PasswordHasher, PasswordHasherBusy, hash_method
+
+# 测试使用低强度参数，避免拖慢测试
+FAST = 'pbkdf2:sha256:1000'
+FASTER = 'pbkdf2:sha256:500'
+
+# ========== 哈希器测试 ==========
+
+def test_hash_verify_and_rehash():
+    """测试校验与参数变化后的自动升级"""
+    hasher = PasswordHasher(FASTER, max_workers=0)
+    pwhash = hasher.hash('secret123')
+    assert hash_method(pwhash) == FASTER
+    assert hasher.verify(pwhash, 'secret123')
+    assert not hasher.needs_rehash(pwhash)
+
+    upgraded = PasswordHasher(FAST, max_workers=0)
+    assert upgraded.needs_rehash(pwhash)
+    assert upgraded.verify_and_update(pwhash, 'wrong') == (False, None)
+    valid, new_hash = upgraded.verify_and_update(pwhash, 'secret123')
+    assert valid and hash_method(new_hash) == FAST
+    assert upgraded.verify_and_update(new_hash, 'secret123') == (True, None)
+
+def test_pending_limit_fails_fast():
+    """测试在途任务已满时快速失败"""
+    hasher = PasswordHasher(FAST, max_pending=1, queue_timeout=0.01,
+                            executor=ThreadPoolExecutor(max_workers=1))
+    assert hasher.verify(hasher.hash('pw'), 'pw')
+
+    hasher._slots.acquire()
+    with pytest.raises(PasswordHasherBusy):
+        hasher.hash('pw')
+    hasher._slots.release()
+    hasher.shutdown()
+
+    # 默认等待不超过0.1秒，不会长时间占住请求线程
+    hasher = PasswordHasher(FAST, max_pending=1, executor=ThreadPoolExecutor(max_workers=1))
+    hasher._slots.acquire()
+    started = time.perf_counter()
+    with pytest.raises(PasswordHasherBusy):
+        hasher.hash('pw')
+    assert time.perf_counter() - started < 0.5
+    hasher.shutdown()
+
+def test_login_upgrades_hash(app_db, monkeypatch):
+    """测试登录时按新参数重新哈希，以及繁忙时返回503"""
+    import domains.auth
+    from models import User
+    app, db = app_db
+    hasher = PasswordHasher(FAST, max_workers=0)
+    monkeypatch.setattr(domains.auth, 'password_hasher', hasher)
+
+    user = User(username='alice', email='alice@example.com',
+                password=generate_password_hash('secret123', FASTER))
+    db.session.add(user)
+    db.session.commit()
+
+    with app.test_client() as client:
+        response = client.post('/auth/login', json={'username': 'alice', 'password': 'secret123'})
+        assert response.status_code == 200
+        assert hash_method(db.session.get(User, user.id).password) == FAST
+
+        assert client.post('/auth/login', json={'username': 'alice', 'password': 'nope'}).status_code == 401
+
+        def busy(*args):
+            raise PasswordHasherBusy()
+        monkeypatch.setattr(hasher, 'verify_and_update', busy)
+        response = client.post('/auth/login', json={'username': 'alice', 'password': 'secret123'})
+        assert response.status_code == 503
+        assert response.headers['Retry-After'] == '1'
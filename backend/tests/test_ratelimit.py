@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+芝栖养生平台 - 接口限流测试
+"""
+
+import time
+
+import pytest
+
+from ratelimit import LocalRateLimiter, RateLimit, RedisRateLimiter, parse_rate_limits, retry_after_header
+
+# ========== 令牌桶测试 ==========
+
+def test_rule_parsing():
+    """测试规则解析与覆盖"""
+    limit = RateLimit.parse('10/minute;burst=20')
+    assert (limit.rate, limit.period, limit.burst) == (10, 60, 20)
+    limits = parse_rate_limits({'login': '10/minute', 'like': '60/minute'}, '{"login": "5/second", "like": ""}')
+    assert limits['login'].period == 1 and 'like' not in limits
+    assert retry_after_header(0.2) == '1'
+
+def test_local_bucket_burst_and_refill():
+    """测试突发容量、等待时间与令牌补充"""
+    now = [100.0]
+    limiter = LocalRateLimiter(clock=lambda: now[0])
+    limit = RateLimit(6, 60, burst=3)
+
+    assert [limiter.hit('k', limit)[0] for _ in range(4)] == [True, True, True, False]
+    allowed, retry_after = limiter.hit('k', limit)
+    assert not allowed and retry_after == 10
+    assert limiter.hit('other', limit)[0]
+
+    now[0] += 10
+    assert limiter.hit('k', limit)[0]
+    assert not limiter.hit('k', limit)[0]
+
+def test_local_eviction_with_live_keys():
+    """测试key全部未过期时仍按最久未放行淘汰，且不逐次扫描全部key"""
+    limiter = LocalRateLimiter(max_keys=3, clock=lambda: 100.0)
+    limit = RateLimit(5, 3600, burst=3)
+
+    for i in range(1000):
+        assert limiter.hit(f'register:10.0.{i // 256}.{i % 256}', limit)[0]
+    assert len(limiter._tat) == 3
+
+    assert [limiter.hit('hot', limit)[0] for _ in range(4)] == [True, True, True, False]
+    limiter.hit('a', limit)
+    limiter.hit('b', limit)
+    # hot 最近放行过，仍在计数中
+    assert not limiter.hit('hot', limit)[0]
+    limiter.hit('c', limit)
+    assert list(limiter._tat) == ['a', 'b', 'c']
+
+def test_local_overhead_under_50us():
+    """测试进程内后端单次判断开销"""
+    limiter = LocalRateLimiter()
+    limit = RateLimit(1000000, 1)
+    count = 20000
+    started = time.perf_counter()
+    for i in range(count):
+        limiter.hit(f'login:10.0.0.{i % 256}', limit)
+    assert (time.perf_counter() - started) / count < 50e-6
+
+def test_redis_backend_calls_script(fake_redis):
+    """测试Redis后端的key、参数与返回值解析"""
+    fake_redis.script_result = [0, b'1.5']
+    limiter = RedisRateLimiter(fake_redis)
+    assert limiter.hit('login:1.2.3.4', RateLimit(10, 60, burst=5)) == (False, 1.5)
+    (script, keys, args), = fake_redis.script_calls
+    assert 'redis.call' in script
+    assert (keys, args) == (['zhiqi:ratelimit:login:1.2.3.4'], [6.0, 5, 1])
+
+def test_create_backend_by_url(fake_redis, monkeypatch):
+    """测试按存储地址选择进程内或Redis后端"""
+    import extensions
+    from extensions import create_backend
+
+    monkeypatch.setattr(extensions, 'redis_client', lambda url: fake_redis)
+    assert isinstance(create_backend(None, LocalRateLimiter, RedisRateLimiter, '限流存储'), LocalRateLimiter)
+    assert isinstance(create_backend('memory://', LocalRateLimiter, RedisRateLimiter, '限流存储'), LocalRateLimiter)
+    limiter = create_backend('redis://cache:6379/0', LocalRateLimiter, RedisRateLimiter, '限流存储')
+    assert isinstance(limiter, RedisRateLimiter) and limiter.client is fake_redis
+    with pytest.raises(ValueError, match='不支持的限流存储地址'):
+        create_backend('memcached://cache', LocalRateLimiter, RedisRateLimiter, '限流存储')
+
+# ========== 接口限流测试 ==========
+
+def test_login_returns_429_with_retry_after(app_db, monkeypatch):
+    """测试登录接口超出限流后返回429与Retry-After"""
+    import services
+    app, db = app_db
+    monkeypatch.setitem(services.rate_limits, 'login', RateLimit(2, 60))
+
+    with app.test_client() as client:
+        codes = [client.post('/auth/login', json={'username': 'nobody', 'password': 'x'}).status_code
+                 for _ in range(3)]
+        assert codes == [401, 401, 429]
+        response = client.post('/auth/login', json={'username': 'nobody', 'password': 'x'})
+        assert response.headers['Retry-After'] == '30'
+
+        # 其他IP不受影响
+        response = client.post('/auth/login', json={'username': 'nobody', 'password': 'x'},
+                               environ_base={'REMOTE_ADDR': '10.0.0.9'})
+        assert response.status_code == 401
+
+def test_login_buckets_by_forwarded_client_ip(monkeypatch):
+    """测试nginx之后 (PROXY_FIX_X_FOR=1) 按 X-Forwarded-For 中的客户端IP分别计数"""
+    import services
+    from app import create_app, db
+
+    monkeypatch.setitem(services.rate_limits, 'login', RateLimit(1, 60))
+    app = create_app({'PROXY_FIX_X_FOR': 1})
+    nginx = {'REMOTE_ADDR': '172.18.0.5'}
+    with app.app_context():
+        db.create_all()
+        client = app.test_client()
+
+        def login(client_ip):
+            return client.post('/auth/login', json={'username': 'nobody', 'password': 'x'},
+                               environ_base=nginx, headers={'X-Forwarded-For': client_ip}).status_code
+
+        assert [login('203.0.113.1'), login('203.0.113.1')] == [401, 429]
+        assert login('203.0.113.2') == 401
+        db.drop_all()
+    services.rate_limiter.reset()
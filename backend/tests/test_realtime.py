@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+芝栖养生平台 - 实时事件推送测试
+"""
+
+import json
+from datetime import datetime
+
+from realtime import LocalBroker, event_stream, format_sse, user_channel
+
+# ========== 代理测试 ==========
+
+def test_local_broker_routes_by_channel():
+    """测试事件只投递到对应用户频道"""
+    broker = LocalBroker()
+    alice = broker.subscribe(user_channel(1))
+    bob = broker.subscribe(user_channel(2))
+
+    assert broker.publish(user_channel(1), {'type': 'notification'}) == 1
+    assert alice.get(timeout=0) == {'type': 'notification'}
+    assert bob.get(timeout=0) is None
+
+    alice.close()
+    bob.close()
+    assert broker.subscriber_count() == 0
+
+def test_slow_subscriber_drops_oldest():
+    """测试慢消费者队列满时丢弃最旧事件"""
+    broker = LocalBroker(max_queue_size=2)
+    subscription = broker.subscribe('user:1')
+    for i in range(3):
+        broker.publish('user:1', {'type': 'tick', 'n': i})
+
+    assert subscription.dropped == 1
+    assert subscription.get(timeout=0)['n'] == 1
+    assert subscription.get(timeout=0)['n'] == 2
+
+# ========== SSE流测试 ==========
+
+def test_format_sse_frame():
+    """测试SSE帧格式"""
+    frame = format_sse({'type': 'notification', 'data': {'created_at': datetime(2024, 1, 1)}}, event_id=3)
+    lines = frame.strip().split('\n')
+    assert lines[0] == 'id: 3'
+    assert lines[1] == 'event: notification'
+    assert json.loads(lines[2][len('data: '):])['data']['created_at'] == '2024-01-01T00:00:00'
+    assert frame.endswith('\n\n')
+
+def test_event_stream_heartbeat_and_expiry():
+    """测试空闲心跳与最长连接时间"""
+    class ScriptedSubscription:
+        def __init__(self, events):
+            self.events = list(events)
+            self.closed = False
+
+        def get(self, timeout=None):
+            return self.events.pop(0)
+
+        def close(self):
+            self.closed = True
+
+    subscription = ScriptedSubscription([{'type': 'order_status'}, None])
+    ticks = iter([0, 0, 5, 10])
+    frames = list(event_stream(subscription, heartbeat=5, max_duration=10, clock=lambda: next(ticks)))
+
+    assert frames[0].startswith('retry:')
+    assert frames[1].startswith('id: 1\nevent: order_status')
+    assert frames[2] == ': keepalive\n\n'
+    assert len(frames) == 3
+    assert subscription.closed
+
+# ========== 模型事件测试 ==========
+
+def test_commit_publishes_notification_and_order_events(app_db):
+    """测试提交后推送新通知和订单状态变化"""
+    from models import Notification, Order, User
+    from services import event_broker
+    app, db = app_db
+
+    user = User(username='alice', email='alice@example.com', password='x')
+    db.session.add(user)
+    db.session.commit()
+    order = Order(order_number='WZ1', user_id=user.id, order_type='product', total_amount=10)
+    db.session.add(order)
+    db.session.commit()
+
+    subscription = event_broker.subscribe(user_channel(user.id))
+    db.session.add(Notification(user_id=user.id, title='支付提醒'))
+    order.payment_status = 'paid'
+    db.session.commit()
+
+    events = [subscription.get(timeout=0), subscription.get(timeout=0)]
+    types = sorted(e['type'] for e in events)
+    assert types == ['notification', 'order_status']
+    order_event = next(e for e in events if e['type'] == 'order_status')
+    assert order_event['data']['previous']['payment_status'] == 'pending'
+    assert order_event['data']['payment_status'] == 'paid'
+    subscription.close()
+
+def test_rollback_discards_events(app_db):
+    """测试回滚的变更不会推送"""
+    from models import Notification, User
+    from services import event_broker
+    app, db = app_db
+
+    user = User(username='bob', email='bob@example.com', password='x')
+    db.session.add(user)
+    db.session.commit()
+
+    subscription = event_broker.subscribe(user_channel(user.id))
+    db.session.add(Notification(user_id=user.id, title='草稿'))
+    db.session.flush()
+    db.session.rollback()
+
+    assert subscription.get(timeout=0) is None
+    subscription.close()
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+芝栖养生平台 - 读写分离测试
+主库使用内存SQLite，只读副本使用另一个SQLite文件，两者数据不同以区分查询落在哪个库
+"""
+
+from decimal import Decimal
+
+from flask_jwt_extended import create_access_token
+from sqlalchemy import create_engine
+
+# ========== 读写分离测试 ==========
+
+def test_reads_use_replica_until_user_writes(app_db, tmp_path, monkeypatch):
+    """测试只读接口读副本、写入走主库，写入后的用户在粘滞期内读主库"""
+    import models
+    import services
+    from replica import LocalWriteTracker, REPLICA_BIND
+    app, db = app_db
+
+    replica = create_engine(f'sqlite:///{tmp_path / "replica.db"}')
+    db.metadata.create_all(replica)
+    with replica.begin() as connection:
+        connection.execute(models.Product.__table__.insert(), [
+            {'name': '副本中的产品', 'category': 'tea', 'price': Decimal('10.00'), 'is_available': True}
+        ])
+    monkeypatch.setitem(db.engines, REPLICA_BIND, replica)
+    monkeypatch.setattr(services, 'write_tracker', LocalWriteTracker(sticky_seconds=60))
+
+    user = models.User(username='reader', email='reader@example.com', password='x')
+    db.session.add(user)
+    db.session.commit()
+    headers = {'Authorization': f'Bearer {create_access_token(identity=str(user.id))}'}
+
+    with app.test_client() as client:
+        names = [p['name'] for p in client.get('/products/', headers=headers).get_json()['products']]
+        assert names == ['副本中的产品']
+
+        # 写入发往主库
+        response = client.post('/content/', json={'title': '新文章', 'content_type': 'article', 'status': 'published'},
+                               headers=headers)
+        assert response.status_code == 201
+        assert db.session.query(models.Content).count() == 1
+
+        # 刚写入的用户读主库，能读到自己的写入；其他请求仍读副本
+        assert client.get('/content/', headers=headers).get_json()['total'] == 1
+        assert client.get('/content/').get_json()['total'] == 0
+        assert client.get('/products/', headers=headers).get_json()['products'] == []
+    replica.dispose()
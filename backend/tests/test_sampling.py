@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+芝栖养生平台 - 采样分析测试
+"""
+
+import threading
+import time
+from collections import Counter
+
+from sampling import ProfileStore, StackSampler
+
+
+def busy_wait(seconds):
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+# ========== 调用栈采样测试 ==========
+
+def test_sampler_collects_collapsed_stacks():
+    """测试采样线程按折叠栈格式记录正在执行的函数"""
+    sampler = StackSampler(interval=0.001)
+    thread_id = sampler.start()
+    busy_wait(0.1)
+    samples = sampler.stop(thread_id)
+
+    assert sum(samples.values()) > 5
+    stack, _ = samples.most_common(1)[0]
+    frames = stack.split(';')
+    assert 'busy_wait (tests/test_sampling.py)' in frames
+    assert frames.index('test_sampler_collects_collapsed_stacks (tests/test_sampling.py)') < frames.index(
+        'busy_wait (tests/test_sampling.py)')
+
+def test_store_keeps_newest_files(tmp_path):
+    """测试只保留最近 max_files 个文件，列表按时间倒序"""
+    store = ProfileStore(str(tmp_path), max_files=2)
+    for duration_ms in (100, 200, 300):
+        store.save(Counter({'main (app.py);handler (domains/auth.py)': 3}), 'GET', 'auth_login', duration_ms)
+        time.sleep(0.001)
+
+    profiles = store.list()
+    assert [profile['duration_ms'] for profile in profiles] == [300, 200]
+    assert profiles[0]['method'] == 'GET' and profiles[0]['endpoint'] == 'auth_login'
+    with open(tmp_path / profiles[0]['name'], encoding='utf-8') as f:
+        assert f.read() == 'main (app.py);handler (domains/auth.py) 3\n'
+
+# ========== 请求采样与下载接口测试 ==========
+
+def test_profile_request_header_and_download(tmp_path, monkeypatch):
+    """测试管理员带请求头的请求写入分析文件并可下载，普通用户的请求头被忽略"""
+    from flask_jwt_extended import create_access_token
+
+    from app import create_app, db
+    from models import User
+    from services import rate_limiter, sampling_profiler, user_cache
+
+    monkeypatch.setattr(sampling_profiler.store, 'directory', str(tmp_path))
+    save_threads, save = [], sampling_profiler.store.save
+    monkeypatch.setattr(sampling_profiler.store, 'save',
+                        lambda *args: save_threads.append(threading.current_thread().name) or save(*args))
+    app = create_app({'PROFILE_ENABLED': True})
+    client = app.test_client()
+    with app.app_context():
+        db.create_all()
+        admin = User(username='admin', email='admin@example.com', password='x')
+        alice = User(username='alice', email='alice@example.com', password='x')
+        db.session.add_all([admin, alice])
+        db.session.commit()
+        admin_headers = {'Authorization': 'Bearer ' + create_access_token(
+            identity=str(admin.id), additional_claims={'role': 'admin'})}
+        user_headers = {'Authorization': 'Bearer ' + create_access_token(
+            identity=str(alice.id), additional_claims={'role': 'user'})}
+
+        assert client.get('/content/', headers={**user_headers, 'X-Profile-Request': '1'}).status_code == 200
+        assert client.get('/admin/profiles', headers=admin_headers).get_json()['profiles'] == []
+
+        # 注册需要计算scrypt哈希，耗时足够采到调用栈
+        response = client.post('/auth/register', headers={**admin_headers, 'X-Profile-Request': '1'},
+                               json={'username': 'bob', 'password': 'Passw0rd!', 'email': 'bob@example.com'})
+        assert response.status_code == 201
+        assert sampling_profiler.sampler.flush()
+        # 文件由采样线程写入，不在请求线程中
+        assert save_threads == ['stack-sampler']
+        profile, = client.get('/admin/profiles', headers=admin_headers).get_json()['profiles']
+        assert profile['method'] == 'POST' and profile['endpoint'] == 'auth_user_register'
+
+        response = client.get(f"/admin/profiles/{profile['name']}", headers=admin_headers)
+        assert response.status_code == 200 and response.mimetype == 'text/plain'
+        assert all(line.rsplit(' ', 1)[1].isdigit() for line in response.get_data(as_text=True).splitlines())
+        assert client.get('/admin/profiles/../config.py', headers=admin_headers).status_code == 404
+        assert client.get('/admin/profiles', headers=user_headers).status_code == 403
+        db.drop_all()
+    user_cache.clear()
+    rate_limiter.reset()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+芝栖养生平台 - JSON序列化测试
+"""
+
+import json
+from datetime import datetime
+from decimal import Decimal
+
+from serializers import dumps, dumps_stdlib
+
+# ========== 序列化测试 ==========
+
+def test_dumps_backends_agree():
+    """测试orjson与标准库后端输出相同的JSON"""
+    data = {'price': Decimal('12.50'), 'at': datetime(2024, 5, 1, 8, 30, 15, 120),
+            'name': '灵芝茶', 'tags': ('a', 'b'), 'none': None}
+    assert json.loads(dumps(data)) == json.loads(dumps_stdlib(data)) == {
+        'price': 12.5, 'at': '2024-05-01T08:30:15.000120', 'name': '灵芝茶', 'tags': ['a', 'b'], 'none': None
+    }
+
+def test_model_views(app_db):
+    """测试模型视图: 数值、JSON列默认值与嵌套关联"""
+    import models
+    app, db = app_db
+    user = models.User(username='host', email='host@example.com', password='x', real_name='主理人')
+    db.session.add(user)
+    db.session.flush()
+    product = models.Product(name='灵芝孢子粉', category='spore', price=Decimal('199.00'), sku='S1', weight=Decimal('0'))
+    activity = models.Activity(title='茶会', activity_type='event', organizer_id=user.id, organizer_type='host',
+                                   price=Decimal('50.00'), status='published',
+                                   start_time=datetime(2024, 6, 1, 9), end_time=datetime(2024, 6, 1, 11))
+    db.session.add_all([product, activity])
+    db.session.commit()
+
+    card = models.serializer.dump(product, 'card')
+    assert card['price'] == 199.0 and card['images'] == [] and card['original_price'] is None
+    # 原价、重量为0时与原接口一样输出null
+    assert card['weight'] is None and models.serializer.dump(product, 'detail')['weight'] is None
+    product.original_price = Decimal('0.00')
+    assert models.serializer.dump(product, 'detail')['original_price'] is None
+    assert 'sku' not in card and models.serializer.dump(product, 'detail')['sku'] == 'S1'
+
+    with app.test_client() as client:
+        response = client.get('/activities/')
+        item = response.get_json()['activities'][0]
+        assert item['start_time'] == '2024-06-01T09:00:00'
+        assert item['organizer'] == {'id': user.id, 'username': 'host', 'real_name': '主理人', 'organizer_type': 'host'}
+        assert item['images_srcset'] == []
+
+        response = client.get(f'/products/{product.id}')
+        assert response.get_json()['specifications'] == {}
+        assert '灵芝孢子粉'.encode('utf-8') in response.data
+
+# ========== 字段投影测试 ==========
+
+def test_list_projection_loads_only_card_columns(app_db):
+    """测试列表接口只查询视图需要的列，fields= 进一步裁剪"""
+    from sqlalchemy import event
+    import models
+    app, db = app_db
+    author = models.User(username='writer', email='writer@example.com', password='x')
+    db.session.add(author)
+    db.session.flush()
+    db.session.add(models.Content(title='灵芝小知识', content_type='article', content='正文' * 1000,
+                                      summary='摘要', author_id=author.id, status='published'))
+    db.session.commit()
+    db.session.expunge_all()
+
+    statements = []
+    def capture(conn, cursor, statement, *args):
+        # 分页计数的子查询由数据库合并，不实际读取各列
+        if not statement.startswith('SELECT count('):
+            statements.append(statement)
+    event.listen(db.engine, 'before_cursor_execute', capture)
+    try:
+        with app.test_client() as client:
+            item = client.get('/content/').get_json()['contents'][0]
+            assert item['summary'] == '摘要' and item['author']['username'] == 'writer'
+            assert not any('content.content AS' in sql for sql in statements)
+            assert not any('user.password AS' in sql for sql in statements)
+
+            response = client.get('/content/?fields=title,author')
+            assert set(response.get_json()['contents'][0]) == {'id', 'title', 'author'}
+            assert client.get('/content/?fields=title,password').status_code == 400
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', capture)
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+芝栖养生平台 - SQL分析与N+1检测测试
+"""
+
+import json
+import logging
+from datetime import datetime
+
+import pytest
+
+from sqlprofile import capture_queries, statement_shape
+
+
+def seed_authors(db, count=4):
+    from models import Activity, Content, User
+
+    users = [User(username=f'author{i}', email=f'author{i}@example.com', password='x') for i in range(count)]
+    db.session.add_all(users)
+    db.session.flush()
+    for user in users:
+        db.session.add(Content(title=f'{user.username}的养生笔记', content_type='article', author_id=user.id,
+                               status='published'))
+        db.session.add(Activity(title='灵芝采摘体验', activity_type='experience', organizer_id=user.id,
+                                organizer_type='user', start_time=datetime(2030, 5, 1), end_time=datetime(2030, 5, 2),
+                                status='published', review_status='approved'))
+    db.session.commit()
+    db.session.expunge_all()
+
+# ========== 语句归一化与N+1检测测试 ==========
+
+def test_statement_shape_ignores_parameters():
+    """测试不同参数、IN列表长度与数字字面量归为同一语句形状"""
+    assert statement_shape('SELECT * FROM user\n  WHERE id IN (?, ?, ?)') == statement_shape(
+        'SELECT * FROM user WHERE id IN (?)')
+    assert statement_shape('SELECT * FROM product LIMIT 20') == 'SELECT * FROM product LIMIT ?'
+    assert statement_shape('SELECT * FROM t WHERE a IN (%(a_1_1)s, %(a_1_2)s)') == 'SELECT * FROM t WHERE a IN (...)'
+
+def test_lazy_relationship_in_loop_is_flagged(app_db):
+    """测试循环中访问延迟加载关系被标记为N+1，并定位到触发的代码行"""
+    from models import Content
+
+    _, db = app_db
+    seed_authors(db)
+    with capture_queries(threshold=3) as log:
+        names = [content.author.username for content in Content.query.all()]
+
+    assert len(names) == 4 and log.count == 5
+    suspect, = log.repeated()
+    assert suspect['count'] == 4 and 'FROM user' in suspect['statement']
+    assert suspect['location'].startswith('tests/test_sqlprofile.py:')
+
+# ========== 请求分析测试 ==========
+
+def test_request_profiler_server_timing_and_log(caplog):
+    """测试开启SQL分析后响应带 Server-Timing 头并输出JSON日志"""
+    from app import create_app, db
+
+    app = create_app({'SQL_PROFILE_ENABLED': True})
+    with app.app_context():
+        db.create_all()
+        seed_authors(db)
+        with caplog.at_level(logging.INFO, logger='sqlprofile'):
+            response = app.test_client().get('/content/')
+        db.drop_all()
+
+    timings = response.headers.getlist('Server-Timing')
+    assert timings[0].startswith('db;dur=') and timings[1].startswith('app;dur=')
+    record = json.loads(caplog.records[-1].getMessage().split(' ', 1)[1])
+    assert record['endpoint'] == 'content_content_list' and record['status'] == 200
+    assert record['queries'] >= 1 and record['n_plus_one'] == []
+
+# ========== 接口查询数测试 ==========
+
+def test_list_endpoints_query_budget(app_db, max_queries):
+    """测试列表接口的查询数不随返回条数增长 (作者与主办方已预加载)"""
+    from models import Content
+
+    app, db = app_db
+    seed_authors(db)
+    client = app.test_client()
+    for url in ('/content/', '/activities/', '/products/'):
+        with max_queries(3):
+            assert client.get(url).status_code == 200
+
+    from models import Review
+    for i, content in enumerate(Content.query.all()):
+        db.session.add(Review(user_id=content.author_id, target_type='product', target_id=1, rating=5,
+                              comment='很好', status='approved', is_anonymous=i == 0))
+    db.session.commit()
+    with max_queries(4):
+        response = client.get('/reviews/?target_type=product&target_id=1')
+    assert response.status_code == 200 and len(response.get_json()['reviews']) == 4
+
+    with pytest.raises(pytest.fail.Exception, match='疑似N\\+1'):
+        with max_queries(2):
+            [content.author for content in Content.query.all()]
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+芝栖养生平台 - 启动时间测试
+"""
+
+import os
+import subprocess
+import sys
+
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# 导入app (含创建默认应用) 的耗时上限，较慢的CI机器可通过环境变量放宽
+IMPORT_TIME_BUDGET_MS = float(os.environ.get('IMPORT_TIME_BUDGET_MS', 3000))
+# 只在首次使用时导入的可选依赖
+DEFERRED_MODULES = ('PIL', 'redis', 'boto3', 'prometheus_client')
+
+
+def run_python(tmp_path, *args, **environ):
+    env = dict(os.environ, DATABASE_URL='sqlite://', UPLOAD_FOLDER=str(tmp_path / 'uploads'), **environ)
+    return subprocess.run([sys.executable, *args], cwd=BACKEND_DIR, env=env, capture_output=True, text=True,
+                          check=True)
+
+
+def import_app(tmp_path):
+    """子进程以 -X importtime 导入app，返回 {模块名: 累计耗时us}"""
+    times = {}
+    for line in run_python(tmp_path, '-X', 'importtime', '-c', 'import app').stderr.splitlines():
+        if line.startswith('import time:'):
+            self_us, cumulative_us, name = line[len('import time:'):].split('|')
+            if self_us.strip().isdigit():
+                times[name.strip()] = int(cumulative_us)
+    return times
+
+# ========== 导入耗时测试 ==========
+
+def test_import_time_and_side_effects(tmp_path):
+    """测试导入app不加载可选依赖、不创建上传目录，且耗时在预算内"""
+    times = import_app(tmp_path)
+    assert not [name for name in times if name.split('.')[0] in DEFERRED_MODULES]
+    assert not (tmp_path / 'uploads').exists()
+    assert times['app'] / 1000 < IMPORT_TIME_BUDGET_MS
+
+def test_role_imports_only_enabled_domains(tmp_path):
+    """测试只读目录角色不导入订单、支付与后台管理模块"""
+    # 领域模块由importlib导入，-X importtime 不会列出，直接检查 sys.modules
+    code = 'import sys, app; print(" ".join(sorted(m for m in sys.modules if m.startswith("domains."))))'
+    loaded = set(run_python(tmp_path, '-c', code, DEPLOYMENT_ROLE='catalog').stdout.split())
+    assert {'domains.catalog', 'domains.content', 'domains.files'} <= loaded
+    assert not {'domains.orders', 'domains.payments', 'domains.admin'} & loaded
+
+# ========== 应用工厂测试 ==========
+
+def test_create_app_registers_enabled_domains():
+    """测试部署角色与 API_DOMAINS 只注册启用的业务领域"""
+    from app import create_app, db
+
+    catalog = create_app({'DEPLOYMENT_ROLE': 'catalog'})
+    rules = {rule.rule for rule in catalog.url_map.iter_rules()}
+    assert '/products/' in rules and '/content/' in rules
+    assert not [rule for rule in rules if rule.startswith(('/orders', '/admin', '/payments'))]
+    with catalog.app_context():
+        db.create_all()
+        assert catalog.test_client().get('/products/').status_code == 200
+        db.drop_all()
+
+    orders = create_app({'API_DOMAINS': 'orders'})
+    rules = {rule.rule for rule in orders.url_map.iter_rules()}
+    assert '/orders/' in rules and '/products/' not in rules
+
+    with pytest.raises(ValueError):
+        create_app({'DEPLOYMENT_ROLE': 'checkout', 'API_DOMAINS': 'catalog,products'})
+    with pytest.raises(ValueError):
+        create_app({'DEPLOYMENT_ROLE': 'search'})
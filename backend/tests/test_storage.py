@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+芝栖养生平台 - 对象存储后端测试
+使用内存中的S3兼容替身 (接口与boto3客户端一致)，无需连接MinIO/S3
+"""
+
+import base64
+import hashlib
+import io
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from storage import IMMUTABLE_CACHE_CONTROL, S3Storage
+from uploads import ContentAddressedStore
+
+
+class NotFound(Exception):
+    def __init__(self):
+        super().__init__('Not Found')
+        self.response = {'Error': {'Code': '404'}}
+
+
+class FakeS3Client:
+    """内存S3替身，实现存储后端用到的boto3客户端方法"""
+
+    def __init__(self):
+        self.objects = {}
+
+    def put_object(self, Bucket, Key, Body, ChecksumSHA256=None, **kwargs):
+        if ChecksumSHA256 and ChecksumSHA256 != base64.b64encode(hashlib.sha256(Body).digest()).decode():
+            raise ValueError('BadDigest')
+        self.objects[(Bucket, Key)] = {'body': Body, 'checksum': ChecksumSHA256, 'extra': kwargs}
+
+    def upload_file(self, Filename, Bucket, Key, ExtraArgs=None):
+        with open(Filename, 'rb') as f:
+            self.objects[(Bucket, Key)] = {'body': f.read(), 'checksum': None, 'extra': ExtraArgs or {}}
+
+    def head_object(self, Bucket, Key, **kwargs):
+        if (Bucket, Key) not in self.objects:
+            raise NotFound()
+        obj = self.objects[(Bucket, Key)]
+        response = {'ContentLength': len(obj['body'])}
+        if obj['checksum']:
+            response['ChecksumSHA256'] = obj['checksum']
+        return response
+
+    def download_file(self, Bucket, Key, Filename):
+        if (Bucket, Key) not in self.objects:
+            raise NotFound()
+        with open(Filename, 'wb') as f:
+            f.write(self.objects[(Bucket, Key)]['body'])
+
+    def delete_object(self, Bucket, Key):
+        self.objects.pop((Bucket, Key), None)
+
+    def generate_presigned_url(self, ClientMethod, Params, ExpiresIn):
+        return f'http://minio.local/{Params["Bucket"]}/{Params["Key"]}?op={ClientMethod}&expires={ExpiresIn}'
+
+
+@pytest.fixture
+def s3_store(tmp_path):
+    client = FakeS3Client()
+    storage = S3Storage('media', client=client, prefix='uploads/')
+    return ContentAddressedStore(storage, str(tmp_path / '.tmp')), client
+
+# ========== S3存储测试 ==========
+
+def test_s3_store_dedup_and_local_copy(s3_store):
+    """测试上传到对象存储、内容去重与下载临时副本"""
+    store, client = s3_store
+    name, sha256, size = store.save_stream(io.BytesIO(b'cover'), 'png')
+    assert client.objects[('media', f'uploads/{name}')]['extra']['CacheControl'] == IMMUTABLE_CACHE_CONTROL
+    assert store.exists(name) and size == 5
+    assert store.path(name) is None
+
+    again, _, _ = store.save_stream(io.BytesIO(b'cover'), 'png')
+    assert again == name and len(client.objects) == 1
+    assert os.listdir(store.tmp_dir) == []
+
+    path, temporary = store.local_copy(name)
+    with open(path, 'rb') as f:
+        assert f.read() == b'cover'
+    assert temporary
+    os.remove(path)
+
+    store.delete(name)
+    assert not store.exists(name)
+
+def test_s3_derivatives_uploaded(s3_store):
+    """测试对象存储下衍生图在本地生成后上传，临时文件被清理"""
+    Image = pytest.importorskip('PIL.Image')
+    from images import DerivativeGenerator
+
+    store, client = s3_store
+    buffer = io.BytesIO()
+    Image.new('RGB', (400, 200)).save(buffer, format='PNG')
+    buffer.seek(0)
+    name, sha256, _ = store.save_stream(buffer, 'png')
+
+    generator = DerivativeGenerator(store, [100], executor=ThreadPoolExecutor(max_workers=1))
+    assert generator.submit(name, sha256).result() == [100]
+    generator.shutdown()
+
+    assert store.exists(f'{name[:-4]}_w100.webp')
+    assert store.exists(f'{name[:-4]}_w100.jpg')
+    assert os.listdir(store.tmp_dir) == []
+
+def test_presigned_upload_flow(app_db, s3_store, monkeypatch):
+    """测试预签名直传: 签发地址、客户端直传、登记与重定向访问"""
+    import domains.files
+    from models import UploadBlob, User
+    from flask_jwt_extended import create_access_token
+    app, db = app_db
+    store, client = s3_store
+    monkeypatch.setattr(domains.files, 'upload_store', store)
+
+    user = User(username='alice', email='alice@example.com', password='x')
+    db.session.add(user)
+    db.session.commit()
+
+    body = b'direct upload'
+    sha256 = hashlib.sha256(body).hexdigest()
+    headers = {'Authorization': f'Bearer {create_access_token(identity=str(user.id))}'}
+    payload = {'filename': 'clip.mp4', 'sha256': sha256, 'size': len(body)}
+
+    with app.test_client() as http:
+        response = http.post('/api/upload/presign', json=payload, headers=headers)
+        assert response.status_code == 201
+        target = response.get_json()
+        assert target['method'] == 'PUT'
+        assert 'op=put_object' in target['upload_url']
+
+        assert http.post('/api/upload/presign/complete', json=payload, headers=headers).status_code == 409
+
+        # 模拟浏览器按签发的请求头直接PUT到对象存储
+        client.put_object(Bucket='media', Key=f'uploads/{target["filename"]}', Body=body,
+                          ChecksumSHA256=target['headers']['x-amz-checksum-sha256'])
+        response = http.post('/api/upload/presign/complete', json=payload, headers=headers)
+        assert response.status_code == 200
+        url = response.get_json()['url']
+        assert db.session.get(UploadBlob, sha256).size == len(body)
+
+        response = http.post('/api/upload/presign', json=payload, headers=headers)
+        assert response.get_json()['deduplicated']
+        # 上传不占引用，保存到头像、封面等字段时才登记
+        assert db.session.get(UploadBlob, sha256).ref_count == 0
+
+        response = http.get(url)
+        assert response.status_code == 302
+        assert 'op=get_object' in response.headers['Location']
+        assert 'immutable' not in response.headers['Cache-Control']
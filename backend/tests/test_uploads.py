@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+"""
+芝栖养生平台 - 文件上传测试
+"""
+
+import hashlib
+import io
+import os
+
+import pytest
+
+from storage import LocalStorage
+from uploads import ChunkedUploadManager, ContentAddressedStore, UploadError
+
+# ========== 分片上传测试 ==========
+
+def test_chunked_upload_streams_and_hashes(tmp_path):
+    """测试分片追加与增量SHA-256"""
+    manager = ChunkedUploadManager(str(tmp_path), max_file_size=1024, block_size=4)
+    meta = manager.create(1, '../vlog.mp4', 10)
+    assert meta['filename'] == 'vlog.mp4'
+
+    manager.append(meta['upload_id'], 1, 0, io.BytesIO(b'hello'))
+    meta = manager.append(meta['upload_id'], 1, 5, io.BytesIO(b'world'))
+    assert meta['offset'] == 10
+
+    part_path, meta, sha256 = manager.complete(meta['upload_id'], 1)
+    assert sha256 == hashlib.sha256(b'helloworld').hexdigest()
+    with open(part_path, 'rb') as f:
+        assert f.read() == b'helloworld'
+
+def test_resume_on_another_worker(tmp_path):
+    """测试续传落到其他worker时重新计算哈希"""
+    first = ChunkedUploadManager(str(tmp_path), max_file_size=1024)
+    meta = first.create(1, 'a.png', 6)
+    first.append(meta['upload_id'], 1, 0, io.BytesIO(b'abc'))
+
+    second = ChunkedUploadManager(str(tmp_path), max_file_size=1024)
+    assert second.status(meta['upload_id'], 1)['offset'] == 3
+    second.append(meta['upload_id'], 1, 3, io.BytesIO(b'def'))
+    _, _, sha256 = second.complete(meta['upload_id'], 1)
+    assert sha256 == hashlib.sha256(b'abcdef').hexdigest()
+
+def test_offset_mismatch_and_overflow(tmp_path):
+    """测试偏移量不匹配和分片超出总大小"""
+    manager = ChunkedUploadManager(str(tmp_path), max_file_size=1024)
+    meta = manager.create(1, 'a.png', 4)
+
+    with pytest.raises(UploadError) as excinfo:
+        manager.append(meta['upload_id'], 1, 2, io.BytesIO(b'ab'))
+    assert excinfo.value.status_code == 409
+    assert excinfo.value.extra['offset'] == 0
+
+    with pytest.raises(UploadError):
+        manager.append(meta['upload_id'], 1, 0, io.BytesIO(b'abcdef'))
+    assert manager.status(meta['upload_id'], 1)['offset'] == 0
+
+    with pytest.raises(UploadError) as excinfo:
+        manager.complete(meta['upload_id'], 1)
+    assert excinfo.value.status_code == 409
+
+def test_session_limits_and_ownership(tmp_path):
+    """测试大小限制、会话归属和过期清理"""
+    manager = ChunkedUploadManager(str(tmp_path), max_file_size=100, session_ttl=60)
+
+    with pytest.raises(UploadError) as excinfo:
+        manager.create(1, 'big.mp4', 101)
+    assert excinfo.value.status_code == 413
+
+    meta = manager.create(1, 'a.png', 10)
+    with pytest.raises(UploadError) as excinfo:
+        manager.status(meta['upload_id'], 2)
+    assert excinfo.value.status_code == 404
+    with pytest.raises(UploadError):
+        manager.status('../../etc/passwd', 1)
+
+    assert manager.cleanup_expired(now=meta['created_at'] + 30) == 0
+    assert manager.cleanup_expired(now=meta['created_at'] + 61) == 1
+
+# ========== 内容寻址存储测试 ==========
+
+def test_content_addressed_store_dedup(tmp_path):
+    """测试按哈希分片存放且相同内容只存一份"""
+    store = ContentAddressedStore(LocalStorage(str(tmp_path)), str(tmp_path / '.tmp'))
+    name, sha256, size = store.save_stream(io.BytesIO(b'avatar'), 'png')
+    assert name == f'{sha256[:2]}/{sha256[2:4]}/{sha256}.png'
+    assert size == 6
+    assert ContentAddressedStore.parse_name(name) == (sha256, 'png')
+    assert ContentAddressedStore.parse_name('20240101_avatar.png') is None
+
+    again, _, _ = store.save_stream(io.BytesIO(b'avatar'), 'png')
+    assert again == name
+    assert os.listdir(store.tmp_dir) == []
+
+def test_refcount_and_sweep(app_db, tmp_path, monkeypatch):
+    """测试引用计数与未引用文件回收"""
+    import domains.files
+    from domains.files import acquire_upload, register_upload, release_upload, sweep_unreferenced_uploads
+    from models import UploadBlob
+    app, db = app_db
+    store = ContentAddressedStore(LocalStorage(str(tmp_path)), str(tmp_path / '.tmp'))
+    monkeypatch.setattr(domains.files, 'upload_store', store)
+
+    name, sha256, size = store.save_stream(io.BytesIO(b'photo'), 'jpg')
+    blob = register_upload(sha256, 'jpg', size)
+    assert register_upload(sha256, 'jpg', size).ref_count == 0
+    assert acquire_upload(blob.url) and acquire_upload(blob.url)
+    db.session.commit()
+    db.session.expire_all()
+    assert db.session.get(UploadBlob, sha256).ref_count == 2
+
+    assert release_upload(blob.url)
+    db.session.commit()
+    assert sweep_unreferenced_uploads(grace_seconds=0) == 0
+
+    assert release_upload(blob.url)
+    assert not release_upload(blob.url)
+    assert not release_upload('/uploads/20240101_legacy.jpg')
+    db.session.commit()
+    assert sweep_unreferenced_uploads(grace_seconds=3600) == 0
+    assert sweep_unreferenced_uploads(grace_seconds=0, batch_size=1) == 1
+    assert not store.exists(name)
+    assert db.session.get(UploadBlob, sha256) is None
+
+@pytest.fixture
+def upload_api(app_db, tmp_path, monkeypatch):
+    """登录用户 + 临时内容寻址存储"""
+    import domains.files
+    from flask_jwt_extended import create_access_token
+    from models import User
+    app, db = app_db
+    store = ContentAddressedStore(LocalStorage(str(tmp_path)), str(tmp_path / '.tmp'))
+    monkeypatch.setattr(domains.files, 'upload_store', store)
+    monkeypatch.setattr(domains.files, 'schedule_derivatives', lambda blob: None)
+    user = User(username='uploader', email='uploader@example.com', password='x')
+    db.session.add(user)
+    db.session.commit()
+    headers = {'Authorization': f'Bearer {create_access_token(identity=str(user.id))}'}
+    with app.test_client() as client:
+        yield client, headers, store, db
+
+def test_chunked_init_validates_and_deduplicates(upload_api):
+    """测试分片上传声明的哈希与大小校验，只有大小与扩展名都一致时才秒传"""
+    from domains.files import register_upload
+    from models import UploadBlob
+    client, headers, store, db = upload_api
+    name, sha256, size = store.save_stream(io.BytesIO(b'ganoderma'), 'png')
+    register_upload(sha256, 'png', size)
+
+    def init(**data):
+        return client.post('/api/upload/chunked', headers=headers, json=dict({'filename': 'a.png'}, **data))
+
+    assert init(sha256='x' * 64, total_size=size).status_code == 400
+    assert init(sha256=sha256, total_size=str(size)).status_code == 400
+    assert init(sha256=sha256, total_size=10 ** 12).status_code == 413
+
+    response = init(sha256=sha256.upper(), total_size=size)
+    assert response.status_code == 200 and response.get_json()['filename'] == name
+    assert init(sha256=sha256, total_size=size + 1).status_code == 201
+    assert client.post('/api/upload/chunked', headers=headers,
+                       json={'filename': 'a.jpg', 'sha256': sha256, 'total_size': size}).status_code == 201
+    assert db.session.get(UploadBlob, sha256).ref_count == 0
+
+    # 记录还在但文件已被回收: 需要重新上传
+    store.delete(name)
+    assert init(sha256=sha256, total_size=size).status_code == 201
+
+def test_upload_during_sweep_keeps_file(upload_api, monkeypatch):
+    """测试回收任务在上传登记前删除了相同内容时，上传后文件仍然存在"""
+    import domains.files
+    from domains.files import register_upload, sweep_unreferenced_uploads
+    from models import UploadBlob
+    client, headers, store, db = upload_api
+    name, sha256, size = store.save_stream(io.BytesIO(b'reishi'), 'png')
+    register_upload(sha256, 'png', size)
+
+    real_register = domains.files.register_upload
+    def register_after_sweep(*args):
+        assert sweep_unreferenced_uploads(grace_seconds=0) == 1
+        return real_register(*args)
+    monkeypatch.setattr(domains.files, 'register_upload', register_after_sweep)
+
+    response = client.post('/api/upload', headers=headers,
+                           data={'file': (io.BytesIO(b'reishi'), 'again.png')}, content_type='multipart/form-data')
+    assert response.status_code == 200 and response.get_json()['filename'] == name
+    assert store.exists(name)
+    assert db.session.get(UploadBlob, sha256).ref_count == 0
+
+def test_fields_reference_uploads(upload_api):
+    """测试保存到头像、封面等字段时登记引用: 重复保存同一URL不重复计数，两个字段共用一个文件各占一次引用"""
+    from domains.files import sweep_unreferenced_uploads
+    from models import UploadBlob
+    client, headers, store, db = upload_api
+    response = client.post('/api/upload', headers=headers,
+                           data={'file': (io.BytesIO(b'lingzhi'), 'cover.png')}, content_type='multipart/form-data')
+    url, sha256 = response.get_json()['url'], response.get_json()['sha256']
+
+    def ref_count():
+        db.session.expire_all()
+        return db.session.get(UploadBlob, sha256).ref_count
+
+    assert ref_count() == 0
+    for _ in range(2):
+        assert client.put('/auth/profile', headers=headers, json={'avatar': url}).status_code == 200
+        assert ref_count() == 1
+
+    response = client.post('/content/', headers=headers,
+                           json={'title': '灵芝', 'content_type': 'article', 'cover_image': url})
+    content_id = response.get_json()['content_id']
+    assert ref_count() == 2
+    # 改为同一URL、换成视频字段
+    client.put(f'/content/{content_id}', headers=headers, json={'cover_image': url})
+    assert ref_count() == 2
+    client.put(f'/content/{content_id}', headers=headers, json={'cover_image': None, 'video_url': url})
+    assert ref_count() == 2
+
+    # 仍被头像引用时不回收
+    assert client.delete(f'/content/{content_id}', headers=headers).status_code == 200
+    assert ref_count() == 1
+    assert sweep_unreferenced_uploads(grace_seconds=0) == 0
+    client.put('/auth/profile', headers=headers, json={'avatar': '/static/default.png'})
+    assert ref_count() == 0
+    assert sweep_unreferenced_uploads(grace_seconds=0) == 1
+
+    # 引用不存在或已回收的文件: 请求失败，原值不变
+    response = client.put('/auth/profile', headers=headers, json={'avatar': url, 'real_name': '新名字'})
+    assert response.status_code == 400 and response.get_json()['msg'] == '文件不存在或已过期，请重新上传'
+    response = client.get('/auth/profile', headers=headers)
+    assert response.get_json()['user']['avatar'] == '/static/default.png'
+    assert response.get_json()['user']['real_name'] != '新名字'
+
+# ========== 文件访问测试 ==========
+
+@pytest.fixture
+def upload_client(tmp_path, monkeypatch):
+    from app import app
+    import domains.files
+    monkeypatch.setitem(app.config, 'UPLOAD_ACCEL_REDIRECT_PREFIX', '')
+    store = ContentAddressedStore(LocalStorage(str(tmp_path)), str(tmp_path / '.tmp'))
+    monkeypatch.setattr(domains.files, 'upload_store', store)
+    name, sha256, _ = store.save_stream(io.BytesIO(b'0123456789'), 'mp4')
+    with app.test_client() as client:
+        yield client, name, sha256
+
+def test_range_and_immutable_caching(upload_client):
+    """测试Range请求、强ETag与永久缓存"""
+    client, name, sha256 = upload_client
+
+    response = client.get(f'/uploads/{name}', headers={'Range': 'bytes=2-5'})
+    assert response.status_code == 206
+    assert response.data == b'2345'
+    assert response.headers['Content-Range'] == 'bytes 2-5/10'
+    assert response.headers['ETag'] == f'"{sha256}.mp4"'
+    assert 'immutable' in response.headers['Cache-Control']
+
+    response = client.get(f'/uploads/{name}', headers={'If-None-Match': f'"{sha256}.mp4"'})
+    assert response.status_code == 304
+
+    assert client.get('/uploads/.partial/x.part').status_code == 404
+
+def test_accel_redirect_mode(upload_client):
+    """测试X-Accel-Redirect模式不发送文件内容"""
+    from app import app
+    client, name, sha256 = upload_client
+    app.config['UPLOAD_ACCEL_REDIRECT_PREFIX'] = '/protected-uploads/'
+
+    response = client.get(f'/uploads/{name}')
+    assert response.headers['X-Accel-Redirect'] == f'/protected-uploads/{name}'
+    assert response.mimetype == 'video/mp4'
+    assert response.data == b''
+    # 与直接发送时的ETag一致
+    assert response.headers['ETag'] == f'"{sha256}.mp4"'
+
+    response = client.get(f'/uploads/{name}', headers={'If-None-Match': f'"{sha256}.mp4"'})
+    assert response.status_code == 304 and 'X-Accel-Redirect' not in response.headers
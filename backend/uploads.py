@@ -0,0 +1,302 @@
+"""
+芝栖养生平台 - 文件上传
+可断点续传的分片上传 (init/append/complete) 与按内容哈希去重的文件存储
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+import uuid
+
+from werkzeug.utils import secure_filename
+
+# 流式读写的块大小
+BLOCK_SIZE = 64 * 1024
+
+
+class UploadError(Exception):
+    """上传错误，携带HTTP状态码"""
+
+    def __init__(self, msg, status_code=400, **extra):
+        super().__init__(msg)
+        self.msg = msg
+        self.status_code = status_code
+        self.extra = extra
+
+    def to_dict(self):
+        return dict(self.extra, msg=self.msg)
+
+
+def is_sha256_hex(value):
+    """是否为64位小写十六进制的SHA-256"""
+    return isinstance(value, str) and len(value) == 64 and all(c in '0123456789abcdef' for c in value)
+
+
+def file_sha256(path, block_size=BLOCK_SIZE):
+    """流式计算文件SHA-256"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class ChunkedUploadManager:
+    """分片上传会话管理
+
+    会话元数据和未完成的数据保存在 <upload_folder>/.partial 下，任意worker都可以继续追加；
+    已写入的字节数以磁盘文件大小为准。SHA-256 在追加时增量计算，若续传请求落到
+    其他worker (没有增量状态) 则在完成时重新从磁盘计算。
+    """
+
+    def __init__(self, upload_folder, max_file_size, session_ttl=24 * 3600, block_size=BLOCK_SIZE):
+        self.upload_folder = upload_folder
+        self.partial_dir = os.path.join(upload_folder, '.partial')
+        self.max_file_size = max_file_size
+        self.session_ttl = session_ttl
+        self.block_size = block_size
+        self._hashers = {}
+        self._locks = {}
+        self._guard = threading.Lock()
+
+    def _meta_path(self, upload_id):
+        return os.path.join(self.partial_dir, f'{upload_id}.json')
+
+    def _part_path(self, upload_id):
+        return os.path.join(self.partial_dir, f'{upload_id}.part')
+
+    def _lock(self, upload_id):
+        with self._guard:
+            return self._locks.setdefault(upload_id, threading.Lock())
+
+    def _forget(self, upload_id):
+        with self._guard:
+            self._hashers.pop(upload_id, None)
+            self._locks.pop(upload_id, None)
+
+    def _load(self, upload_id, user_id):
+        # upload_id 为uuid hex，拒绝其他格式防止路径穿越
+        if not upload_id or len(upload_id) != 32 or not all(c in '0123456789abcdef' for c in upload_id):
+            raise UploadError('上传会话不存在', 404)
+        try:
+            with open(self._meta_path(upload_id), 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+        except FileNotFoundError:
+            raise UploadError('上传会话不存在', 404)
+        if meta['user_id'] != user_id:
+            raise UploadError('上传会话不存在', 404)
+        meta['offset'] = os.path.getsize(self._part_path(upload_id))
+        return meta
+
+    def check_size(self, total_size):
+        """校验客户端声明的文件大小: 正整数且不超过上限"""
+        if isinstance(total_size, bool) or not isinstance(total_size, int) or total_size <= 0:
+            raise UploadError('文件大小无效')
+        if total_size > self.max_file_size:
+            raise UploadError('文件过大', 413, max_file_size=self.max_file_size)
+        return total_size
+
+    def create(self, user_id, filename, total_size):
+        """创建上传会话"""
+        self.check_size(total_size)
+
+        upload_id = uuid.uuid4().hex
+        meta = {
+            'upload_id': upload_id,
+            'user_id': user_id,
+            'filename': secure_filename(filename),
+            'total_size': total_size,
+            'created_at': time.time()
+        }
+        # 目录在首次使用时创建，导入应用时不产生文件系统副作用
+        os.makedirs(self.partial_dir, exist_ok=True)
+        open(self._part_path(upload_id), 'wb').close()
+        with open(self._meta_path(upload_id), 'w', encoding='utf-8') as f:
+            json.dump(meta, f)
+        with self._guard:
+            self._hashers[upload_id] = (0, hashlib.sha256())
+        meta['offset'] = 0
+        return meta
+
+    def status(self, upload_id, user_id):
+        """查询上传进度 (断点续传时获取已写入的偏移量)"""
+        return self._load(upload_id, user_id)
+
+    def append(self, upload_id, user_id, offset, stream):
+        """从offset处追加一个分片，流式写入磁盘"""
+        with self._lock(upload_id):
+            meta = self._load(upload_id, user_id)
+            if offset != meta['offset']:
+                raise UploadError('分片偏移量不匹配', 409, offset=meta['offset'])
+
+            with self._guard:
+                hasher_offset, hasher = self._hashers.get(upload_id, (None, None))
+            if hasher_offset != offset:
+                hasher = None
+
+            limit = meta['total_size'] - offset
+            written = 0
+            with open(self._part_path(upload_id), 'r+b') as f:
+                f.seek(offset)
+                try:
+                    for block in iter(lambda: stream.read(self.block_size), b''):
+                        written += len(block)
+                        if written > limit:
+                            raise UploadError('分片超出文件大小', 400, offset=offset)
+                        f.write(block)
+                        if hasher is not None:
+                            hasher.update(block)
+                except Exception:
+                    # 丢弃不完整的分片，客户端从原偏移量重试
+                    f.truncate(offset)
+                    with self._guard:
+                        self._hashers.pop(upload_id, None)
+                    raise
+
+            with self._guard:
+                if hasher is not None:
+                    self._hashers[upload_id] = (offset + written, hasher)
+                else:
+                    self._hashers.pop(upload_id, None)
+            meta['offset'] = offset + written
+            return meta
+
+    def complete(self, upload_id, user_id):
+        """完成上传，返回 (临时文件路径, 元数据, sha256)，由调用方负责移动到最终位置"""
+        with self._lock(upload_id):
+            meta = self._load(upload_id, user_id)
+            if meta['offset'] != meta['total_size']:
+                raise UploadError('文件尚未上传完成', 409, offset=meta['offset'])
+
+            with self._guard:
+                hasher_offset, hasher = self._hashers.get(upload_id, (None, None))
+            part_path = self._part_path(upload_id)
+            if hasher is not None and hasher_offset == meta['total_size']:
+                sha256 = hasher.hexdigest()
+            else:
+                sha256 = file_sha256(part_path, self.block_size)
+            return part_path, meta, sha256
+
+    def discard(self, upload_id, user_id=None):
+        """删除上传会话 (完成后或客户端取消)"""
+        if user_id is not None:
+            self._load(upload_id, user_id)
+        for path in (self._part_path(upload_id), self._meta_path(upload_id)):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+        self._forget(upload_id)
+
+    def cleanup_expired(self, now=None):
+        """清理超过有效期的未完成会话，返回清理数量"""
+        now = now if now is not None else time.time()
+        removed = 0
+        if not os.path.isdir(self.partial_dir):
+            return removed
+        for name in os.listdir(self.partial_dir):
+            if not name.endswith('.json'):
+                continue
+            upload_id = name[:-len('.json')]
+            try:
+                with open(self._meta_path(upload_id), 'r', encoding='utf-8') as f:
+                    created_at = json.load(f)['created_at']
+            except (OSError, ValueError, KeyError):
+                continue
+            if now - created_at > self.session_ttl:
+                self.discard(upload_id)
+                removed += 1
+        return removed
+
+
+class ContentAddressedStore:
+    """内容寻址文件存储
+
+    文件按SHA-256命名并分片存放: ab/cd/abcdef....ext，相同内容只保存一份，
+    文件名本身即版本，可永久缓存。实际读写委托给存储后端 (本地文件系统或S3兼容对象存储)，
+    tmp_dir 为接收上传时的本地临时目录 (本地存储时应与存储目录位于同一文件系统以便原子重命名)。
+    """
+
+    def __init__(self, storage, tmp_dir, block_size=BLOCK_SIZE):
+        self.storage = storage
+        self.tmp_dir = tmp_dir
+        self.block_size = block_size
+
+    @staticmethod
+    def blob_name(sha256, extension):
+        return f'{sha256[:2]}/{sha256[2:4]}/{sha256}.{extension}'
+
+    @staticmethod
+    def _split(name):
+        """拆分为 (sha256, 后缀, 扩展名)，目录与哈希不一致时返回None"""
+        parts = name.split('/')
+        if len(parts) != 3 or '.' not in parts[2]:
+            return None
+        stem, extension = parts[2].split('.', 1)
+        sha256, _, suffix = stem.partition('_')
+        if not is_sha256_hex(sha256) or parts[0] != sha256[:2] or parts[1] != sha256[2:4]:
+            return None
+        return sha256, suffix, extension
+
+    @classmethod
+    def parse_name(cls, name):
+        """从原图存储名解析 (sha256, 扩展名)，非内容寻址的文件名返回None"""
+        split = cls._split(name)
+        if split is None or split[1]:
+            return None
+        return split[0], split[2]
+
+    @classmethod
+    def content_hash(cls, name):
+        """原图或衍生图 (<sha>_w320.webp) 对应的内容哈希，非内容寻址的文件返回None"""
+        split = cls._split(name)
+        return split[0] if split is not None else None
+
+    def path(self, name):
+        """本地文件路径，对象存储返回None"""
+        return self.storage.local_path(name)
+
+    def exists(self, name):
+        return self.storage.exists(name)
+
+    def put_file(self, src_path, sha256, extension):
+        """把已计算哈希的文件移入存储，内容已存在时直接丢弃源文件"""
+        name = self.blob_name(sha256, extension)
+        if self.storage.exists(name):
+            os.remove(src_path)
+        else:
+            self.storage.put_file(src_path, name)
+        return name
+
+    def save_stream(self, stream, extension):
+        """流式写入临时文件并同时计算哈希，返回 (存储名, sha256, 大小)"""
+        tmp_path, sha256, size = self.receive_stream(stream)
+        return self.put_file(tmp_path, sha256, extension), sha256, size
+
+    def receive_stream(self, stream):
+        """流式写入临时文件并同时计算哈希，返回 (临时文件路径, sha256, 大小)，由调用方 put_file 放入存储"""
+        digest = hashlib.sha256()
+        size = 0
+        os.makedirs(self.tmp_dir, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.tmp_dir)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                for block in iter(lambda: stream.read(self.block_size), b''):
+                    f.write(block)
+                    digest.update(block)
+                    size += len(block)
+        except Exception:
+            os.remove(tmp_path)
+            raise
+        return tmp_path, digest.hexdigest(), size
+
+    def local_copy(self, name):
+        """取得可读取的本地文件，返回 (路径, 是否为用后需删除的临时文件)"""
+        os.makedirs(self.tmp_dir, exist_ok=True)
+        return self.storage.local_copy(name, self.tmp_dir)
+
+    def delete(self, name):
+        return self.storage.delete(name)
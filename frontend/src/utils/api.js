@@ -39,6 +39,27 @@ apiClient.interceptors.request.use(
   }
 )
 
+// 使用refresh token换取新的token对 (并发的401请求共用同一次刷新)
+let refreshPromise = null
+const refreshTokens = () => {
+  const refreshToken = localStorage.getItem('refresh_token')
+  if (!refreshToken) {
+    return Promise.reject(new Error('no refresh token'))
+  }
+  if (!refreshPromise) {
+    refreshPromise = axios.post(`${apiClient.defaults.baseURL}/api/auth/refresh`, null, {
+      headers: { Authorization: `Bearer ${refreshToken}` }
+    }).then(({ data }) => {
+      localStorage.setItem('access_token', data.access_token)
+      localStorage.setItem('refresh_token', data.refresh_token)
+      return data.access_token
+    }).finally(() => {
+      refreshPromise = null
+    })
+  }
+  return refreshPromise
+}
+
 // 响应拦截器
 apiClient.interceptors.response.use(
   response => {
@@ -51,8 +72,20 @@ apiClient.interceptors.response.use(
 
     return response
   },
-  error => {
-    const { response, request, message } = error
+  async error => {
+    const { response, request, message, config } = error
+
+    // access token过期: 刷新后重试一次
+    if (response && response.status === 401 && config && !config._retried && !config.url.startsWith('/api/auth/')) {
+      try {
+        const accessToken = await refreshTokens()
+        config._retried = true
+        config.headers.Authorization = `Bearer ${accessToken}`
+        return apiClient(config)
+      } catch (refreshError) {
+        // 刷新失败，按未授权处理
+      }
+    }
 
     if (response) {
       // 服务器响应错误
@@ -66,6 +99,7 @@ apiClient.interceptors.response.use(
           console.error('未授权访问:', data.msg || 'Unauthorized')
           // 清除本地token并跳转登录
           localStorage.removeItem('access_token')
+          localStorage.removeItem('refresh_token')
           localStorage.removeItem('user')
           if (window.location.pathname !== '/login') {
             window.location.href = '/login'
@@ -101,6 +135,10 @@ export const api = {
   auth: {
     register: (data) => apiClient.post('/api/auth/register', data),
     login: (data) => apiClient.post('/api/auth/login', data),
+    logout: (accessToken, refreshToken) => apiClient.post('/api/auth/logout', { refresh_token: refreshToken }, {
+      headers: { Authorization: `Bearer ${accessToken}` }
+    }),
+    changePassword: (data) => apiClient.put('/api/auth/password', data),
     getProfile: () => apiClient.get('/api/auth/profile'),
     updateProfile: (data) => apiClient.put('/api/auth/profile', data)
   },